@@ -1,15 +1,23 @@
+import os
 import sys
 import datetime
 from PySide6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-    QGroupBox, QFormLayout, QPushButton, QDateEdit, QTableWidget,
-    QTableWidgetItem, QHeaderView, QFileDialog, QMessageBox
+    QGroupBox, QFormLayout, QPushButton, QDateEdit, QTableView,
+    QAbstractItemView, QHeaderView, QFileDialog, QMessageBox, QProgressBar,
+    QCheckBox, QComboBox, QLineEdit
 )
-from PySide6.QtCore import QDate, Qt
+from PySide6.QtCore import QDate, Qt, QThread, QTimer
 
 from data_manager import DataManager # Impor 'mesin' kita
+from ui_worker import ImportWorker, ExportWorker # Impor/ekspor berjalan di thread terpisah
+from ekspor import JENIS_LAPORAN # Jenis laporan yang bisa diekspor
+from ui_model import AbsensiTableModel # Model tabel dengan lazy fetching
 from database_setup import NAMA_DATABASE # Untuk pengecekan file DB
 
+# Jeda (ms) setelah ketikan terakhir di kotak pencarian sebelum data dimuat ulang
+JEDA_CARI_MS = 300
+
 class App(QMainWindow):
     """
     Kelas utama untuk Aplikasi UI Absensi, dibangun dengan PySide6.
@@ -27,6 +35,15 @@ class App(QMainWindow):
             QMessageBox.critical(None, "Error Database", "Gagal terhubung ke database. Aplikasi akan ditutup.")
             sys.exit(1) # Keluar jika DB gagal konek
 
+        # Thread & worker impor yang sedang berjalan (None jika tidak ada)
+        self.thread_impor = None
+        self.worker_impor = None
+        self.jumlah_file_impor = 0
+
+        # Thread & worker ekspor laporan yang sedang berjalan
+        self.thread_ekspor = None
+        self.worker_ekspor = None
+
         self.initUI()
         
         # Muat data awal saat aplikasi dibuka
@@ -57,11 +74,35 @@ class App(QMainWindow):
         self.tgl_upload.setDate(QDate.currentDate())
         self.tgl_upload.setDisplayFormat('yyyy-MM-dd')
         
+        # Log berisi baris periode/tanggal per blok; Tanggal Log hanya dipakai
+        # untuk blok tanpa tanggal. Jika tidak dicentang, Tanggal Log dipakai untuk semua.
+        self.chk_tanggal_dari_file = QCheckBox("Tanggal dari file (log beberapa hari)")
+        self.chk_tanggal_dari_file.setChecked(True)
+
+        # Pelanggaran (tidak scan pulang, telat, scan anomali) di tanggal yang diimpor
+        self.chk_deteksi_pelanggaran = QCheckBox("Deteksi pelanggaran setelah impor")
+        self.chk_deteksi_pelanggaran.setChecked(True)
+
+        # File yang sama (isi identik) untuk tanggal yang sama biasanya dilewati
+        self.chk_paksa_impor = QCheckBox("Impor ulang file yang sudah pernah diimpor")
+
         self.btn_pilih_file = QPushButton("Pilih File & Upload")
         self.btn_pilih_file.clicked.connect(self.upload_log_file)
+
+        # Progres impor (baris di-parse / ditulis) dan tombol batal
+        self.progress_impor = QProgressBar()
+        self.progress_impor.setVisible(False)
+        self.btn_batal_impor = QPushButton("Batalkan Impor")
+        self.btn_batal_impor.setVisible(False)
+        self.btn_batal_impor.clicked.connect(self.batalkan_impor)
         
         upload_layout.addRow("Tanggal Log:", self.tgl_upload)
+        upload_layout.addRow(self.chk_tanggal_dari_file)
+        upload_layout.addRow(self.chk_deteksi_pelanggaran)
+        upload_layout.addRow(self.chk_paksa_impor)
         upload_layout.addRow(self.btn_pilih_file)
+        upload_layout.addRow(self.progress_impor)
+        upload_layout.addRow(self.btn_batal_impor)
         upload_box.setLayout(upload_layout)
 
         # --- Bagian Filter ---
@@ -78,20 +119,56 @@ class App(QMainWindow):
         
         self.btn_muat_data = QPushButton("Muat Data")
         self.btn_muat_data.clicked.connect(self.muat_data_absensi)
+
+        # Pencarian nama karyawan / departemen (indeks FTS5). Query baru
+        # dijalankan setelah pengguna berhenti mengetik selama JEDA_CARI_MS.
+        self.input_cari = QLineEdit()
+        self.input_cari.setPlaceholderText("Nama karyawan / departemen")
+        self.input_cari.setClearButtonEnabled(True)
+        self.timer_cari = QTimer(self)
+        self.timer_cari.setSingleShot(True)
+        self.timer_cari.setInterval(JEDA_CARI_MS)
+        self.timer_cari.timeout.connect(self.muat_data_absensi)
+        self.input_cari.textChanged.connect(lambda _: self.timer_cari.start())
+        self.input_cari.returnPressed.connect(self.muat_data_absensi)
         
         filter_layout.addRow("Dari:", self.tgl_mulai)
         filter_layout.addRow("Sampai:", self.tgl_selesai)
+        filter_layout.addRow("Cari:", self.input_cari)
         filter_layout.addRow(self.btn_muat_data)
         filter_box.setLayout(filter_layout)
 
+        # --- Bagian Ekspor (memakai rentang tanggal dari Filter) ---
+        ekspor_box = QGroupBox("Ekspor Laporan")
+        ekspor_layout = QFormLayout()
+
+        self.cmb_jenis_laporan = QComboBox()
+        for jenis, judul in JENIS_LAPORAN.items():
+            self.cmb_jenis_laporan.addItem(judul, jenis)
+
+        self.btn_ekspor = QPushButton("Ekspor ke CSV/XLSX...")
+        self.btn_ekspor.clicked.connect(self.ekspor_laporan)
+
+        self.progress_ekspor = QProgressBar()
+        self.progress_ekspor.setVisible(False)
+        self.btn_batal_ekspor = QPushButton("Batalkan Ekspor")
+        self.btn_batal_ekspor.setVisible(False)
+        self.btn_batal_ekspor.clicked.connect(self.batalkan_ekspor)
+
+        ekspor_layout.addRow("Laporan:", self.cmb_jenis_laporan)
+        ekspor_layout.addRow(self.btn_ekspor)
+        ekspor_layout.addRow(self.progress_ekspor)
+        ekspor_layout.addRow(self.btn_batal_ekspor)
+        ekspor_box.setLayout(ekspor_layout)
+
         kontrol_layout.addWidget(upload_box)
         kontrol_layout.addWidget(filter_box)
+        kontrol_layout.addWidget(ekspor_box)
         kontrol_layout.addStretch(1) # Tambahkan spasi di kanan
         
         main_layout.addLayout(kontrol_layout)
 
         # --- 2. Tabel Data (Tabel Utama) ---
-        self.tabel_data = QTableWidget()
         self.kolom_tabel_map = {
             'record_id': 'ID',
             'tanggal_absensi': 'Tanggal',
@@ -108,16 +185,17 @@ class App(QMainWindow):
         }
         
         self.kolom_db = list(self.kolom_tabel_map.keys()) # Urutan kolom dari DB
-        self.kolom_tabel = list(self.kolom_tabel_map.values()) # Judul yang tampil di UI
         
-        self.tabel_data.setColumnCount(len(self.kolom_tabel))
-        self.tabel_data.setHorizontalHeaderLabels(self.kolom_tabel)
+        # Model membaca baris dari DataManager per halaman saat tabel digulir
+        self.model_absensi = AbsensiTableModel(self.manager, self.kolom_tabel_map, parent=self)
+        self.tabel_data = QTableView()
+        self.tabel_data.setModel(self.model_absensi)
         
         # Pengaturan tampilan tabel
         self.tabel_data.verticalHeader().setVisible(False)
-        self.tabel_data.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers) # Tidak bisa diedit
+        self.tabel_data.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers) # Tidak bisa diedit
         self.tabel_data.setAlternatingRowColors(True)
-        self.tabel_data.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        self.tabel_data.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
         
         header = self.tabel_data.horizontalHeader()
         header.setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
@@ -129,85 +207,248 @@ class App(QMainWindow):
     def muat_data_absensi(self):
         """
         Menghubungi DataManager untuk mengambil data absensi
-        dan menampilkannya di QTableWidget.
+        dan menampilkannya di tabel (baris dimuat bertahap oleh model).
         """
-        # 1. Hapus data lama di tabel
-        self.tabel_data.setRowCount(0)
-            
-        # 2. Ambil tanggal filter dari UI
+        # 1. Ambil tanggal filter dan teks pencarian dari UI
         tgl_mulai = self.tgl_mulai.date().toString('yyyy-MM-dd')
         tgl_selesai = self.tgl_selesai.date().toString('yyyy-MM-dd')
+        cari = self.input_cari.text().strip() or None
+        self.timer_cari.stop() # Enter / Muat Data: tidak perlu menunggu jeda
         
-        # 3. Panggil 'mesin' untuk ambil data
+        # 2. Ganti isi model: model langsung mengambil halaman pertama (lewat
+        #    cache query), halaman berikutnya diambil view lewat fetchMore()
         try:
-            data_absensi = self.manager.get_absensi_data_for_ui(tgl_mulai, tgl_selesai)
-            
-            # 4. Masukkan data baru ke tabel
-            self.tabel_data.setRowCount(len(data_absensi))
-            
-            for row_idx, catatan in enumerate(data_absensi):
-                for col_idx, nama_kolom_db in enumerate(self.kolom_db):
-                    # Ganti None dengan string kosong
-                    nilai = catatan.get(nama_kolom_db, '')
-                    if nilai is None:
-                        nilai = ''
-                    
-                    item = QTableWidgetItem(str(nilai))
-                    
-                    # Beri warna pada status
-                    if nama_kolom_db == 'status_validasi':
-                        if nilai == 'PENDING':
-                            item.setBackground(Qt.GlobalColor.yellow)
-                        elif nilai == 'VALID':
-                            item.setBackground(Qt.GlobalColor.green)
-                    
-                    self.tabel_data.setItem(row_idx, col_idx, item)
-                
+            self.model_absensi.muat(tgl_mulai, tgl_selesai, cari)
         except Exception as e:
             QMessageBox.critical(self, "Error Pengambilan Data", f"Gagal mengambil data dari database: {e}")
 
     def upload_log_file(self):
         """
-        Membuka dialog pilih file, kemudian memanggil 'mesin'
-        untuk memproses dan mengimpor file tersebut.
+        Membuka dialog pilih file (bisa banyak sekaligus, misalnya satu
+        log per mesin), kemudian memanggil 'mesin' untuk memproses dan
+        mengimpor file-file tersebut.
         """
         # 1. Buka dialog untuk memilih file
-        file_path, _ = QFileDialog.getOpenFileName(
+        file_paths, _ = QFileDialog.getOpenFileNames(
             self,
             "Pilih file log absensi",
             "", # Direktori awal
             "File Excel/CSV (*.xls *.xlsx *.csv);;All files (*.*)"
         )
         
-        if not file_path:
+        if not file_paths:
             return # User membatalkan dialog
 
         # 2. Ambil tanggal absensi dari UI
         tanggal_log = self.tgl_upload.date().toString('yyyy-MM-dd')
+        tanggal_dari_file = self.chk_tanggal_dari_file.isChecked()
+        if tanggal_dari_file:
+            keterangan_tanggal = f"Sesuai tanggal di file\n(blok tanpa tanggal: {tanggal_log})"
+        else:
+            keterangan_tanggal = tanggal_log
         
         # 3. Konfirmasi kepada user
         konfirmasi_box = QMessageBox(self)
         konfirmasi_box.setIcon(QMessageBox.Icon.Question)
         konfirmasi_box.setWindowTitle("Konfirmasi Upload")
-        konfirmasi_box.setText(f"Anda akan meng-upload file:\n{file_path}\n\nUntuk tanggal absensi:\n{tanggal_log}\n\nLanjutkan?")
+        daftar_file = "\n".join(file_paths)
+        konfirmasi_box.setText(f"Anda akan meng-upload {len(file_paths)} file:\n{daftar_file}\n\nUntuk tanggal absensi:\n{keterangan_tanggal}\n\nLanjutkan?")
         konfirmasi_box.setStandardButtons(QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
         konfirmasi_box.setDefaultButton(QMessageBox.StandardButton.Yes)
         
         if konfirmasi_box.exec() == QMessageBox.StandardButton.No:
             return
 
-        # 4. Panggil 'mesin' untuk impor data
-        try:
-            sukses = self.manager.import_data_from_log(file_path, tanggal_log)
-            
-            if sukses:
-                QMessageBox.information(self, "Sukses", "Data dari file log berhasil diimpor ke database.")
-                # Refresh tabel untuk menampilkan data baru
-                self.muat_data_absensi()
+        # 4. Jalankan impor di thread terpisah (worker punya koneksi DB sendiri)
+        self.jumlah_file_impor = len(file_paths)
+        self.worker_impor = ImportWorker(
+            self.manager.db_file, file_paths, tanggal_log,
+            paksa=self.chk_paksa_impor.isChecked(), cache_dir=self.manager.cache_dir,
+            tanggal_dari_file=tanggal_dari_file,
+            deteksi_pelanggaran=self.chk_deteksi_pelanggaran.isChecked()
+        )
+        self.thread_impor = QThread(self)
+        self.worker_impor.moveToThread(self.thread_impor)
+
+        self.thread_impor.started.connect(self.worker_impor.run)
+        self.worker_impor.progress.connect(self.update_progress_impor)
+        self.worker_impor.selesai.connect(self.impor_selesai)
+        self.worker_impor.gagal.connect(self.impor_gagal)
+        self.worker_impor.dibatalkan.connect(self.impor_dibatalkan)
+        for sinyal in (self.worker_impor.selesai, self.worker_impor.gagal, self.worker_impor.dibatalkan):
+            sinyal.connect(self.thread_impor.quit)
+        self.thread_impor.finished.connect(self._bersihkan_impor)
+
+        self._set_mode_impor(True)
+        self.thread_impor.start()
+
+    def _set_mode_impor(self, berjalan):
+        """
+        Mengatur tombol & progress bar saat impor mulai/selesai.
+        """
+        self.btn_pilih_file.setEnabled(not berjalan)
+        self.progress_impor.setVisible(berjalan)
+        self.btn_batal_impor.setVisible(berjalan)
+        self.btn_batal_impor.setEnabled(berjalan)
+        if berjalan:
+            self.progress_impor.setRange(0, 0) # Mode 'sibuk' selama parsing
+            self.progress_impor.setFormat("Membaca file...")
+
+    def update_progress_impor(self, tahap, jumlah, total):
+        """
+        Slot untuk sinyal progres dari ImportWorker.
+        Untuk banyak file, yang ditampilkan hanya jumlah file yang selesai.
+        """
+        if tahap == 'file':
+            self.progress_impor.setRange(0, total)
+            self.progress_impor.setValue(jumlah)
+            self.progress_impor.setFormat("%v / %m file selesai")
+        elif self.jumlah_file_impor > 1:
+            return
+        elif tahap == 'parse':
+            self.progress_impor.setRange(0, total)
+            self.progress_impor.setValue(0)
+            self.progress_impor.setFormat(f"{jumlah} baris di-parse")
+        else:
+            self.progress_impor.setRange(0, total)
+            self.progress_impor.setValue(jumlah)
+            self.progress_impor.setFormat("%v / %m baris ditulis")
+
+    def batalkan_impor(self):
+        """
+        Meminta worker menghentikan impor (akan di-rollback).
+        """
+        if self.worker_impor:
+            self.worker_impor.batalkan()
+            self.btn_batal_impor.setEnabled(False)
+            self.progress_impor.setFormat("Membatalkan...")
+
+    def impor_selesai(self, hasil):
+        baris = []
+        for h in hasil:
+            nama_file = os.path.basename(h['file'])
+            if h['status'] == 'sukses':
+                r = h['ringkasan']
+                tanggal = r['tanggal']
+                rentang = tanggal[0] if len(tanggal) == 1 else f"{tanggal[0]} s/d {tanggal[-1]}, {len(tanggal)} hari"
+                tambahan = f", {r['pelanggaran']['terdeteksi']} pelanggaran" if 'pelanggaran' in r else ""
+                if r.get('master', {}).get('total'):
+                    tambahan += f", {r['master']['total']} data master berubah"
+                baris.append(f"✅ {nama_file}: {r['diproses']} baris ({r['baru']} baru, "
+                             f"{r['diperbarui']} diperbarui{tambahan}) [{rentang}]")
+            elif h['status'] == 'dilewati':
+                baris.append(f"⏭ {nama_file}: sudah pernah diimpor, dilewati")
             else:
-                QMessageBox.warning(self, "Gagal Impor", "Impor data gagal. Periksa konsol untuk detail error.")
-        except Exception as e:
-            QMessageBox.critical(self, "Error Kritis Impor", f"Terjadi error saat impor: {e}")
+                baris.append(f"❌ {nama_file}: {h['status']}")
+        QMessageBox.information(
+            self, "Sukses",
+            "Data dari file log berhasil diimpor ke database.\n\n" + "\n".join(baris)
+        )
+        # Refresh tabel untuk menampilkan data baru
+        self.muat_data_absensi()
+
+    def impor_gagal(self, pesan):
+        QMessageBox.warning(self, "Gagal Impor", pesan)
+
+    def impor_dibatalkan(self):
+        QMessageBox.information(self, "Impor Dibatalkan", "Impor dibatalkan. Tidak ada data yang diubah.")
+
+    def _bersihkan_impor(self):
+        """
+        Dipanggil saat thread impor selesai: kembalikan UI ke mode normal.
+        """
+        self._set_mode_impor(False)
+        self.worker_impor.deleteLater()
+        self.thread_impor.deleteLater()
+        self.worker_impor = None
+        self.thread_impor = None
+
+    def ekspor_laporan(self):
+        """
+        Meminta nama file tujuan lalu mengekspor laporan yang dipilih untuk
+        rentang tanggal di Filter. Ekspor berjalan di thread terpisah.
+        """
+        jenis = self.cmb_jenis_laporan.currentData()
+        tgl_mulai = self.tgl_mulai.date().toString('yyyy-MM-dd')
+        tgl_selesai = self.tgl_selesai.date().toString('yyyy-MM-dd')
+
+        file_path, filter_dipilih = QFileDialog.getSaveFileName(
+            self,
+            "Simpan laporan",
+            f"{jenis}_{tgl_mulai}_{tgl_selesai}.xlsx",
+            "Excel (*.xlsx);;CSV (*.csv)"
+        )
+        if not file_path:
+            return # User membatalkan dialog
+        if os.path.splitext(file_path)[1].lower() not in ('.csv', '.xlsx'):
+            file_path += '.csv' if filter_dipilih.startswith('CSV') else '.xlsx'
+
+        self.worker_ekspor = ExportWorker(self.manager.db_file, jenis, tgl_mulai, tgl_selesai, file_path)
+        self.thread_ekspor = QThread(self)
+        self.worker_ekspor.moveToThread(self.thread_ekspor)
+
+        self.thread_ekspor.started.connect(self.worker_ekspor.run)
+        self.worker_ekspor.progress.connect(self.update_progress_ekspor)
+        self.worker_ekspor.selesai.connect(self.ekspor_selesai)
+        self.worker_ekspor.gagal.connect(self.ekspor_gagal)
+        self.worker_ekspor.dibatalkan.connect(self.ekspor_dibatalkan)
+        for sinyal in (self.worker_ekspor.selesai, self.worker_ekspor.gagal, self.worker_ekspor.dibatalkan):
+            sinyal.connect(self.thread_ekspor.quit)
+        self.thread_ekspor.finished.connect(self._bersihkan_ekspor)
+
+        self._set_mode_ekspor(True)
+        self.thread_ekspor.start()
+
+    def _set_mode_ekspor(self, berjalan):
+        """
+        Mengatur tombol & progress bar saat ekspor mulai/selesai.
+        """
+        self.btn_ekspor.setEnabled(not berjalan)
+        self.progress_ekspor.setVisible(berjalan)
+        self.btn_batal_ekspor.setVisible(berjalan)
+        self.btn_batal_ekspor.setEnabled(berjalan)
+        if berjalan:
+            self.progress_ekspor.setRange(0, 0) # Mode 'sibuk' sampai batch pertama
+            self.progress_ekspor.setFormat("Menyiapkan laporan...")
+
+    def update_progress_ekspor(self, jumlah, total):
+        """
+        Slot untuk sinyal progres dari ExportWorker.
+        """
+        self.progress_ekspor.setRange(0, max(total, jumlah))
+        self.progress_ekspor.setValue(jumlah)
+        self.progress_ekspor.setFormat("%v / %m baris diekspor")
+
+    def batalkan_ekspor(self):
+        """
+        Meminta worker menghentikan ekspor (file setengah jadi dihapus).
+        """
+        if self.worker_ekspor:
+            self.worker_ekspor.batalkan()
+            self.btn_batal_ekspor.setEnabled(False)
+            self.progress_ekspor.setFormat("Membatalkan...")
+
+    def ekspor_selesai(self, hasil):
+        QMessageBox.information(
+            self, "Sukses",
+            f"{JENIS_LAPORAN[hasil['jenis']]} berhasil diekspor: {hasil['baris']} baris.\n\n{hasil['file']}"
+        )
+
+    def ekspor_gagal(self, pesan):
+        QMessageBox.warning(self, "Gagal Ekspor", pesan)
+
+    def ekspor_dibatalkan(self):
+        QMessageBox.information(self, "Ekspor Dibatalkan", "Ekspor dibatalkan. File tidak dibuat.")
+
+    def _bersihkan_ekspor(self):
+        """
+        Dipanggil saat thread ekspor selesai: kembalikan UI ke mode normal.
+        """
+        self._set_mode_ekspor(False)
+        self.worker_ekspor.deleteLater()
+        self.thread_ekspor.deleteLater()
+        self.worker_ekspor = None
+        self.thread_ekspor = None
 
     def closeEvent(self, event):
         """
@@ -216,6 +457,15 @@ class App(QMainWindow):
         konfirmasi = QMessageBox.question(self, "Keluar", "Apakah Anda yakin ingin keluar?")
         
         if konfirmasi == QMessageBox.StandardButton.Yes:
+            # Hentikan impor yang masih berjalan (di-rollback) sebelum keluar
+            if self.thread_impor:
+                self.worker_impor.batalkan()
+                self.thread_impor.quit()
+                self.thread_impor.wait()
+            if self.thread_ekspor:
+                self.worker_ekspor.batalkan()
+                self.thread_ekspor.quit()
+                self.thread_ekspor.wait()
             # Tutup koneksi database sebelum keluar
             self.manager.close()
             event.accept() # Izinkan jendela ditutup
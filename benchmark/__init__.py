@@ -0,0 +1,10 @@
+"""
+Paket benchmark untuk mengukur jalur-jalur 'panas' aplikasi absensi.
+
+Jalankan dari folder utama proyek, misalnya:
+    python -m benchmark.bench_suite --output hasil.json
+    python -m benchmark.bench_import --karyawan 10000
+    python -m benchmark.bench_parser --karyawan 20000
+    python -m benchmark.generator 5000 log.xlsx
+    python -m benchmark.cek_startup
+"""
@@ -0,0 +1,139 @@
+"""
+Benchmark HTTP API (server_api) sepenuhnya di localhost: server dijalankan
+di thread latar (port bebas) di atas database sintetis, lalu beberapa klien
+paralel meminta /absensi, /rekap, dan /pelanggaran sementara satu klien
+mengimpor log baru lewat POST /import. Hasilnya (JSON) berisi latensi dari
+sisi klien dan metrik /metrics dari sisi server.
+
+Contoh:
+    python -m benchmark.bench_api --karyawan 2000 --hari 20 --klien 8
+"""
+import argparse
+import asyncio
+import contextlib
+import datetime
+import json
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from server_api import ServerAbsensi
+from benchmark.bench_suite import isi_database
+from benchmark.generator import tulis_log
+
+
+@contextlib.contextmanager
+def server_latar(db_file, jumlah_worker):
+    """
+    Menjalankan ServerAbsensi di event loop thread lain; menghasilkan URL dasar.
+    """
+    siap = threading.Event()
+    info = {}
+
+    async def utama():
+        api = ServerAbsensi(db_file, jumlah_worker)
+        server = await api.mulai(port=0)
+        info['port'] = server.sockets[0].getsockname()[1]
+        info['loop'] = asyncio.get_running_loop()
+        info['berhenti'] = asyncio.Event()
+        siap.set()
+        async with server:
+            await info['berhenti'].wait()
+        api.tutup()
+
+    thread = threading.Thread(target=lambda: asyncio.run(utama()), daemon=True)
+    thread.start()
+    siap.wait()
+    try:
+        yield f"http://127.0.0.1:{info['port']}"
+    finally:
+        info['loop'].call_soon_threadsafe(info['berhenti'].set)
+        thread.join()
+
+
+def minta(url, data=None):
+    """
+    Satu request; mengembalikan (detik, status HTTP, jumlah baris/bytes respons).
+    """
+    mulai = time.perf_counter()
+    permintaan = urllib.request.Request(url, data=json.dumps(data).encode() if data else None)
+    try:
+        with urllib.request.urlopen(permintaan) as respons:
+            status = respons.status
+            baris = sum(1 for _ in respons)
+    except urllib.error.HTTPError as e:
+        status, baris = e.code, 0
+    return time.perf_counter() - mulai, status, baris
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark HTTP API lokal (hasil JSON).")
+    parser.add_argument('--karyawan', type=int, default=2000, help="Jumlah karyawan per log.")
+    parser.add_argument('--hari', type=int, default=20, help="Jumlah hari data di database.")
+    parser.add_argument('--klien', type=int, default=8, help="Jumlah klien paralel.")
+    parser.add_argument('--request', type=int, default=5, help="Putaran request per klien.")
+    parser.add_argument('--workers', type=int, default=4, help="Jumlah thread baca server.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder, contextlib.redirect_stdout(sys.stderr):
+        awal = datetime.date(2025, 1, 1)
+        daftar_tanggal = [(awal + datetime.timedelta(days=i)).isoformat() for i in range(args.hari + 1)]
+        # Hari terakhir tidak diisi: log-nya diimpor lewat API sementara klien lain membaca
+        tanggal_baru = daftar_tanggal.pop()
+        db_file = os.path.join(folder, 'api.db')
+        isi_database(db_file, folder, args.karyawan, daftar_tanggal)
+        rentang = f"from={daftar_tanggal[0]}&to={daftar_tanggal[-1]}"
+        log_baru = tulis_log(os.path.join(folder, 'baru.csv'), args.karyawan, tanggal_baru, seed=99)
+
+        with server_latar(db_file, args.workers) as url:
+            def klien(i):
+                hasil = []
+                for _ in range(args.request):
+                    for endpoint in ('absensi', 'rekap', 'pelanggaran'):
+                        hasil.append((endpoint, *minta(f"{url}/{endpoint}?{rentang}")))
+                return hasil
+
+            mulai = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=args.klien + 1) as pool:
+                impor = pool.submit(minta, f"{url}/import", {'file': [log_baru], 'deteksi_pelanggaran': True})
+                semua = [h for f in [pool.submit(klien, i) for i in range(args.klien)] for h in f.result()]
+                detik_impor, status_impor, _ = impor.result()
+            durasi = time.perf_counter() - mulai
+            with urllib.request.urlopen(f"{url}/metrics") as respons:
+                metrik_server = json.load(respons)
+
+    per_endpoint = {}
+    for endpoint, detik, status, baris in semua:
+        per_endpoint.setdefault(endpoint, []).append((detik, status, baris))
+    laporan = {
+        'meta': {'karyawan': args.karyawan, 'hari': args.hari, 'klien': args.klien,
+                 'request': args.request, 'workers': args.workers},
+        'total_detik': round(durasi, 3),
+        'request_per_detik': round(len(semua) / durasi, 1),
+        'impor': {'detik': round(detik_impor, 3), 'status': status_impor},
+        'klien': {
+            endpoint: {
+                'jumlah': len(daftar),
+                'gagal': sum(1 for _, status, _ in daftar if status != 200),
+                'baris': daftar[-1][2],
+                'median_ms': round(statistics.median(d for d, _, _ in daftar) * 1000, 2),
+                'maks_ms': round(max(d for d, _, _ in daftar) * 1000, 2),
+            }
+            for endpoint, daftar in per_endpoint.items()
+        },
+        'server': metrik_server,
+    }
+    print(json.dumps(laporan, indent=2))
+    if status_impor != 200 or any(v['gagal'] for v in laporan['klien'].values()):
+        print("❌ Ada request API yang gagal.", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+import argparse
+import os
+import tempfile
+import time
+
+from data_manager import DataManager
+from database_setup import inisialisasi_database
+from benchmark.generator import tulis_log
+
+
+def ukur_impor(db_file, file_log, tanggal, metode):
+    """
+    Mengukur waktu impor (detik) satu file log ke database db_file.
+    """
+    manager = DataManager(db_file)
+    try:
+        mulai = time.perf_counter()
+        # paksa=True: impor ulang file yang sama tetap ditulis (tidak dilewati)
+        ringkasan = manager.import_data_from_log(file_log, tanggal, metode=metode, paksa=True)
+        durasi = time.perf_counter() - mulai
+    finally:
+        manager.close()
+    if not ringkasan:
+        raise RuntimeError(f"Impor dengan metode '{metode}' gagal.")
+    return durasi, ringkasan
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark impor: per_baris vs bulk.")
+    parser.add_argument('--karyawan', type=int, default=10000, help="Jumlah karyawan di log sintetis.")
+    parser.add_argument('--tanggal', default='2025-10-10', help="Tanggal absensi yang diimpor.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        file_log = os.path.join(folder, 'log.csv')
+        tulis_log(file_log, args.karyawan, args.tanggal)
+
+        hasil = {}
+        for metode in ['per_baris', 'bulk']:
+            db_file = os.path.join(folder, f'{metode}.db')
+            inisialisasi_database(db_file)
+            # Impor pertama (semua INSERT) lalu impor ulang (semua UPDATE)
+            hasil[metode] = [ukur_impor(db_file, file_log, args.tanggal, metode)[0] for _ in range(2)]
+
+    print(f"\n--- Hasil benchmark impor ({args.karyawan} karyawan) ---")
+    for metode, (baru, ulang) in hasil.items():
+        print(f"  {metode:<10} impor baru: {baru:.3f} s | impor ulang: {ulang:.3f} s")
+    print(f"  Percepatan bulk: {hasil['per_baris'][0] / hasil['bulk'][0]:.1f}x (baru), "
+          f"{hasil['per_baris'][1] / hasil['bulk'][1]:.1f}x (ulang)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""
+Membandingkan backend parser 'pandas' dan 'native' untuk file Excel:
+waktu (median), puncak memori Python (tracemalloc, diukur terpisah agar
+tidak memengaruhi waktu), dan apakah hasil kedua backend identik.
+
+Contoh:
+    python -m benchmark.bench_parser --karyawan 20000
+    python -m benchmark.bench_parser --file "10 OKT 2025_ABSENSI.xls"
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+
+from proses_absensi import proses_absensi_dari_file, BACKEND_PARSER
+from benchmark.generator import tulis_log
+
+
+def ukur_backend(file_log, backend, ulangan):
+    """
+    Mengembalikan (hasil DataFrame, dict ukuran) untuk satu backend.
+    """
+    durasi = []
+    for _ in range(ulangan):
+        mulai = time.perf_counter()
+        df = proses_absensi_dari_file(file_log, backend=backend)
+        durasi.append(time.perf_counter() - mulai)
+
+    tracemalloc.start()
+    proses_absensi_dari_file(file_log, backend=backend)
+    puncak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return df, {
+        'detik_median': statistics.median(durasi),
+        'detik_min': min(durasi),
+        'memori_puncak_mb': round(puncak / 1e6, 1),
+        'baris': len(df),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark backend parser: pandas vs native.")
+    parser.add_argument('--karyawan', type=int, default=20000, help="Jumlah karyawan di log sintetis.")
+    parser.add_argument('--file', help="Pakai file log yang sudah ada (.xls/.xlsx) alih-alih log sintetis.")
+    parser.add_argument('--ulangan', type=int, default=3, help="Ulangan per backend (dipakai median).")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        file_log = args.file or tulis_log(os.path.join(folder, 'log.xlsx'), args.karyawan)
+        hasil = {}
+        df_per_backend = {}
+        for backend in BACKEND_PARSER:
+            df_per_backend[backend], hasil[backend] = ukur_backend(file_log, backend, args.ulangan)
+
+    try:
+        pd.testing.assert_frame_equal(df_per_backend['pandas'], df_per_backend['native'])
+        identik = True
+    except AssertionError:
+        identik = False
+
+    laporan = {
+        'file': args.file or f'sintetis ({args.karyawan} karyawan, .xlsx)',
+        'backend': hasil,
+        'percepatan_native': round(hasil['pandas']['detik_median'] / hasil['native']['detik_median'], 2),
+        'hasil_identik': identik,
+    }
+    print(json.dumps(laporan, indent=2))
+    if not identik:
+        print("❌ Hasil backend native BERBEDA dengan pandas.", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
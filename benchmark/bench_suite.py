@@ -0,0 +1,218 @@
+"""
+Benchmark jalur-jalur utama aplikasi dengan hasil JSON, supaya hasil dua
+run bisa dibandingkan dan regresi performa ketahuan.
+
+Skenario:
+    parse_csv / parse_xlsx        proses_absensi_dari_file() (backend pandas)
+    parse_xlsx_native             proses_absensi_dari_file(backend='native')
+    impor_baru / impor_ulang      import_data_from_log() (semua INSERT / semua UPDATE)
+    get_absensi_data_for_ui       query tabel UI di database yang sudah terisi
+    cari_absensi                  query tabel UI dengan pencarian nama (FTS5)
+    get_rekap_absensi             rekap per karyawan
+    hitung_metrik_absensi         mesin metrik shift (NumPy) untuk rentang tanggal
+    deteksi_pelanggaran           deteksi pelanggaran otomatis (ulangan kedua dst. = deteksi ulang)
+    get_laporan_pelanggaran       laporan pelanggaran
+    ekspor_csv / ekspor_xlsx      ekspor_laporan() data absensi (streaming dari cursor)
+
+Contoh:
+    python -m benchmark.bench_suite --karyawan 2000 --hari 20 --output hasil.json
+    python -m benchmark.bench_suite --pembanding hasil.json
+"""
+import argparse
+import contextlib
+import datetime
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+from data_manager import DataManager
+from database_setup import inisialisasi_database
+from ekspor import ekspor_laporan
+from proses_absensi import proses_absensi_dari_file
+from benchmark.generator import tulis_log
+
+
+def ukur(fungsi, ulangan, siapkan=None):
+    """
+    Menjalankan fungsi() sebanyak ulangan kali dan mengembalikan dict waktu
+    (detik) serta jumlah baris hasil. siapkan() (opsional) dipanggil sebelum
+    setiap ulangan dan tidak ikut diukur.
+    """
+    durasi = []
+    hasil = None
+    for _ in range(ulangan):
+        if siapkan:
+            siapkan()
+        mulai = time.perf_counter()
+        hasil = fungsi()
+        durasi.append(time.perf_counter() - mulai)
+    if hasattr(hasil, '__len__') and not isinstance(hasil, dict):
+        baris = len(hasil)
+    elif isinstance(hasil, dict):
+        baris = next((hasil[k] for k in ('diproses', 'terdeteksi', 'baris') if k in hasil), None)
+    else:
+        baris = None
+    return {
+        'detik_min': min(durasi),
+        'detik_median': statistics.median(durasi),
+        'ulangan': ulangan,
+        'baris': baris,
+    }
+
+
+def _daftar_tanggal(tanggal_awal, jumlah_hari):
+    awal = datetime.date.fromisoformat(tanggal_awal)
+    return [(awal + datetime.timedelta(days=i)).isoformat() for i in range(jumlah_hari)]
+
+
+def isi_database(db_file, folder, jumlah_karyawan, daftar_tanggal):
+    """
+    Mengisi database dengan satu log per tanggal (isi log berbeda tiap hari)
+    dan pelanggaran sintetis untuk sekitar 5% catatan.
+    """
+    inisialisasi_database(db_file)
+    manager = DataManager(db_file)
+    try:
+        for i, tanggal in enumerate(daftar_tanggal):
+            file_log = tulis_log(os.path.join(folder, f'isi_{i}.csv'), jumlah_karyawan, tanggal, seed=i)
+            if not manager.import_data_from_log(file_log, tanggal):
+                raise RuntimeError(f"Gagal mengisi database untuk tanggal {tanggal}.")
+        manager.conn.execute("""
+            INSERT INTO Pelanggaran (record_id, waktu_mulai, waktu_selesai, catatan_pelanggaran)
+            SELECT record_id, jam_pulang, lembur_masuk, 'Pelanggaran sintetis (benchmark)'
+            FROM CatatanAbsensi WHERE record_id % 20 = 0
+        """)
+        manager.conn.commit()
+    finally:
+        manager.close()
+
+
+def jalankan_skenario(folder, jumlah_karyawan, jumlah_hari, ulangan):
+    """
+    Menjalankan semua skenario dan mengembalikan dict nama -> hasil ukur().
+    """
+    hasil = {}
+    daftar_tanggal = _daftar_tanggal('2025-01-01', jumlah_hari)
+    tanggal = daftar_tanggal[0]
+
+    # --- Parsing ---
+    log_csv = tulis_log(os.path.join(folder, 'log.csv'), jumlah_karyawan, tanggal)
+    log_xlsx = tulis_log(os.path.join(folder, 'log.xlsx'), jumlah_karyawan, tanggal)
+    hasil['parse_csv'] = ukur(lambda: proses_absensi_dari_file(log_csv), ulangan)
+    hasil['parse_xlsx'] = ukur(lambda: proses_absensi_dari_file(log_xlsx), ulangan)
+    hasil['parse_xlsx_native'] = ukur(lambda: proses_absensi_dari_file(log_xlsx, backend='native'), ulangan)
+
+    # --- Impor (database baru setiap ulangan, lalu impor ulang file yang sama) ---
+    db_impor = os.path.join(folder, 'impor.db')
+
+    def db_baru():
+        if os.path.exists(db_impor):
+            os.remove(db_impor)
+        inisialisasi_database(db_impor)
+
+    def impor():
+        manager = DataManager(db_impor)
+        try:
+            # paksa=True: impor ulang tetap ditulis (tidak dilewati ImportLog)
+            return manager.import_data_from_log(log_csv, tanggal, paksa=True)
+        finally:
+            manager.close()
+
+    hasil['impor_baru'] = ukur(impor, ulangan, siapkan=db_baru)
+    hasil['impor_ulang'] = ukur(impor, ulangan)
+
+    # --- Query laporan di database yang sudah terisi ---
+    db_isi = os.path.join(folder, 'isi.db')
+    isi_database(db_isi, folder, jumlah_karyawan, daftar_tanggal)
+    # Cache query dimatikan agar yang diukur adalah SQL-nya
+    manager = DataManager(db_isi, ukuran_cache=0)
+    try:
+        rentang = (daftar_tanggal[0], daftar_tanggal[-1])
+        for nama in ['get_absensi_data_for_ui', 'get_rekap_absensi', 'hitung_metrik_absensi',
+                     'deteksi_pelanggaran', 'get_laporan_pelanggaran']:
+            query = getattr(manager, nama)
+            hasil[nama] = ukur(lambda: query(*rentang), ulangan)
+        hasil['cari_absensi'] = ukur(lambda: manager.get_absensi_data_for_ui(*rentang, 'karyawan 0001'), ulangan)
+        for ext in ('csv', 'xlsx'):
+            file_ekspor = os.path.join(folder, f'ekspor.{ext}')
+            hasil[f'ekspor_{ext}'] = ukur(lambda: ekspor_laporan(manager, 'absensi', *rentang, file_ekspor), ulangan)
+    finally:
+        manager.close()
+    return hasil
+
+
+def bandingkan(hasil, pembanding, toleransi):
+    """
+    Membandingkan detik_median dengan hasil run sebelumnya.
+    Mengembalikan list pesan regresi (kosong = tidak ada regresi).
+    """
+    regresi = []
+    for nama, ukuran in hasil.items():
+        lama = pembanding.get(nama)
+        if not lama:
+            continue
+        rasio = ukuran['detik_median'] / lama['detik_median'] if lama['detik_median'] else 1.0
+        print(f"  {nama:<26} {lama['detik_median']:.4f} s -> {ukuran['detik_median']:.4f} s ({rasio:.2f}x)",
+              file=sys.stderr)
+        if rasio > 1 + toleransi:
+            regresi.append(f"{nama} melambat {rasio:.2f}x")
+    return regresi
+
+
+def main(argv=None):
+    """
+    argv: daftar argumen (default sys.argv[1:]); dipakai oleh 'python main.py bench'.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark jalur utama aplikasi absensi (hasil JSON).")
+    parser.add_argument('--karyawan', type=int, default=2000, help="Jumlah karyawan per log.")
+    parser.add_argument('--hari', type=int, default=20, help="Jumlah hari data di database laporan.")
+    parser.add_argument('--ulangan', type=int, default=3, help="Ulangan per skenario (dipakai median).")
+    parser.add_argument('--output', help="Simpan JSON ke file ini (default: cetak ke stdout).")
+    parser.add_argument('--pembanding', help="File JSON hasil run sebelumnya untuk dibandingkan.")
+    parser.add_argument('--toleransi', type=float, default=0.25,
+                        help="Perlambatan maksimum yang masih diterima (0.25 = 25%%).")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as folder:
+        # Pesan print dari DataManager dialihkan ke stderr agar stdout berisi JSON saja
+        with contextlib.redirect_stdout(sys.stderr):
+            skenario = jalankan_skenario(folder, args.karyawan, args.hari, args.ulangan)
+
+    laporan = {
+        'meta': {
+            'waktu': datetime.datetime.now().isoformat(timespec='seconds'),
+            'karyawan': args.karyawan,
+            'hari': args.hari,
+            'ulangan': args.ulangan,
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'platform': platform.platform(),
+        },
+        'skenario': skenario,
+    }
+    teks = json.dumps(laporan, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(teks + '\n')
+        print(f"✅ Hasil benchmark disimpan ke {args.output}", file=sys.stderr)
+    else:
+        print(teks)
+
+    if args.pembanding:
+        with open(args.pembanding, encoding='utf-8') as f:
+            pembanding = json.load(f)['skenario']
+        print("\n--- Perbandingan dengan run sebelumnya (median) ---", file=sys.stderr)
+        regresi = bandingkan(skenario, pembanding, args.toleransi)
+        if regresi:
+            print("❌ Regresi performa: " + "; ".join(regresi), file=sys.stderr)
+            sys.exit(1)
+        print("✅ Tidak ada regresi di atas toleransi.", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""
+Penjaga cache query DataManager (dekorator cache_query): method baca yang
+dipanggil dengan argumen keyword harus mengembalikan baris yang sama dengan
+panggilan posisional, dengan dan tanpa cache, dan kedua bentuk panggilan
+memakai entri cache yang sama. Gagal (exit code 1) jika ada yang berbeda.
+
+Contoh:
+    python -m benchmark.cek_cache_query
+"""
+import argparse
+import contextlib
+import os
+import sys
+import tempfile
+
+from data_manager import DataManager
+from database_setup import inisialisasi_database
+from benchmark.generator import tulis_log
+
+TANGGAL_AWAL = '2025-01-01'
+TANGGAL_AKHIR = '2025-01-03'
+
+
+def cek_manager(manager, cari):
+    """
+    Membandingkan panggilan posisional dan keyword untuk setiap method
+    ber-cache_query. Mengembalikan list pesan kegagalan.
+    """
+    gagal = []
+    rentang = (TANGGAL_AWAL, TANGGAL_AKHIR)
+    panggilan = {
+        'get_absensi_data_for_ui': [
+            lambda: manager.get_absensi_data_for_ui(*rentang, cari),
+            lambda: manager.get_absensi_data_for_ui(*rentang, cari=cari),
+            lambda: manager.get_absensi_data_for_ui(start_date=rentang[0], end_date=rentang[1], cari=cari),
+        ],
+        # Halaman pertama tabel UI (klik "Muat Data") juga lewat cache
+        'get_absensi_page': [
+            lambda: manager.get_absensi_page(*rentang, 50, None, cari),
+            lambda: manager.get_absensi_page(*rentang, page_size=50, cari=cari),
+        ],
+        'get_rekap_absensi': [
+            lambda: manager.get_rekap_absensi(*rentang),
+            lambda: manager.get_rekap_absensi(start_date=rentang[0], end_date=rentang[1]),
+        ],
+        'get_laporan_pelanggaran': [
+            lambda: manager.get_laporan_pelanggaran(*rentang),
+            lambda: manager.get_laporan_pelanggaran(rentang[0], end_date=rentang[1]),
+        ],
+    }
+    for nama, daftar in panggilan.items():
+        hasil = [fungsi() for fungsi in daftar]
+        if any(h != hasil[0] for h in hasil[1:]):
+            gagal.append(f"{nama}: hasil keyword berbeda dengan posisional")
+        if not hasil[0]:
+            gagal.append(f"{nama}: hasil kosong, data uji tidak cocok")
+
+    semua = manager.get_absensi_data_for_ui(*rentang)
+    if len(semua) <= len(manager.get_absensi_data_for_ui(*rentang, cari=cari)):
+        gagal.append("get_absensi_data_for_ui: filter cari= tidak mengurangi baris")
+    return gagal
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cek cache query DataManager (argumen keyword vs posisional).")
+    parser.add_argument('--karyawan', type=int, default=200, help="Jumlah karyawan di log uji.")
+    parser.add_argument('--cari', default='karyawan 0001', help="Teks pencarian yang diuji.")
+    args = parser.parse_args()
+
+    gagal = []
+    with tempfile.TemporaryDirectory() as folder, contextlib.redirect_stdout(sys.stderr):
+        db_file = os.path.join(folder, 'cek.db')
+        inisialisasi_database(db_file)
+        file_log = tulis_log(os.path.join(folder, 'log.csv'), args.karyawan, TANGGAL_AWAL, hari=3)
+        manager = DataManager(db_file)
+        try:
+            if not manager.import_data_from_log(file_log, deteksi_pelanggaran=True):
+                raise RuntimeError("Impor log uji gagal.")
+        finally:
+            manager.close()
+
+        for ukuran_cache in (0, 32):
+            manager = DataManager(db_file, ukuran_cache=ukuran_cache)
+            try:
+                gagal += [f"(ukuran_cache={ukuran_cache}) {p}" for p in cek_manager(manager, args.cari)]
+                statistik = manager.statistik_cache()
+            finally:
+                manager.close()
+            # Setiap method di atas hanya boleh miss sekali per rentang/argumen
+            if ukuran_cache and statistik['miss'] != 5:
+                gagal.append(f"panggilan keyword tidak memakai entri cache yang sama: {statistik}")
+
+    if gagal:
+        print("❌ Cache query tidak konsisten: " + "; ".join(gagal), file=sys.stderr)
+        sys.exit(1)
+    print("✅ Cache query konsisten (keyword = posisional).", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
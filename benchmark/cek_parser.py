@@ -0,0 +1,112 @@
+"""
+Uji paritas parser log absensi di atas log sintetis (benchmark.generator):
+untuk setiap file (.csv dan .xlsx, satu hari dan beberapa hari, dengan
+baris kosong pemisah dan jam bertitik) hasil parser vektor harus identik
+dengan parser loop lama, backend 'native' identik dengan 'pandas', dan
+iter_absensi_records (beberapa ukuran chunk) menghasilkan record yang sama.
+Log tambahan yang blok karyawan terakhirnya tidak berisi jam menguji
+pemangkasan baris kosong di akhir sheet.
+Gagal (exit code 1) jika ada DataFrame yang berbeda.
+
+Contoh:
+    python -m benchmark.cek_parser
+    python -m benchmark.cek_parser --karyawan 2000 --hari 5
+"""
+import argparse
+import contextlib
+import os
+import sys
+import tempfile
+
+import pandas as pd
+
+from proses_absensi import proses_absensi_dari_file, iter_absensi_records, KOLOM_OUTPUT
+from benchmark.generator import buat_baris_log, tulis_baris_log, tulis_log
+
+# Ukuran chunk iter_absensi_records yang diuji (kecil = banyak batas chunk)
+UKURAN_CHUNK = (7, 100, 5000)
+
+
+def bandingkan(nama, acuan, pembanding):
+    """
+    assert_frame_equal yang mengembalikan pesan kegagalan (atau None).
+    """
+    try:
+        pd.testing.assert_frame_equal(acuan, pembanding)
+    except AssertionError as e:
+        return f"{nama}: {e}"
+    return None
+
+
+def cek_file(file_log):
+    """
+    Membandingkan semua metode/backend untuk satu file log. Mengembalikan
+    (jumlah baris hasil, list pesan kegagalan).
+    """
+    vektor = proses_absensi_dari_file(file_log, metode='vektor')
+    hasil = {
+        'loop': proses_absensi_dari_file(file_log, metode='loop'),
+        'native': proses_absensi_dari_file(file_log, backend='native'),
+    }
+    for ukuran in UKURAN_CHUNK:
+        hasil[f'iter(chunk_rows={ukuran})'] = pd.DataFrame(
+            list(iter_absensi_records(file_log, ukuran)), columns=KOLOM_OUTPUT
+        )
+    gagal = [bandingkan(f"{os.path.basename(file_log)} vektor vs {nama}", vektor, df)
+             for nama, df in hasil.items()]
+    if vektor.empty:
+        gagal.append(f"{os.path.basename(file_log)}: hasil parser kosong")
+    return len(vektor), [g for g in gagal if g]
+
+
+def baris_akhir_kosong(jumlah_karyawan, seed, hari):
+    """
+    Isi log yang baris jam karyawan terakhirnya kosong (tanpa baris lain
+    sesudahnya), sehingga sheet diakhiri baris kosong.
+    """
+    baris = buat_baris_log(jumlah_karyawan, seed=seed, hari=hari)
+    idx_header = max(i for i, isi in enumerate(baris) if isi[0] == 'Work No:')
+    return baris[:idx_header + 1] + [[''] * len(baris[0])]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Uji paritas parser: loop vs vektor, pandas vs native.")
+    parser.add_argument('--karyawan', type=int, default=300, help="Jumlah karyawan per log.")
+    parser.add_argument('--hari', type=int, default=3, help="Jumlah hari untuk log beberapa hari.")
+    parser.add_argument('--seed', type=int, default=7, help="Seed generator log.")
+    args = parser.parse_args()
+
+    # Pastikan log uji memang berisi baris kosong pemisah
+    if not any(not any(sel) for sel in buat_baris_log(args.karyawan, seed=args.seed, hari=args.hari)):
+        print("❌ Log uji tidak berisi baris kosong pemisah; naikkan --karyawan atau ganti --seed.",
+              file=sys.stderr)
+        sys.exit(1)
+
+    gagal = []
+    with tempfile.TemporaryDirectory() as folder:
+        for ekstensi in ('.csv', '.xlsx'):
+            for hari in (1, args.hari):
+                file_log = tulis_log(os.path.join(folder, f'log_{hari}hari{ekstensi}'),
+                                     args.karyawan, seed=args.seed, hari=hari)
+                # Pesan print parser tidak ikut mengotori keluaran cek
+                with contextlib.redirect_stdout(sys.stderr):
+                    baris, pesan = cek_file(file_log)
+                gagal += pesan
+                status = '❌' if pesan else '✅'
+                print(f"{status} {os.path.basename(file_log)}: {baris} baris", file=sys.stderr)
+
+            file_log = tulis_baris_log(os.path.join(folder, f'log_akhir_kosong{ekstensi}'),
+                                       baris_akhir_kosong(args.karyawan, args.seed, args.hari))
+            with contextlib.redirect_stdout(sys.stderr):
+                baris, pesan = cek_file(file_log)
+            gagal += pesan
+            print(f"{'❌' if pesan else '✅'} {os.path.basename(file_log)}: {baris} baris", file=sys.stderr)
+
+    if gagal:
+        print("❌ Parser tidak identik:\n" + "\n".join(gagal), file=sys.stderr)
+        sys.exit(1)
+    print("✅ Paritas parser OK (loop = vektor, native = pandas, iter = vektor).", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
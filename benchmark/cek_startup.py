@@ -0,0 +1,110 @@
+"""
+Penjaga waktu startup: mengimpor modul aplikasi di proses Python baru
+dengan `-X importtime`, lalu gagal (exit code 1) jika
+- library berat (pandas, numpy, openpyxl, xlrd) ikut dimuat saat impor,
+- PySide6 ikut dimuat oleh modul tanpa GUI (misalnya CLI main), atau
+- total waktu impor melebihi batas.
+
+Library tersebut hanya boleh dimuat saat file log pertama kali di-parse.
+
+Contoh:
+    python -m benchmark.cek_startup
+    python -m benchmark.cek_startup --modul data_manager --batas-ms 200
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+# Paket yang tidak boleh dimuat saat aplikasi baru dibuka
+PAKET_BERAT = {'pandas', 'numpy', 'openpyxl', 'xlrd'}
+
+# Paket GUI: hanya boleh dimuat oleh modul di MODUL_GUI
+PAKET_GUI = {'PySide6'}
+MODUL_GUI = {'app_ui', 'ui_model', 'ui_worker'}
+
+# Modul yang dicek secara default dan batas waktu impornya (ms).
+# app_ui sudah termasuk PySide6, jadi batasnya lebih longgar.
+BATAS_DEFAULT_MS = {
+    'data_manager': 300,
+    'main': 300,
+    'app_ui': 1500,
+}
+
+FOLDER_PROYEK = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def ukur_impor(modul):
+    """
+    Mengimpor modul di proses baru dengan -X importtime.
+    paket_berat berisi paket terlarang yang ikut dimuat (PAKET_BERAT, dan
+    PAKET_GUI untuk modul di luar MODUL_GUI).
+    Mengembalikan dict {'total_ms', 'paket_berat', 'jumlah_modul'} atau
+    None jika modul gagal diimpor (misalnya PySide6 tidak terinstal).
+    """
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE='1')
+    hasil = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {modul}'],
+        cwd=FOLDER_PROYEK, env=env, capture_output=True, text=True
+    )
+    if hasil.returncode != 0:
+        print(f"⏭ Impor {modul} gagal, dilewati:\n{hasil.stderr.strip().splitlines()[-1]}", file=sys.stderr)
+        return None
+
+    terlarang = PAKET_BERAT if modul in MODUL_GUI else PAKET_BERAT | PAKET_GUI
+    total_us = 0
+    jumlah_modul = 0
+    paket_berat = set()
+    for baris in hasil.stderr.splitlines():
+        # Format: "import time: self [us] | cumulative | imported package"
+        if not baris.startswith('import time:') or 'cumulative' in baris:
+            continue
+        _, kumulatif, nama = baris[len('import time:'):].split('|')
+        jumlah_modul += 1
+        if not nama.startswith('  '):
+            # Modul level teratas: waktu kumulatifnya sudah termasuk anak-anaknya
+            total_us += int(kumulatif)
+        paket = nama.strip().split('.')[0]
+        if paket in terlarang:
+            paket_berat.add(paket)
+
+    return {
+        'total_ms': round(total_us / 1000, 1),
+        'paket_berat': sorted(paket_berat),
+        'jumlah_modul': jumlah_modul,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cek waktu impor modul aplikasi (startup).")
+    parser.add_argument('--modul', action='append',
+                        help="Modul yang dicek (boleh diulang). Default: data_manager, main, dan app_ui.")
+    parser.add_argument('--batas-ms', type=float,
+                        help="Batas total waktu impor (ms) untuk semua modul yang dicek.")
+    args = parser.parse_args()
+
+    daftar_modul = args.modul or list(BATAS_DEFAULT_MS)
+    laporan = {}
+    gagal = []
+    for modul in daftar_modul:
+        hasil = ukur_impor(modul)
+        if hasil is None:
+            continue
+        batas = args.batas_ms or BATAS_DEFAULT_MS.get(modul, 1000)
+        hasil['batas_ms'] = batas
+        laporan[modul] = hasil
+        if hasil['paket_berat']:
+            gagal.append(f"{modul} memuat {', '.join(hasil['paket_berat'])} saat diimpor")
+        if hasil['total_ms'] > batas:
+            gagal.append(f"{modul} butuh {hasil['total_ms']} ms (batas {batas} ms)")
+
+    print(json.dumps(laporan, indent=2))
+    if gagal:
+        print("❌ Startup regresi: " + "; ".join(gagal), file=sys.stderr)
+        sys.exit(1)
+    print("✅ Startup OK.", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
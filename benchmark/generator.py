@@ -0,0 +1,128 @@
+"""
+Generator log absensi sintetis untuk benchmark.
+
+Tata letaknya sama dengan export mesin absensi yang dibaca oleh
+proses_absensi_dari_file(): baris judul, lalu untuk setiap karyawan satu
+baris 'Work No:'/'Name:'/'Dept.:' (nilai di kolom 2, 6, 12) dan baris
+berikutnya berisi semua jam scan di kolom 1. Log beberapa hari (hari > 1)
+berisi satu blok per hari, masing-masing diawali baris periode 'Att. Time :'.
+
+Contoh:
+    python -m benchmark.generator 5000 log_5000.xlsx --tanggal 2025-10-10
+    python -m benchmark.generator 500 log_mingguan.csv --hari 7
+"""
+import argparse
+import csv
+import datetime
+import random
+
+# Lebar grid export mesin (jumlah kolom per baris)
+JUMLAH_KOLOM = 16
+
+# Pola scan per hari beserta bobot kemunculannya:
+# (jam masuk, jam pulang, lembur masuk, lembur pulang, anomali) -> jumlah scan
+POLA_SCAN = [
+    (2, 60),  # masuk + pulang (hari normal)
+    (4, 20),  # masuk + pulang + lembur
+    (1, 8),   # lupa scan pulang
+    (0, 5),   # tidak masuk
+    (3, 4),   # scan ganda di tengah hari
+    (6, 3),   # lembur + scan anomali
+]
+
+
+def _jam(rng, jam_awal, jam_akhir):
+    """
+    Jam acak 'HH:MM' di antara jam_awal dan jam_akhir.
+    Sesekali memakai titik ('07.55'), seperti beberapa mesin lama.
+    """
+    pemisah = '.' if rng.random() < 0.05 else ':'
+    return f"{rng.randint(jam_awal, jam_akhir - 1):02d}{pemisah}{rng.randint(0, 59):02d}"
+
+
+def _scan_harian(rng):
+    """
+    Mengembalikan teks scan satu karyawan untuk satu hari (jam disambung
+    tanpa spasi, seperti sel asli dari mesin).
+    """
+    jumlah = rng.choices([p[0] for p in POLA_SCAN], weights=[p[1] for p in POLA_SCAN])[0]
+    urutan_jam = [(6, 9), (16, 18), (18, 19), (19, 23), (10, 15), (12, 14)]
+    return ''.join(_jam(rng, awal, akhir) for awal, akhir in urutan_jam[:jumlah])
+
+
+def buat_baris_log(jumlah_karyawan, tanggal='2025-10-10', jumlah_departemen=20, seed=0, hari=1):
+    """
+    Membuat isi log sebagai list baris (list of str, lebar JUMLAH_KOLOM).
+    seed yang sama selalu menghasilkan log yang sama. hari > 1 membuat
+    satu blok per hari mulai dari tanggal.
+    """
+    rng = random.Random(seed)
+    kosong = [''] * JUMLAH_KOLOM
+    baris = [['Attendance Log Report'] + kosong[1:]]
+    tanggal_awal = datetime.date.fromisoformat(tanggal)
+    for h in range(hari):
+        tanggal_blok = (tanggal_awal + datetime.timedelta(days=h)).isoformat()
+        baris.append(['Att. Time :', '', f'{tanggal_blok} ~ {tanggal_blok}'] + kosong[3:])
+        for i in range(jumlah_karyawan):
+            header = kosong.copy()
+            header[0], header[2] = 'Work No:', str(i + 1)
+            header[4], header[6] = 'Name:', f'Karyawan {i + 1:05d}'
+            header[10], header[12] = 'Dept.:', f'Departemen {i % jumlah_departemen:02d}'
+            baris.append(header)
+            baris.append([''] + [_scan_harian(rng)] + kosong[2:])
+            # Sesekali ada baris kosong pemisah
+            if rng.random() < 0.05:
+                baris.append(kosong.copy())
+    return baris
+
+
+def tulis_log(file_path, jumlah_karyawan, tanggal='2025-10-10', jumlah_departemen=20, seed=0, hari=1):
+    """
+    Menulis log sintetis ke file_path. Format dipilih dari ekstensi:
+    .csv (latin1, seperti export CSV mesin) atau .xlsx (openpyxl).
+    File .xls tidak bisa ditulis tanpa pustaka tambahan; grid .xlsx-nya
+    sama persis, jadi simpan sebagai .xlsx lalu 'Save As' .xls bila perlu.
+    """
+    baris = buat_baris_log(jumlah_karyawan, tanggal, jumlah_departemen, seed, hari)
+    return tulis_baris_log(file_path, baris)
+
+
+def tulis_baris_log(file_path, baris):
+    """
+    Menulis isi log (list baris dari buat_baris_log(), boleh sudah diubah)
+    ke file_path dengan format sesuai ekstensi, seperti tulis_log().
+    """
+    ekstensi = file_path.lower().rsplit('.', 1)[-1]
+
+    if ekstensi == 'csv':
+        with open(file_path, 'w', newline='', encoding='latin1') as f:
+            csv.writer(f).writerows(baris)
+    elif ekstensi == 'xlsx':
+        import openpyxl
+        workbook = openpyxl.Workbook(write_only=True)
+        sheet = workbook.create_sheet()
+        for isi in baris:
+            # Work No disimpan sebagai angka, sel kosong sebagai sel kosong
+            sheet.append([int(sel) if sel.isdigit() else (sel or None) for sel in isi])
+        workbook.save(file_path)
+    else:
+        raise ValueError(f"Format log tidak didukung generator: .{ekstensi} (gunakan .csv atau .xlsx)")
+    return file_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Membuat log absensi sintetis.")
+    parser.add_argument('karyawan', type=int, help="Jumlah karyawan di log.")
+    parser.add_argument('file', help="File tujuan (.csv atau .xlsx).")
+    parser.add_argument('--tanggal', default='2025-10-10', help="Tanggal di judul log (hari pertama).")
+    parser.add_argument('--hari', type=int, default=1, help="Jumlah hari (blok tanggal) di log.")
+    parser.add_argument('--departemen', type=int, default=20, help="Jumlah departemen.")
+    parser.add_argument('--seed', type=int, default=0, help="Seed acak (hasil bisa diulang).")
+    args = parser.parse_args()
+
+    tulis_log(args.file, args.karyawan, args.tanggal, args.departemen, args.seed, args.hari)
+    print(f"✅ Log {args.karyawan} karyawan x {args.hari} hari ditulis ke {args.file}")
+
+
+if __name__ == '__main__':
+    main()
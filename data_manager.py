@@ -1,7 +1,401 @@
+import base64
+import datetime
+import functools
+import hashlib
+import inspect
+import json
+import os
+import re
 import sqlite3
-import pandas as pd
-from proses_absensi import proses_absensi_dari_file # Impor fungsi dari file kita sebelumnya
-from database_setup import NAMA_DATABASE # Impor nama DB agar konsisten
+import threading
+import time
+from collections import OrderedDict
+from contextlib import nullcontext
+# Catatan: pandas, proses_absensi (dan engine Excel-nya), metrik_absensi
+# (NumPy) serta process pool sengaja baru diimpor di dalam fungsi yang
+# memerlukannya, agar membuka UI (yang hanya butuh SQLite) tidak menunggu
+# library berat tersebut dimuat.
+# Jaga hal ini dengan: python -m benchmark.cek_startup
+from database_setup import NAMA_DATABASE, jalankan_migrasi # Impor nama DB agar konsisten
+from database_setup import rebuild_rekap_harian, cek_konsistensi_rekap
+from database_setup import kolom_menit_catatan, menit_dari_jam, jam_dari_menit, SQL_MENIT_DIKEMAS
+from instrumentasi import Instrumentasi, diukur, ENV_INSTRUMENTASI
+from koneksi import PoolKoneksi
+
+# Jumlah baris yang ditulis per executemany saat impor massal
+# (di antara batch, progres dilaporkan dan permintaan batal diperiksa)
+UKURAN_BATCH_IMPOR = 2000
+
+def _ringkasan_dilewati():
+    """
+    Ringkasan yang dikembalikan saat file sudah pernah diimpor (tidak
+    di-parse). Dibuat baru setiap kali karena list 'tanggal' bisa diubah
+    pemanggil. Kuncinya sama dengan ringkasan impor biasa.
+    """
+    return {
+        'diproses': 0, 'baru': 0, 'diperbarui': 0, 'dilewati': True, 'tanggal': [],
+        'master': {'departemen_baru': 0, 'karyawan_baru': 0, 'karyawan_diubah': 0, 'total': 0},
+    }
+
+# Backend parser untuk impor (lihat proses_absensi_dari_file): 'native'
+# membaca sel .xls/.xlsx langsung tanpa DataFrame perantara, hasilnya sama
+BACKEND_PARSER_IMPOR = 'native'
+
+# Jumlah maksimum hasil query yang disimpan di cache DataManager (LRU)
+UKURAN_CACHE_QUERY = 64
+
+# Data yang dimuat mesin metrik (metrik_absensi) untuk satu rentang tanggal:
+# tiga INTEGER per catatan, dibaca dari indeks ix_catatan_tanggal_jam saja.
+# Departemen diambil terpisah dari Karyawan (tanpa JOIN per catatan).
+SQL_MUAT_METRIK = f"""
+    SELECT record_id, work_no, {SQL_MENIT_DIKEMAS}
+    FROM CatatanAbsensi
+    WHERE tanggal_absensi BETWEEN ? AND ?
+"""
+
+# Rentang panjang dihitung mesin metrik per potongan sebanyak ini hari
+# (lihat agregat_metrik_absensi), agar array yang dimuat sekaligus tetap kecil
+HARI_PER_POTONGAN_METRIK = 31
+
+# Kolom metrik shift yang ditambahkan ke setiap baris get_rekap_absensi
+KOLOM_METRIK_REKAP = (
+    'total_menit_telat', 'hari_telat', 'total_menit_pulang_cepat',
+    'total_menit_kerja', 'total_menit_lembur',
+)
+
+# Rekap per karyawan dari tabel ringkasan RekapHarian (tanpa metrik shift)
+SQL_REKAP_ABSENSI = """
+    SELECT 
+        K.work_no,
+        K.nama_karyawan,
+        D.nama_departemen,
+        SUM(R.hadir) AS total_hari_masuk,
+        SUM(R.pending) AS total_pending,
+        SUM(R.anomali) AS total_anomali
+    FROM RekapHarian R
+    JOIN Karyawan K ON R.work_no = K.work_no
+    LEFT JOIN Departemen D ON K.dept_id = D.dept_id
+    WHERE R.tanggal_absensi BETWEEN ? AND ?
+    GROUP BY K.work_no, K.nama_karyawan, D.nama_departemen
+    ORDER BY K.nama_karyawan
+"""
+
+SQL_LAPORAN_PELANGGARAN = """
+    SELECT 
+        P.pelanggaran_id,
+        C.tanggal_absensi,
+        K.nama_karyawan,
+        D.nama_departemen,
+        P.waktu_mulai,
+        P.waktu_selesai,
+        P.catatan_pelanggaran,
+        P.kode_aturan
+    FROM Pelanggaran P
+    JOIN CatatanAbsensi C ON P.record_id = C.record_id
+    JOIN Karyawan K ON C.work_no = K.work_no
+    LEFT JOIN Departemen D ON K.dept_id = D.dept_id
+    WHERE C.tanggal_absensi BETWEEN ? AND ?
+    ORDER BY C.tanggal_absensi, K.nama_karyawan
+"""
+
+# Jumlah baris setiap jenis laporan (untuk progres ekspor), tanpa JOIN yang
+# tidak mengubah jumlah
+SQL_JUMLAH_LAPORAN = {
+    'absensi': "SELECT COUNT(*) FROM CatatanAbsensi WHERE tanggal_absensi BETWEEN ? AND ?",
+    'rekap': """
+        SELECT COUNT(DISTINCT R.work_no) FROM RekapHarian R
+        JOIN Karyawan K ON R.work_no = K.work_no
+        WHERE R.tanggal_absensi BETWEEN ? AND ?
+    """,
+    'pelanggaran': """
+        SELECT COUNT(*) FROM Pelanggaran P
+        JOIN CatatanAbsensi C ON P.record_id = C.record_id
+        WHERE C.tanggal_absensi BETWEEN ? AND ?
+    """,
+}
+
+# Aturan deteksi pelanggaran otomatis: (kode_aturan, SELECT). Setiap
+# SELECT menghasilkan (record_id, kode_aturan, waktu_mulai, waktu_selesai,
+# catatan_pelanggaran) untuk catatan yang melanggar, di tanggal-tanggal
+# {filter_tanggal}. :ambang_telat_menit (NULL = toleransi di JadwalShift)
+# adalah batas menit telat yang masih dianggap wajar.
+ATURAN_PELANGGARAN = [
+    # Scan masuk ada, scan pulang tidak ada
+    ('tidak_scan_pulang', """
+        SELECT C.record_id, 'tidak_scan_pulang', C.jam_masuk, NULL, 'Tidak scan pulang'
+        FROM CatatanAbsensi C
+        WHERE {filter_tanggal}
+          AND C.jam_masuk_menit IS NOT NULL AND C.jam_pulang_menit IS NULL
+    """),
+    # Telat melebihi ambang; jadwal departemen, atau jadwal default.
+    # Selisih dihitung di rentang [-12 jam, 12 jam) seperti metrik_absensi.
+    ('telat', """
+        SELECT record_id, 'telat', printf('%02d:%02d', shift_masuk / 60, shift_masuk % 60),
+               jam_masuk, 'Telat ' || telat || ' menit'
+        FROM (
+            SELECT C.record_id, C.jam_masuk,
+                   IFNULL(JD.jam_masuk_menit, J0.jam_masuk_menit) AS shift_masuk,
+                   IFNULL(JD.toleransi_telat_menit, J0.toleransi_telat_menit) AS toleransi,
+                   (C.jam_masuk_menit - IFNULL(JD.jam_masuk_menit, J0.jam_masuk_menit) + 3600) % 1440 - 720 AS telat
+            FROM CatatanAbsensi C
+            LEFT JOIN Karyawan K ON C.work_no = K.work_no
+            LEFT JOIN JadwalShift JD ON JD.dept_id = K.dept_id
+            JOIN JadwalShift J0 ON J0.dept_id IS NULL
+            WHERE {filter_tanggal} AND C.jam_masuk_menit IS NOT NULL
+        )
+        WHERE telat > IFNULL(:ambang_telat_menit, toleransi)
+    """),
+    # Scan tambahan (ScanAnomali) setelah jam pulang dan sebelum lembur
+    # masuk (atau setelah jam pulang saja jika tidak ada lembur)
+    ('scan_anomali', """
+        SELECT record_id, 'scan_anomali', MIN(jam), MAX(jam),
+               'Scan anomali antara pulang dan lembur: ' || group_concat(jam, ', ')
+        FROM (
+            SELECT C.record_id, printf('%02d:%02d', S.menit / 60, S.menit % 60) AS jam
+            FROM CatatanAbsensi C
+            JOIN ScanAnomali S ON S.record_id = C.record_id
+            WHERE {filter_tanggal} AND C.jam_pulang_menit IS NOT NULL
+              AND (S.menit - C.jam_pulang_menit + 1440) % 1440 > 0
+              AND (C.lembur_masuk_menit IS NULL
+                   OR (S.menit - C.jam_pulang_menit + 1440) % 1440
+                      < (C.lembur_masuk_menit - C.jam_pulang_menit + 1440) % 1440)
+            ORDER BY C.record_id, S.urutan
+        )
+        GROUP BY record_id
+    """),
+]
+
+# Kolom dan JOIN yang dipakai semua query data absensi untuk UI
+SQL_PILIH_ABSENSI = """
+    SELECT 
+        C.record_id,
+        C.tanggal_absensi,
+        C.work_no,
+        K.nama_karyawan,
+        D.nama_departemen,
+        C.jam_masuk,
+        C.jam_pulang,
+        C.lembur_masuk,
+        C.lembur_pulang,
+        C.waktu_anomali,
+        C.status_validasi,
+        C.catatan_editor,
+        C.menit_kerja,
+        C.menit_lembur
+    FROM CatatanAbsensi C
+    JOIN Karyawan K ON C.work_no = K.work_no
+    LEFT JOIN Departemen D ON K.dept_id = D.dept_id
+"""
+
+# Filter pencarian nama karyawan / departemen lewat indeks FTS5 CariKaryawan
+# (rowid = work_no), ditambahkan setelah syarat tanggal di query absensi
+SQL_FILTER_CARI = """
+    AND C.work_no IN (SELECT rowid FROM CariKaryawan WHERE CariKaryawan MATCH ?)
+"""
+
+def _query_cari(cari):
+    """
+    Mengubah teks dari kotak pencarian menjadi query FTS5: setiap kata
+    menjadi pencarian awalan ("bud"*) dan semua kata harus cocok. Hanya
+    huruf/angka yang dipakai, jadi input pengguna tidak bisa merusak
+    sintaks MATCH. Mengembalikan None jika tidak ada kata yang dicari.
+    """
+    kata = re.findall(r'\w+', cari or '')
+    if not kata:
+        return None
+    return ' '.join(f'"{k}"*' for k in kata)
+
+def _filter_cari(cari):
+    """
+    (SQL tambahan, parameter tambahan) untuk query absensi: kosong jika
+    tidak ada yang dicari.
+    """
+    query = _query_cari(cari)
+    if query is None:
+        return "", ()
+    return SQL_FILTER_CARI, (query,)
+
+def _buat_cursor_halaman(baris_terakhir, total):
+    """
+    Mengemas posisi baris terakhir (tanggal, nama, record_id) dan total baris
+    menjadi string cursor yang opaque (base64 dari JSON).
+    """
+    isi = [baris_terakhir['tanggal_absensi'], baris_terakhir['nama_karyawan'],
+           baris_terakhir['record_id'], total]
+    return base64.urlsafe_b64encode(json.dumps(isi).encode('utf-8')).decode('ascii')
+
+def _baca_cursor_halaman(cursor_halaman):
+    """
+    Kebalikan _buat_cursor_halaman(). Melempar ValueError jika cursor rusak.
+    """
+    try:
+        tanggal, nama, record_id, total = json.loads(base64.urlsafe_b64decode(cursor_halaman))
+        return str(tanggal), str(nama), int(record_id), int(total)
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Cursor halaman tidak valid: {cursor_halaman!r}") from e
+
+def hitung_hash_file(file_path):
+    """
+    Menghitung hash SHA-256 isi file (dibaca per 1 MB) sebagai kunci ImportLog
+    dan cache parse. Nama file tidak berpengaruh, hanya isinya.
+    """
+    h = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for blok in iter(lambda: f.read(1024 * 1024), b''):
+            h.update(blok)
+    return h.hexdigest()
+
+def parse_file_dengan_cache(file_path, file_hash, cache_dir=None, backend=BACKEND_PARSER_IMPOR):
+    """
+    Memanggil proses_absensi_dari_file(), dengan cache DataFrame hasil parse
+    di disk (pickle) jika cache_dir diisi. Kunci cache adalah hash isi file
+    dan VERSI_PARSER, sehingga perubahan parser otomatis membuat cache baru.
+    Fungsi level-modul agar bisa dijalankan di process pool.
+    """
+    from proses_absensi import proses_absensi_dari_file, VERSI_PARSER
+
+    if not cache_dir:
+        return proses_absensi_dari_file(file_path, backend=backend)
+
+    path_cache = os.path.join(cache_dir, f"{file_hash}-v{VERSI_PARSER}.pkl")
+    if os.path.exists(path_cache):
+        try:
+            import pandas as pd
+            return pd.read_pickle(path_cache)
+        except Exception as e:
+            print(f"WARNING: Cache parse rusak, file di-parse ulang. ({e})")
+
+    df_absensi = proses_absensi_dari_file(file_path, backend=backend)
+    if not df_absensi.empty:
+        os.makedirs(cache_dir, exist_ok=True)
+        df_absensi.to_pickle(path_cache)
+    return df_absensi
+
+def parse_file_terukur(file_path, file_hash, cache_dir=None, backend=BACKEND_PARSER_IMPOR):
+    """
+    parse_file_dengan_cache() yang juga mengembalikan lama parsing (detik),
+    agar waktu parse di process pool tetap bisa dicatat instrumentasi.
+    """
+    mulai = time.perf_counter()
+    df_absensi = parse_file_dengan_cache(file_path, file_hash, cache_dir, backend)
+    return df_absensi, time.perf_counter() - mulai
+
+def cache_query(fungsi):
+    """
+    Dekorator untuk method baca DataManager dengan argumen (start_date,
+    end_date, ...). Hasilnya disimpan di cache LRU DataManager dengan kunci
+    (nama method, argumen) dan dibuang saat data di rentang tanggal itu
+    berubah.
+
+    Argumen keyword dan default disamakan dulu dengan urutan parameter,
+    jadi f(a, b, cari='x') dan f(a, b, 'x') memakai entri cache yang sama
+    (dan start_date/end_date selalu di posisi 0 dan 1 kunci).
+    """
+    tanda_tangan = inspect.signature(fungsi)
+
+    @functools.wraps(fungsi)
+    def pembungkus(self, *args, **kwargs):
+        terikat = tanda_tangan.bind(self, *args, **kwargs)
+        terikat.apply_defaults()
+        kunci_args = tuple(terikat.arguments.values())[1:]
+        return self._ambil_dari_cache(fungsi.__name__, kunci_args, lambda: fungsi(self, *args, **kwargs))
+    return pembungkus
+
+def _salin_hasil(hasil):
+    """
+    Salinan hasil query untuk disimpan/dikembalikan cache: list baris
+    (dict) disalin per baris; dict (halaman get_absensi_page) disalin per
+    nilai, sehingga pemanggil bebas mengubah hasilnya.
+    """
+    if isinstance(hasil, dict):
+        return {k: _salin_hasil(v) if isinstance(v, (list, dict)) else v for k, v in hasil.items()}
+    return [dict(baris) for baris in hasil]
+
+def penulis_tunggal(fungsi):
+    """
+    Dekorator method yang menulis lewat koneksi penulis (self.conn):
+    hanya satu thread yang boleh menulis dalam satu waktu.
+    """
+    @functools.wraps(fungsi)
+    def pembungkus(self, *args, **kwargs):
+        with self.pool.kunci_penulis:
+            return fungsi(self, *args, **kwargs)
+    return pembungkus
+
+class ImporDibatalkan(Exception):
+    """
+    Dilempar di dalam impor saat pengguna meminta pembatalan.
+    Transaksi yang sedang berjalan akan di-rollback.
+    """
+    pass
+
+class CacheMaster:
+    """
+    Identity cache data master untuk satu transaksi impor: nama departemen
+    -> dept_id dan work_no -> (nama, dept_id), dimuat sekali (dua SELECT)
+    lewat cursor penulis. Setiap baris log lalu dicek di memori; hanya
+    departemen baru, karyawan baru, dan karyawan yang nama/departemennya
+    berubah yang ditulis ke database.
+
+    Cache hanya berlaku selama transaksi yang memuatnya: setelah rollback,
+    dept_id yang baru dibuat tidak ada lagi di database.
+    """
+    def __init__(self, cursor):
+        self.cursor = cursor
+        cursor.execute("SELECT dept_id, nama_departemen FROM Departemen")
+        self.departemen = {row[1]: row[0] for row in cursor.fetchall()}
+        cursor.execute("SELECT work_no, nama_karyawan, dept_id FROM Karyawan")
+        self.karyawan = {row[0]: (row[1], row[2]) for row in cursor.fetchall()}
+        # Jumlah data master yang ditulis (dilaporkan di ringkasan impor)
+        self.perubahan = {'departemen_baru': 0, 'karyawan_baru': 0, 'karyawan_diubah': 0}
+
+    def dept_id(self, nama_dept):
+        """
+        dept_id untuk nama departemen; departemen yang belum ada dibuat.
+        """
+        if not nama_dept:
+            return None
+        dept_id = self.departemen.get(nama_dept)
+        if dept_id is None:
+            self.cursor.execute("INSERT INTO Departemen (nama_departemen) VALUES (?)", (nama_dept,))
+            dept_id = self.departemen[nama_dept] = self.cursor.lastrowid
+            self.perubahan['departemen_baru'] += 1
+        return dept_id
+
+    def sinkron_karyawan(self, daftar_karyawan):
+        """
+        Menyamakan Karyawan dengan daftar (work_no, nama, dept_id): INSERT
+        yang belum ada, UPDATE yang nama/dept_id-nya berbeda, sisanya tidak
+        ditulis. work_no yang muncul berkali-kali: yang terakhir menang.
+        """
+        terbaru = {no: (nama, dept_id) for no, nama, dept_id in daftar_karyawan}
+        baru, diubah = [], []
+        for no, nilai in terbaru.items():
+            lama = self.karyawan.get(no)
+            if lama is None:
+                baru.append((no, *nilai))
+            elif lama != nilai:
+                diubah.append((*nilai, no))
+            else:
+                continue
+            self.karyawan[no] = nilai
+
+        if baru:
+            self.cursor.executemany(
+                "INSERT INTO Karyawan (work_no, nama_karyawan, dept_id) VALUES (?, ?, ?)", baru
+            )
+        if diubah:
+            self.cursor.executemany(
+                "UPDATE Karyawan SET nama_karyawan = ?, dept_id = ? WHERE work_no = ?", diubah
+            )
+        self.perubahan['karyawan_baru'] += len(baru)
+        self.perubahan['karyawan_diubah'] += len(diubah)
+
+    def ringkasan(self):
+        """
+        Jumlah perubahan data master, ditambah 'total'.
+        """
+        return {**self.perubahan, 'total': sum(self.perubahan.values())}
 
 class DataManager:
     """
@@ -10,16 +404,46 @@ class DataManager:
     atau mengambil data dari database untuk ditampilkan ke UI,
     ada di sini.
     """
-    def __init__(self, db_file=NAMA_DATABASE):
+    def __init__(self, db_file=NAMA_DATABASE, cache_dir=None, ukuran_cache=UKURAN_CACHE_QUERY,
+                 instrumentasi=None, opsi_koneksi=None, backend_parser=BACKEND_PARSER_IMPOR):
         """
         Membuka koneksi ke database saat objek DataManager dibuat.
+        cache_dir (opsional): folder cache DataFrame hasil parse, agar impor
+        ulang file yang sama tidak perlu mem-parse Excel lagi.
+        ukuran_cache: jumlah maksimum hasil query yang disimpan (0 = tanpa cache).
+        instrumentasi (opsional): objek Instrumentasi untuk mencatat waktu
+        method, SQL, dan query lambat. Jika None, dinyalakan otomatis bila
+        environment variable ABSENSI_INSTRUMENTASI berisi ambang (detik).
+        opsi_koneksi (opsional): dict untuk PoolKoneksi, misalnya
+        {'ukuran_cache_kb': ..., 'ukuran_mmap': ..., 'busy_timeout_ms': ...}.
+        backend_parser: 'native' (default) atau 'pandas', untuk membaca file log.
+
+        Penulisan memakai satu koneksi penulis (self.conn); laporan dibaca
+        lewat koneksi pembaca milik masing-masing thread (self.pool.pembaca()).
         """
+        if instrumentasi is None and os.environ.get(ENV_INSTRUMENTASI):
+            instrumentasi = Instrumentasi(ambang_lambat=float(os.environ[ENV_INSTRUMENTASI]))
+        self.instrumentasi = instrumentasi
+        self.db_file = db_file
+        self.cache_dir = cache_dir
+        self.backend_parser = backend_parser
+        # Cache hasil query baca: kunci (nama method, argumen) -> list of dict
+        self.ukuran_cache = ukuran_cache
+        self._cache_query = OrderedDict()
+        self._kunci_cache = threading.Lock()
+        self._statistik_cache = {'hit': 0, 'miss': 0, 'dibuang': 0}
+        # Naik setiap kali DataManager ini menulis data
+        self.versi_data = 0
+        # PRAGMA data_version terakhir, untuk mendeteksi tulisan dari koneksi lain
+        self._data_version_db = None
         try:
-            self.conn = sqlite3.connect(db_file)
-            # Menggunakan Row Factory agar hasil SELECT bisa diakses seperti dictionary
-            self.conn.row_factory = sqlite3.Row 
-            # Mengaktifkan foreign key
-            self.conn.execute("PRAGMA foreign_keys = ON;")
+            # WAL, foreign key, cache, dll. diatur oleh PoolKoneksi;
+            # hasil SELECT memakai Row Factory (bisa diakses seperti dictionary)
+            self.pool = PoolKoneksi(db_file, instrumentasi=self.instrumentasi, **(opsi_koneksi or {}))
+            self.conn = self.pool.penulis
+            # Upgrade skema (tabel, indeks) file database lama secara langsung
+            if not jalankan_migrasi(self.conn):
+                print("WARNING: Skema database belum terbaru, beberapa fitur bisa gagal.")
             print(f"DataManager terhubung ke {db_file}")
         except sqlite3.Error as e:
             print(f"Error koneksi ke database: {e}")
@@ -27,53 +451,138 @@ class DataManager:
 
     def close(self):
         """
-        Menutup koneksi database.
+        Menutup semua koneksi database (penulis dan pembaca).
         """
         if self.conn:
-            self.conn.close()
+            self.pool.tutup()
             print("Koneksi DataManager ditutup.")
 
-    def _get_or_create_departemen(self, nama_dept):
+    # --- Instrumentasi ---
+
+    def _ukur_tahap(self, nama):
         """
-        Fungsi helper untuk memeriksa/membuat departemen.
-        Mengembalikan (dept_id).
+        Context manager pengukur tahap ('parse', 'db'); tanpa efek jika
+        instrumentasi tidak aktif.
         """
-        if not nama_dept:
+        if self.instrumentasi is None:
+            return nullcontext()
+        return self.instrumentasi.ukur_tahap(nama)
+
+    def statistik_instrumentasi(self):
+        """
+        Statistik waktu per method, per statement SQL, per tahap, dan log
+        query lambat (lihat Instrumentasi.statistik()), atau None jika
+        instrumentasi tidak aktif.
+        """
+        if self.instrumentasi is None:
             return None
-        
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT dept_id FROM Departemen WHERE nama_departemen = ?", (nama_dept,))
-        hasil = cursor.fetchone()
-        
-        if hasil:
-            return hasil['dept_id'] # Kembalikan ID jika sudah ada
-        else:
-            # Jika tidak ada, buat baru
-            cursor.execute("INSERT INTO Departemen (nama_departemen) VALUES (?)", (nama_dept,))
-            return cursor.lastrowid # Kembalikan ID yang baru dibuat
+        return self.instrumentasi.statistik()
+
+    # --- Cache hasil query ---
 
-    def _sync_karyawan(self, work_no, nama, dept_id):
+    def _ambil_dari_cache(self, nama, args, ambil_data):
         """
-        Fungsi helper untuk sinkronisasi data karyawan.
-        Jika baru -> INSERT. Jika lama -> UPDATE (untuk jaga-jaga jika nama/dept ganti).
+        Mengembalikan salinan hasil query dari cache jika ada; jika tidak,
+        menjalankan ambil_data() dan menyimpannya (entri tertua dibuang
+        saat cache penuh).
         """
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT * FROM Karyawan WHERE work_no = ?", (work_no,))
-        hasil = cursor.fetchone()
-        
-        if hasil:
-            # Karyawan sudah ada, lakukan UPDATE
-            cursor.execute("""
-                UPDATE Karyawan 
-                SET nama_karyawan = ?, dept_id = ? 
-                WHERE work_no = ?
-            """, (nama, dept_id, work_no))
-        else:
-            # Karyawan baru, lakukan INSERT
-            cursor.execute("""
-                INSERT INTO Karyawan (work_no, nama_karyawan, dept_id) 
-                VALUES (?, ?, ?)
-            """, (work_no, nama, dept_id))
+        if self.ukuran_cache <= 0:
+            return ambil_data()
+        self._cek_perubahan_eksternal()
+
+        kunci = (nama, args)
+        with self._kunci_cache:
+            if kunci in self._cache_query:
+                self._cache_query.move_to_end(kunci)
+                self._statistik_cache['hit'] += 1
+                return _salin_hasil(self._cache_query[kunci])
+            self._statistik_cache['miss'] += 1
+            versi_awal = self.versi_data
+
+        data = ambil_data()
+        with self._kunci_cache:
+            # Jangan simpan hasil yang mungkin sudah basi karena ada penulisan di tengah jalan
+            if self.versi_data == versi_awal:
+                self._cache_query[kunci] = _salin_hasil(data)
+                while len(self._cache_query) > self.ukuran_cache:
+                    self._cache_query.popitem(last=False)
+                    self._statistik_cache['dibuang'] += 1
+        return data
+
+    def _cek_perubahan_eksternal(self):
+        """
+        PRAGMA data_version berubah jika koneksi LAIN (misalnya worker impor
+        di thread terpisah) meng-commit perubahan. Karena tanggal yang
+        berubah tidak diketahui, seluruh cache dikosongkan.
+
+        data_version dibaca lewat koneksi penulis (nilainya hanya bisa
+        dibandingkan pada koneksi yang sama), jadi harus memegang
+        kunci_penulis. Jika penulis sedang dipakai thread lain (misalnya
+        impor yang panjang), cek dilewati agar pembaca tidak ikut menunggu:
+        perubahan data_version tetap terdeteksi pada cek berikutnya, dan
+        tulisan DataManager ini sendiri sudah membuang cache lewat
+        _data_berubah().
+        """
+        if not self.pool.kunci_penulis.acquire(blocking=False):
+            return
+        try:
+            versi = self.conn.execute("PRAGMA data_version").fetchone()[0]
+            if self._data_version_db is not None and versi != self._data_version_db:
+                self._data_berubah()
+            self._data_version_db = versi
+        finally:
+            self.pool.kunci_penulis.release()
+
+    def _data_berubah(self, daftar_tanggal=None):
+        """
+        Dipanggil setelah setiap penulisan (impor, validasi, rebuild).
+        Menaikkan versi_data dan membuang entri cache yang rentang
+        tanggalnya mencakup salah satu tanggal di daftar_tanggal
+        (None = buang semua).
+        """
+        with self._kunci_cache:
+            self.versi_data += 1
+            for kunci in list(self._cache_query):
+                args = kunci[1]
+                if daftar_tanggal is None or len(args) < 2 or any(
+                        str(args[0]) <= str(tanggal) <= str(args[1]) for tanggal in daftar_tanggal):
+                    del self._cache_query[kunci]
+
+    def kosongkan_cache(self):
+        """
+        Membuang seluruh hasil query yang tersimpan di cache.
+        """
+        with self._kunci_cache:
+            self._cache_query.clear()
+
+    def statistik_cache(self):
+        """
+        Mengembalikan statistik cache query: hit, miss, dibuang (karena
+        penuh), rasio_hit, jumlah entri, dan versi_data saat ini.
+        """
+        total = self._statistik_cache['hit'] + self._statistik_cache['miss']
+        return {
+            **self._statistik_cache,
+            'rasio_hit': self._statistik_cache['hit'] / total if total else 0.0,
+            'entri': len(self._cache_query),
+            'versi_data': self.versi_data,
+        }
+
+    def _get_or_create_departemen(self, nama_dept, master):
+        """
+        Fungsi helper untuk memeriksa/membuat departemen lewat identity
+        cache master (CacheMaster), tanpa SELECT per baris.
+        Mengembalikan (dept_id).
+        """
+        return master.dept_id(nama_dept)
+
+    def _sync_karyawan(self, work_no, nama, dept_id, master):
+        """
+        Fungsi helper untuk sinkronisasi data karyawan lewat identity cache
+        master. Jika baru -> INSERT. Jika nama/dept ganti -> UPDATE.
+        Jika sama -> tidak ada yang ditulis.
+        """
+        master.sinkron_karyawan([(work_no, nama, dept_id)])
 
     def _upsert_catatan_absensi(self, data_absensi):
         """
@@ -101,6 +610,9 @@ class DataManager:
             data_absensi['waktu_anomali'] if data_absensi['waktu_anomali'] != 'N/A' else None,
             'PENDING' # Status default saat pertama kali di-upload
         )
+        # Jam dinormalisasi ke 'HH:MM' + kolom menit & durasi
+        teks, menit, anomali = kolom_menit_catatan(*data_tuple[2:7])
+        data_tuple = data_tuple[:2] + teks + data_tuple[7:]
 
         if hasil:
             # SUDAH ADA: Lakukan UPDATE
@@ -108,47 +620,462 @@ class DataManager:
             cursor.execute("""
                 UPDATE CatatanAbsensi
                 SET jam_masuk = ?, jam_pulang = ?, lembur_masuk = ?, 
-                    lembur_pulang = ?, waktu_anomali = ?, status_validasi = 'PENDING'
+                    lembur_pulang = ?, waktu_anomali = ?, status_validasi = 'PENDING',
+                    jam_masuk_menit = ?, jam_pulang_menit = ?, lembur_masuk_menit = ?,
+                    lembur_pulang_menit = ?, menit_kerja = ?, menit_lembur = ?
                 WHERE record_id = ?
-            """, (data_tuple[2], data_tuple[3], data_tuple[4], data_tuple[5], data_tuple[6], record_id))
+            """, teks + menit + (record_id,))
         else:
             # BELUM ADA: Lakukan INSERT
             cursor.execute("""
                 INSERT INTO CatatanAbsensi 
-                (work_no, tanggal_absensi, jam_masuk, jam_pulang, lembur_masuk, lembur_pulang, waktu_anomali, status_validasi)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """, data_tuple)
+                (work_no, tanggal_absensi, jam_masuk, jam_pulang, lembur_masuk, lembur_pulang, waktu_anomali, status_validasi,
+                 jam_masuk_menit, jam_pulang_menit, lembur_masuk_menit, lembur_pulang_menit, menit_kerja, menit_lembur)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, data_tuple + menit)
             record_id = cursor.lastrowid
+
+        # Scan anomali (trigger sudah membuang scan lama jika teksnya berubah)
+        cursor.executemany("""
+            INSERT INTO ScanAnomali (record_id, urutan, menit) VALUES (?, ?, ?)
+            ON CONFLICT (record_id, urutan) DO NOTHING
+        """, [(record_id, urutan, m) for urutan, m in enumerate(anomali)])
         
         return record_id
 
-    def import_data_from_log(self, file_path, tanggal_absensi):
+    @diukur
+    @penulis_tunggal
+    def import_data_from_log(self, file_path, tanggal_absensi=None, metode='bulk',
+                             progress_callback=None, cek_batal=None, paksa=False,
+                             tanggal_dari_file=True, deteksi_pelanggaran=False):
         """
         FUNGSI UTAMA UNTUK UI:
         1. Memproses file log.
         2. Sinkronisasi master data (Karyawan, Departemen).
         3. Memasukkan data absensi ke database.
+
+        metode='bulk' (default) menulis semua baris sekaligus dengan
+        executemany + INSERT ... ON CONFLICT DO UPDATE. metode='per_baris'
+        adalah jalur lama (SELECT lalu INSERT/UPDATE untuk setiap baris).
+
+        progress_callback(tahap, jumlah, total) dipanggil setelah parsing
+        (tahap 'parse') dan setelah setiap batch ditulis (tahap 'tulis').
+        cek_batal() dipanggil di antara batch; jika mengembalikan True,
+        seluruh impor di-rollback.
+
+        Log bisa berisi beberapa hari: tanggal setiap record diambil dari
+        baris periode/tanggal di atasnya (kolom 'Tanggal' hasil parse), dan
+        semua hari ditulis dalam satu transaksi. tanggal_absensi dipakai
+        untuk record yang tanggalnya tidak terdeteksi; dengan
+        tanggal_dari_file=False, tanggal_absensi dipakai untuk semua record.
+
+        File yang isinya (hash SHA-256) sudah pernah diimpor untuk tanggal
+        yang sama dilewati tanpa parsing, kecuali paksa=True.
+
+        Dengan deteksi_pelanggaran=True, pelanggaran di tanggal-tanggal yang
+        diimpor dideteksi ulang (lihat deteksi_pelanggaran) dalam transaksi
+        impor yang sama; hasilnya ada di ringkasan['pelanggaran'].
+
+        Data master (departemen/karyawan) hanya ditulis jika baru atau
+        berubah (lihat CacheMaster); jumlahnya ada di ringkasan['master'].
+
+        Mengembalikan dict ringkasan {'diproses', 'baru', 'diperbarui',
+        'dilewati', 'tanggal', 'master'} jika sukses, atau False jika
+        gagal/dibatalkan.
+        """
+        print(f"Memulai impor dari {file_path} untuk tanggal {tanggal_absensi or '(dari file)'}...")
+        try:
+            file_hash = hitung_hash_file(file_path)
+        except OSError as e:
+            print(f"❌ Impor GAGAL: {e}")
+            return False
+        if not paksa and self._sudah_diimpor(file_hash, tanggal_absensi):
+            print("⏭ File ini sudah pernah diimpor untuk tanggal tersebut, dilewati.")
+            return _ringkasan_dilewati()
+
+        if metode == 'per_baris':
+            return self._import_data_per_baris(file_path, tanggal_absensi, tanggal_dari_file, file_hash)
+
+        # 1. Proses file log (atau ambil dari cache parse di disk)
+        with self._ukur_tahap('parse'):
+            df_absensi = parse_file_dengan_cache(file_path, file_hash, self.cache_dir, self.backend_parser)
+
+        # 2. Tulis semua baris dalam satu transaksi
+        with self._ukur_tahap('db'):
+            return self._tulis_hasil_parse(
+                df_absensi, tanggal_absensi, progress_callback, cek_batal,
+                file_path=file_path, file_hash=file_hash, tanggal_dari_file=tanggal_dari_file,
+                deteksi_pelanggaran=deteksi_pelanggaran
+            )
+
+    @diukur
+    @penulis_tunggal
+    def import_batch(self, file_paths, tanggal_absensi=None, max_workers=None,
+                     progress_callback=None, cek_batal=None, paksa=False,
+                     tanggal_dari_file=True, deteksi_pelanggaran=False):
+        """
+        FUNGSI UNTUK UI (UPLOAD BANYAK FILE):
+        Mem-parse banyak file log secara paralel di process pool (parsing
+        Excel adalah bagian yang berat di CPU), lalu hasilnya ditulis satu
+        per satu lewat koneksi ini: satu transaksi per file, sehingga
+        penulisan ke SQLite tetap berurutan. File selalu ditulis sesuai
+        urutan file_paths (bukan urutan selesai parsing), jadi jika beberapa
+        log berisi (work_no, tanggal) yang sama, file terakhir di daftar
+        yang menang, berapa pun lama parsing masing-masing file.
+
+        Path yang disebut lebih dari sekali hanya diimpor (dan dilaporkan)
+        sekali, pada posisi kemunculan pertamanya.
+
+        progress_callback(tahap, jumlah, total) menerima tahap 'tulis' dari
+        setiap file dan tahap 'file' (jumlah file selesai) setelah tiap file.
+        cek_batal() menghentikan batch; file yang sedang ditulis di-rollback,
+        file yang sudah selesai tetap tersimpan. File yang sudah pernah
+        diimpor untuk tanggal yang sama dilewati kecuali paksa=True.
+        tanggal_absensi, tanggal_dari_file, dan deteksi_pelanggaran sama
+        seperti di import_data_from_log. Worker parsing dibuat dengan start
+        method 'spawn', jadi skrip pemanggil harus punya penjaga
+        if __name__ == '__main__'.
+
+        Returns:
+            list[dict]: Satu hasil per path unik (urutan sama dengan file_paths):
+                {'file', 'status' ('sukses'/'dilewati'/'gagal'/'dibatalkan'), 'ringkasan'}
+        """
+        daftar_unik = list(dict.fromkeys(file_paths))
+        if len(daftar_unik) < len(file_paths):
+            print(f"🟡 {len(file_paths) - len(daftar_unik)} path duplikat di batch diabaikan "
+                  f"(setiap path hanya diimpor sekali).")
+        hasil = {p: {'file': p, 'status': 'dibatalkan', 'ringkasan': None} for p in daftar_unik}
+        total = len(daftar_unik)
+        selesai = 0
+        print(f"Memulai impor batch {total} file untuk tanggal {tanggal_absensi or '(dari file)'}...")
+
+        def lapor_file_selesai():
+            nonlocal selesai
+            selesai += 1
+            if progress_callback:
+                progress_callback('file', selesai, total)
+
+        # 1. Hitung hash semua file; yang sudah pernah diimpor tidak di-parse lagi
+        antrean = {}
+        for file_path in daftar_unik:
+            try:
+                file_hash = hitung_hash_file(file_path)
+            except OSError as e:
+                print(f"❌ {file_path}: {e}")
+                hasil[file_path]['status'] = 'gagal'
+                lapor_file_selesai()
+                continue
+            # Isi identik dengan file lain di batch ini juga cukup diimpor sekali
+            sudah_di_antrean = file_hash in antrean.values()
+            if sudah_di_antrean or (not paksa and self._sudah_diimpor(file_hash, tanggal_absensi)):
+                print(f"⏭ {file_path} sudah pernah diimpor, dilewati.")
+                hasil[file_path].update(status='dilewati', ringkasan=_ringkasan_dilewati())
+                lapor_file_selesai()
+                continue
+            antrean[file_path] = file_hash
+
+        def tulis(file_path, df_absensi):
+            print(f"Menulis hasil parse {file_path}...")
+            with self._ukur_tahap('db'):
+                ringkasan = self._tulis_hasil_parse(
+                    df_absensi, tanggal_absensi, progress_callback, cek_batal,
+                    file_path=file_path, file_hash=antrean[file_path],
+                    tanggal_dari_file=tanggal_dari_file, deteksi_pelanggaran=deteksi_pelanggaran
+                )
+            if ringkasan:
+                hasil[file_path].update(status='sukses', ringkasan=ringkasan)
+            elif not (cek_batal and cek_batal()):
+                hasil[file_path]['status'] = 'gagal'
+            lapor_file_selesai()
+
+        if len(antrean) <= 1:
+            # Satu file saja: tidak perlu biaya membuat process pool
+            for file_path, file_hash in antrean.items():
+                with self._ukur_tahap('parse'):
+                    df_absensi = parse_file_dengan_cache(file_path, file_hash, self.cache_dir, self.backend_parser)
+                tulis(file_path, df_absensi)
+            return list(hasil.values())
+
+        # 2. Parse paralel, tulis berurutan sesuai urutan file_paths: file
+        # berikutnya tetap di-parse di pool selama file sebelumnya ditulis.
+        # Proses worker dibuat dengan 'spawn', bukan 'fork' (default Linux):
+        # import_batch dipanggil dari thread lain (QThread UI, thread penulis
+        # API), dan fork dari proses multi-thread bisa deadlock
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+            futures = {
+                p: pool.submit(parse_file_terukur, p, h, self.cache_dir, self.backend_parser)
+                for p, h in antrean.items()
+            }
+            for file_path, future in futures.items():
+                if cek_batal and cek_batal():
+                    pool.shutdown(wait=False, cancel_futures=True)
+                    break
+                try:
+                    df_absensi, detik_parse = future.result()
+                except Exception as e:
+                    print(f"❌ Parsing {file_path} GAGAL: {e}")
+                    hasil[file_path]['status'] = 'gagal'
+                    lapor_file_selesai()
+                else:
+                    if self.instrumentasi:
+                        self.instrumentasi.catat_tahap('parse', detik_parse)
+                    tulis(file_path, df_absensi)
+
+        return list(hasil.values())
+
+    def _tulis_hasil_parse(self, df_absensi, tanggal_absensi, progress_callback=None, cek_batal=None,
+                           file_path=None, file_hash=None, tanggal_dari_file=True,
+                           deteksi_pelanggaran=False):
+        """
+        Menulis satu DataFrame hasil parse ke database dalam satu transaksi
+        (commit jika sukses, rollback jika gagal/dibatalkan). Jika file_hash
+        diberikan, file dicatat di ImportLog dalam transaksi yang sama,
+        begitu juga deteksi pelanggaran jika deteksi_pelanggaran=True.
+        Mengembalikan dict ringkasan atau False.
+        """
+        try:
+            if df_absensi.empty:
+                print("Tidak ada data yang ditemukan di file log.")
+                return False
+            tanggal_baris = self._tanggal_per_baris(df_absensi, tanggal_absensi, tanggal_dari_file)
+            if tanggal_baris is None:
+                return False
+            if progress_callback:
+                progress_callback('parse', len(df_absensi), len(df_absensi))
+
+            daftar_tanggal = sorted(set(tanggal_baris))
+            jumlah_awal = self._hitung_catatan_tanggal(daftar_tanggal)
+            master = CacheMaster(self.conn.cursor())
+            self._impor_dataframe_bulk(df_absensi, tanggal_baris, master, progress_callback, cek_batal)
+            ringkasan = self._ringkasan_impor(df_absensi, tanggal_baris, jumlah_awal)
+            ringkasan['master'] = master.ringkasan()
+            if file_hash:
+                self._catat_import_log(file_hash, tanggal_absensi, file_path, len(df_absensi))
+            if deteksi_pelanggaran:
+                ringkasan['pelanggaran'] = self._deteksi_pelanggaran_tanggal(daftar_tanggal)
+
+            # Commit semua perubahan ke database
+            self.conn.commit()
+            # Nama/departemen karyawan yang berubah juga mengubah hasil query
+            # tanggal lain (nama, departemen, pencarian, rekap): buang semua
+            self._data_berubah(None if ringkasan['master']['total'] else daftar_tanggal)
+            print(f"✅ Impor berhasil: {ringkasan['diproses']} baris data diproses "
+                  f"({ringkasan['baru']} baru, {ringkasan['diperbarui']} diperbarui, "
+                  f"{ringkasan['master']['total']} data master berubah).")
+            if deteksi_pelanggaran:
+                print(f"✅ Deteksi pelanggaran: {ringkasan['pelanggaran']['terdeteksi']} pelanggaran "
+                      f"({ringkasan['pelanggaran']['baru']} baru).")
+            return ringkasan
+
+        except ImporDibatalkan:
+            self.conn.rollback()
+            print("🟡 Impor dibatalkan, semua perubahan di-rollback.")
+            return False
+        except Exception as e:
+            # Jika terjadi error, batalkan semua perubahan
+            self.conn.rollback()
+            print(f"❌ Impor GAGAL: {e}")
+            return False
+
+    def _tanggal_per_baris(self, df_absensi, tanggal_absensi, tanggal_dari_file=True):
+        """
+        Menentukan tanggal absensi setiap baris hasil parse: tanggal blok
+        dari file (kolom 'Tanggal'), atau tanggal_absensi jika tidak
+        terdeteksi (atau jika tanggal_dari_file=False). Mengembalikan list
+        tanggal, atau None (dengan pesan error) jika ada baris tanpa tanggal.
+        """
+        if tanggal_dari_file and 'Tanggal' in df_absensi.columns:
+            tanggal_baris = [t if isinstance(t, str) and t else tanggal_absensi
+                             for t in df_absensi['Tanggal'].tolist()]
+        else:
+            tanggal_baris = [tanggal_absensi] * len(df_absensi)
+
+        if not tanggal_absensi and None in tanggal_baris:
+            print(f"❌ Impor GAGAL: {tanggal_baris.count(None)} baris tidak punya tanggal "
+                  f"(tidak ada baris periode/tanggal di file) dan tanggal absensi tidak diberikan.")
+            return None
+        return tanggal_baris
+
+    def _sudah_diimpor(self, file_hash, tanggal_absensi):
+        """
+        Memeriksa ImportLog: apakah file dengan hash ini sudah pernah
+        diimpor untuk tanggal absensi yang sama (tanggal yang diminta saat
+        impor, kosong jika tanggal hanya diambil dari file).
+        """
+        cursor = self.conn.cursor()
+        cursor.execute("""
+            SELECT 1 FROM ImportLog WHERE file_hash = ? AND tanggal_absensi = ?
+        """, (file_hash, tanggal_absensi or ''))
+        return cursor.fetchone() is not None
+
+    def _catat_import_log(self, file_hash, tanggal_absensi, file_path, jumlah_baris):
+        """
+        Mencatat (atau memperbarui, jika impor dipaksa) entri ImportLog.
+        Tidak melakukan commit.
+        """
+        self.conn.execute("""
+            INSERT INTO ImportLog (file_hash, tanggal_absensi, nama_file, jumlah_baris)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT (file_hash, tanggal_absensi) DO UPDATE SET
+                nama_file = excluded.nama_file,
+                jumlah_baris = excluded.jumlah_baris,
+                waktu_impor = CURRENT_TIMESTAMP
+        """, (file_hash, tanggal_absensi or '', os.path.basename(file_path or ''), jumlah_baris))
+
+    def _impor_dataframe_bulk(self, df_absensi, tanggal_baris, master, progress_callback=None, cek_batal=None):
+        """
+        Mesin impor massal: data master (Departemen, Karyawan) disamakan
+        dulu lewat identity cache master (hanya yang baru/berubah yang
+        ditulis), lalu parameter CatatanAbsensi dibangun sekali dari
+        DataFrame dan ditulis dengan executemany (UPSERT) per batch
+        UKURAN_BATCH_IMPOR baris. tanggal_baris berisi tanggal absensi
+        untuk setiap baris df_absensi. Tidak melakukan commit.
+        """
+        cursor = self.conn.cursor()
+        work_no = df_absensi['No'].tolist()
+        nama = df_absensi['Nama'].tolist()
+        departemen = df_absensi['Departemen'].tolist()
+
+        # 1. Data master: departemen baru (urut kemunculan), lalu karyawan
+        # baru/berubah; karyawan yang sama seperti di database tidak ditulis
+        peta_dept = {d: master.dept_id(d) for d in dict.fromkeys(departemen) if d}
+        master.sinkron_karyawan(
+            (no, nm, peta_dept.get(d) if d else None)
+            for no, nm, d in zip(work_no, nama, departemen)
+        )
+
+        # 2. Parameter CatatanAbsensi dibangun sekali
+        # Jam dinormalisasi ke 'HH:MM' ('N/A' -> None) beserta kolom menit,
+        # durasi, dan scan anomalinya (lihat kolom_menit_catatan)
+        kolom_waktu = [
+            df_absensi[kolom].tolist()
+            for kolom in ['Jam Masuk', 'Jam Pulang', 'Masuk Lembur', 'Pulang Lembur', 'Waktu Anomali']
+        ]
+        param_absensi, scan_anomali = [], []
+        for no, tanggal, *waktu in zip(work_no, tanggal_baris, *kolom_waktu):
+            teks, menit, anomali = kolom_menit_catatan(*waktu)
+            param_absensi.append((no, tanggal) + teks + menit)
+            scan_anomali.append(anomali)
+
+        total = len(param_absensi)
+        for awal in range(0, total, UKURAN_BATCH_IMPOR):
+            if cek_batal and cek_batal():
+                raise ImporDibatalkan()
+            akhir = min(awal + UKURAN_BATCH_IMPOR, total)
+            # Scan anomali per (work_no, tanggal); baris ganda di batch: yang terakhir menang
+            anomali_batch = {
+                (param[0], param[1]): anomali
+                for param, anomali in zip(param_absensi[awal:akhir], scan_anomali[awal:akhir])
+            }
+            param_anomali = [
+                (urutan, menit, no, tanggal)
+                for (no, tanggal), anomali in anomali_batch.items()
+                for urutan, menit in enumerate(anomali)
+            ]
+            self._tulis_batch_impor(cursor, param_absensi[awal:akhir], param_anomali)
+            if progress_callback:
+                progress_callback('tulis', akhir, total)
+
+    def _tulis_batch_impor(self, cursor, param_absensi, param_anomali=()):
+        """
+        Menulis satu batch impor: UPSERT CatatanAbsensi pada kunci unik
+        (work_no, tanggal_absensi), lalu scan anomalinya. Karyawan sudah
+        ditulis sebelumnya (lihat CacheMaster).
+        """
+        # CatatanAbsensi: INSERT baru, UPDATE catatan hari yang sama
+        cursor.executemany("""
+            INSERT INTO CatatanAbsensi
+            (work_no, tanggal_absensi, jam_masuk, jam_pulang, lembur_masuk, lembur_pulang, waktu_anomali,
+             jam_masuk_menit, jam_pulang_menit, lembur_masuk_menit, lembur_pulang_menit, menit_kerja, menit_lembur,
+             status_validasi)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 'PENDING')
+            ON CONFLICT (work_no, tanggal_absensi) DO UPDATE SET
+                jam_masuk = excluded.jam_masuk,
+                jam_pulang = excluded.jam_pulang,
+                lembur_masuk = excluded.lembur_masuk,
+                lembur_pulang = excluded.lembur_pulang,
+                waktu_anomali = excluded.waktu_anomali,
+                jam_masuk_menit = excluded.jam_masuk_menit,
+                jam_pulang_menit = excluded.jam_pulang_menit,
+                lembur_masuk_menit = excluded.lembur_masuk_menit,
+                lembur_pulang_menit = excluded.lembur_pulang_menit,
+                menit_kerja = excluded.menit_kerja,
+                menit_lembur = excluded.menit_lembur,
+                status_validasi = 'PENDING'
+        """, param_absensi)
+
+        # ScanAnomali: record_id dicari lewat kunci unik (work_no, tanggal_absensi).
+        # Trigger sudah membuang scan lama untuk catatan yang teks anomalinya berubah.
+        cursor.executemany("""
+            INSERT INTO ScanAnomali (record_id, urutan, menit)
+            SELECT record_id, ?, ? FROM CatatanAbsensi
+            WHERE work_no = ? AND tanggal_absensi = ?
+            ON CONFLICT (record_id, urutan) DO NOTHING
+        """, param_anomali)
+
+    def _hitung_catatan_tanggal(self, daftar_tanggal):
+        """
+        Menghitung jumlah catatan absensi yang sudah ada pada tanggal-tanggal
+        di daftar_tanggal.
+        """
+        cursor = self.conn.cursor()
+        penanda = ', '.join('?' * len(daftar_tanggal))
+        cursor.execute(f"SELECT COUNT(*) FROM CatatanAbsensi WHERE tanggal_absensi IN ({penanda})",
+                       tuple(daftar_tanggal))
+        return cursor.fetchone()[0]
+
+    def _ringkasan_impor(self, df_absensi, tanggal_baris, jumlah_awal):
+        """
+        Membuat ringkasan impor: berapa baris diproses, berapa catatan
+        baru di-INSERT, berapa catatan lama di-UPDATE, dan tanggal apa saja
+        yang terisi.
+        """
+        daftar_tanggal = sorted(set(tanggal_baris))
+        baru = self._hitung_catatan_tanggal(daftar_tanggal) - jumlah_awal
+        return {
+            'diproses': len(df_absensi),
+            'baru': baru,
+            'diperbarui': len(set(zip(df_absensi['No'].tolist(), tanggal_baris))) - baru,
+            'dilewati': False,
+            'tanggal': daftar_tanggal,
+        }
+
+    def _import_data_per_baris(self, file_path, tanggal_absensi, tanggal_dari_file=True, file_hash=None):
+        """
+        Jalur impor lama: SELECT lalu INSERT/UPDATE untuk setiap baris.
+        Dipertahankan sebagai pembanding untuk benchmark. Seperti jalur
+        bulk, file dicatat di ImportLog (jika file_hash diberikan) dalam
+        transaksi yang sama.
         """
-        print(f"Memulai impor dari {file_path} untuk tanggal {tanggal_absensi}...")
         try:
             # 1. Proses file log menggunakan fungsi kita sebelumnya
-            df_absensi = proses_absensi_dari_file(file_path)
+            from proses_absensi import proses_absensi_dari_file
+            with self._ukur_tahap('parse'):
+                df_absensi = proses_absensi_dari_file(file_path)
             
             if df_absensi.empty:
                 print("Tidak ada data yang ditemukan di file log.")
                 return False
+            tanggal_baris = self._tanggal_per_baris(df_absensi, tanggal_absensi, tanggal_dari_file)
+            if tanggal_baris is None:
+                return False
+            daftar_tanggal = sorted(set(tanggal_baris))
+            jumlah_awal = self._hitung_catatan_tanggal(daftar_tanggal)
+            master = CacheMaster(self.conn.cursor())
 
             jumlah_sukses = 0
             # 2. Iterasi setiap baris data di DataFrame
-            for _, row in df_absensi.iterrows():
+            for (_, row), tanggal in zip(df_absensi.iterrows(), tanggal_baris):
                 # 3. Sinkronisasi Master Data
-                dept_id = self._get_or_create_departemen(row['Departemen'])
-                self._sync_karyawan(row['No'], row['Nama'], dept_id)
+                dept_id = self._get_or_create_departemen(row['Departemen'], master)
+                self._sync_karyawan(row['No'], row['Nama'], dept_id, master)
                 
                 # 4. Siapkan data absensi
                 data_absensi = {
                     'work_no': row['No'],
-                    'tanggal_absensi': tanggal_absensi,
+                    'tanggal_absensi': tanggal,
                     'jam_masuk': row['Jam Masuk'],
                     'jam_pulang': row['Jam Pulang'],
                     'lembur_masuk': row['Masuk Lembur'],
@@ -161,9 +1088,16 @@ class DataManager:
                 jumlah_sukses += 1
 
             # 6. Commit semua perubahan ke database
+            ringkasan = self._ringkasan_impor(df_absensi, tanggal_baris, jumlah_awal)
+            ringkasan['master'] = master.ringkasan()
+            if file_hash:
+                self._catat_import_log(file_hash, tanggal_absensi, file_path, len(df_absensi))
             self.conn.commit()
+            # Nama/departemen karyawan yang berubah juga mengubah hasil query
+            # tanggal lain (nama, departemen, pencarian, rekap): buang semua
+            self._data_berubah(None if ringkasan['master']['total'] else daftar_tanggal)
             print(f"✅ Impor berhasil: {jumlah_sukses} baris data diproses.")
-            return True
+            return ringkasan
 
         except Exception as e:
             # Jika terjadi error, batalkan semua perubahan
@@ -171,95 +1105,424 @@ class DataManager:
             print(f"❌ Impor GAGAL: {e}")
             return False
 
-    def get_absensi_data_for_ui(self, start_date, end_date):
+    @diukur
+    @cache_query
+    def get_absensi_data_for_ui(self, start_date, end_date, cari=None):
         """
         FUNGSI UTAMA UNTUK UI:
         Mengambil data absensi yang sudah digabung dengan nama karyawan
         untuk ditampilkan di tabel UI.
+
+        cari: teks pencarian nama karyawan / departemen (awalan kata,
+        semua kata harus cocok), dicari lewat indeks FTS5 di SQL.
         """
-        cursor = self.conn.cursor()
-        cursor.execute("""
-            SELECT 
-                C.record_id,
-                C.tanggal_absensi,
-                C.work_no,
-                K.nama_karyawan,
-                D.nama_departemen,
-                C.jam_masuk,
-                C.jam_pulang,
-                C.lembur_masuk,
-                C.lembur_pulang,
-                C.waktu_anomali,
-                C.status_validasi,
-                C.catatan_editor
-            FROM CatatanAbsensi C
-            JOIN Karyawan K ON C.work_no = K.work_no
-            LEFT JOIN Departemen D ON K.dept_id = D.dept_id
-            WHERE C.tanggal_absensi BETWEEN ? AND ?
-            ORDER BY C.tanggal_absensi, K.nama_karyawan
-        """, (start_date, end_date))
+        cursor = self.buka_kursor_absensi(start_date, end_date, cari)
         
         # Mengubah hasil (list of rows) menjadi list of dictionaries
         data = [dict(row) for row in cursor.fetchall()]
         return data
 
+    def buka_kursor_absensi(self, start_date, end_date, cari=None):
+        """
+        Sama seperti get_absensi_data_for_ui(), tetapi mengembalikan cursor
+        yang belum dibaca. Pemanggil mengambil baris sedikit demi sedikit
+        dengan fetchmany() sesuai kebutuhan. Selama cursor belum habis
+        dibaca, SQLite menahan read lock (lihat juga get_absensi_page()).
+        """
+        sql_cari, param_cari = _filter_cari(cari)
+        cursor = self.pool.pembaca().cursor()
+        cursor.execute(SQL_PILIH_ABSENSI + """
+            WHERE C.tanggal_absensi BETWEEN ? AND ?
+        """ + sql_cari + """
+            ORDER BY C.tanggal_absensi, K.nama_karyawan
+        """, (start_date, end_date, *param_cari))
+        return cursor
+
+    @diukur
+    def get_absensi_page(self, start_date, end_date, page_size=500, cursor=None, cari=None):
+        """
+        Versi berhalaman dari get_absensi_data_for_ui() untuk rentang yang
+        panjang (bertahun-tahun). Memakai keyset pagination: halaman
+        berikutnya dimulai SETELAH baris terakhir (tanggal, nama, record_id)
+        yang tersimpan di cursor, bukan OFFSET, jadi halaman ke-N sama
+        murahnya dengan halaman pertama.
+
+        cursor: None untuk halaman pertama, atau nilai 'cursor' dari hasil
+        halaman sebelumnya. cari: seperti di get_absensi_data_for_ui(),
+        harus sama untuk semua halaman.
+
+        Mengembalikan dict {'data': list of dict, 'cursor': str atau None
+        (None = tidak ada halaman lagi), 'total': jumlah seluruh baris}.
+        Total hanya dihitung di halaman pertama lalu dibawa di dalam cursor.
+        Halaman pertama (yang dimuat ulang setiap klik "Muat Data") diambil
+        lewat cache query.
+        """
+        if page_size <= 0:
+            raise ValueError("page_size harus lebih dari 0")
+        if cursor is None:
+            return self._halaman_pertama_absensi(start_date, end_date, page_size, cari)
+        return self._ambil_halaman_absensi(start_date, end_date, page_size, cursor, cari)
+
+    @cache_query
+    def _halaman_pertama_absensi(self, start_date, end_date, page_size, cari=None):
+        """
+        Halaman pertama get_absensi_page() (cursor=None), di-cache dengan
+        kunci (start_date, end_date, page_size, cari).
+        """
+        return self._ambil_halaman_absensi(start_date, end_date, page_size, None, cari)
+
+    def _ambil_halaman_absensi(self, start_date, end_date, page_size, cursor, cari):
+        """
+        Isi get_absensi_page() tanpa cache.
+        """
+        sql_cari, param_cari = _filter_cari(cari)
+        conn = self.pool.pembaca()
+        if cursor is None:
+            # COUNT cukup dari indeks tanggal (setiap catatan pasti punya Karyawan)
+            total = conn.execute(
+                "SELECT COUNT(*) FROM CatatanAbsensi C WHERE C.tanggal_absensi BETWEEN ? AND ?" + sql_cari,
+                (start_date, end_date, *param_cari)
+            ).fetchone()[0]
+            baris = conn.execute(SQL_PILIH_ABSENSI + """
+                WHERE C.tanggal_absensi BETWEEN ? AND ?
+            """ + sql_cari + """
+                ORDER BY C.tanggal_absensi, K.nama_karyawan, C.record_id
+                LIMIT ?
+            """, (start_date, end_date, *param_cari, page_size)).fetchall()
+        else:
+            tanggal, nama, record_id, total = _baca_cursor_halaman(cursor)
+            # Syarat tanggal >= ? terpisah agar indeks tanggal tetap dipakai
+            baris = conn.execute(SQL_PILIH_ABSENSI + """
+                WHERE C.tanggal_absensi BETWEEN ? AND ?
+            """ + sql_cari + """
+                  AND (C.tanggal_absensi, K.nama_karyawan, C.record_id) > (?, ?, ?)
+                ORDER BY C.tanggal_absensi, K.nama_karyawan, C.record_id
+                LIMIT ?
+            """, (max(start_date, tanggal), end_date, *param_cari, tanggal, nama, record_id, page_size)).fetchall()
+
+        data = [dict(row) for row in baris]
+        cursor_berikutnya = None
+        if len(data) == page_size:
+            cursor_berikutnya = _buat_cursor_halaman(data[-1], total)
+        return {'data': data, 'cursor': cursor_berikutnya, 'total': total}
+
     # -----------------------------------------------------------------
     # --- FUNGSI BARU UNTUK REPORTING (LAPORAN) ---
     # -----------------------------------------------------------------
 
+    @diukur
+    @cache_query
     def get_rekap_absensi(self, start_date, end_date):
         """
         FUNGSI UNTUK LAPORAN:
         Membuat rekapitulasi absensi per karyawan (Total hari masuk)
         dalam rentang tanggal yang ditentukan.
+        Dibaca dari tabel ringkasan RekapHarian (satu baris per karyawan
+        per hari, dijaga trigger), bukan dari seluruh CatatanAbsensi.
+        Setiap baris juga berisi metrik shift (KOLOM_METRIK_REKAP) dari
+        agregat_metrik_absensi().
         """
-        cursor = self.conn.cursor()
-        cursor.execute("""
-            SELECT 
-                K.work_no,
-                K.nama_karyawan,
-                D.nama_departemen,
-                COUNT(C.record_id) AS total_hari_masuk,
-                SUM(CASE WHEN C.status_validasi = 'PENDING' THEN 1 ELSE 0 END) AS total_pending,
-                SUM(CASE WHEN C.waktu_anomali IS NOT NULL THEN 1 ELSE 0 END) AS total_anomali
-            FROM CatatanAbsensi C
-            JOIN Karyawan K ON C.work_no = K.work_no
-            LEFT JOIN Departemen D ON K.dept_id = D.dept_id
-            WHERE C.tanggal_absensi BETWEEN ? AND ?
-            GROUP BY K.work_no, K.nama_karyawan, D.nama_departemen
-            ORDER BY K.nama_karyawan
-        """, (start_date, end_date))
+        rekap = self.buka_kursor_rekap(start_date, end_date).fetchall()
+        per_karyawan = self.agregat_metrik_absensi(start_date, end_date)
+        kosong = dict.fromkeys(KOLOM_METRIK_REKAP, 0)
         
-        data = [dict(row) for row in cursor.fetchall()]
+        data = [{**dict(row), **per_karyawan.get(row['work_no'], kosong)} for row in rekap]
         return data
 
+    def buka_kursor_rekap(self, start_date, end_date):
+        """
+        Rekap per karyawan dari RekapHarian (tanpa metrik shift) sebagai
+        cursor yang belum dibaca, seperti buka_kursor_absensi().
+        """
+        cursor = self.pool.pembaca().cursor()
+        cursor.execute(SQL_REKAP_ABSENSI, (start_date, end_date))
+        return cursor
+
+    @diukur
+    def agregat_metrik_absensi(self, start_date, end_date):
+        """
+        Total metrik shift per karyawan untuk rentang tanggal. Rentang yang
+        panjang dihitung per potongan HARI_PER_POTONGAN_METRIK hari lalu
+        dijumlahkan, sehingga array NumPy yang dimuat sekaligus paling
+        besar satu potongan (memori tetap datar untuk rekap tahunan).
+
+        Returns:
+            dict: work_no -> dict KOLOM_METRIK_REKAP (int).
+        """
+        from metrik_absensi import agregat_per_karyawan
+
+        total = {}
+        awal = datetime.date.fromisoformat(str(start_date))
+        akhir = datetime.date.fromisoformat(str(end_date))
+        while awal <= akhir:
+            ujung = min(awal + datetime.timedelta(days=HARI_PER_POTONGAN_METRIK - 1), akhir)
+            metrik = self.hitung_metrik_absensi(awal.isoformat(), ujung.isoformat())
+            for work_no, nilai in agregat_per_karyawan(metrik['work_no'], metrik).items():
+                if work_no in total:
+                    for kolom in KOLOM_METRIK_REKAP:
+                        total[work_no][kolom] += nilai[kolom]
+                else:
+                    total[work_no] = nilai
+            awal = ujung + datetime.timedelta(days=1)
+        return total
+
+    @diukur
+    def hitung_metrik_absensi(self, start_date, end_date):
+        """
+        MESIN METRIK SHIFT:
+        Memuat semua CatatanAbsensi di rentang tanggal sebagai array NumPy
+        lalu menghitung menit telat, pulang cepat, kerja bersih, dan lembur
+        untuk semua catatan sekaligus berdasarkan JadwalShift departemen
+        masing-masing (lihat metrik_absensi.hitung_metrik).
+
+        Returns:
+            dict: 'record_id', 'work_no' (array int) dan setiap nama di
+                  metrik_absensi.METRIK (array float, NaN = tidak bisa
+                  dihitung karena scan tidak ada), satu elemen per catatan.
+        """
+        import numpy as np
+        from metrik_absensi import hitung_metrik, buka_kemasan_menit, dept_per_catatan
+
+        cursor = self.pool.pembaca().cursor()
+        cursor.row_factory = None # Tuple biasa: langsung jadi array
+        cursor.execute(SQL_MUAT_METRIK, (start_date, end_date))
+        record_id, work_no, dikemas = np.array(cursor.fetchall(), dtype=np.int64).reshape(-1, 3).T
+
+        # None (karyawan tanpa departemen) menjadi NaN
+        cursor.execute("SELECT work_no, dept_id FROM Karyawan")
+        karyawan = np.array(cursor.fetchall(), dtype=float).reshape(-1, 2)
+        dept_id = dept_per_catatan(work_no, karyawan[:, 0], karyawan[:, 1])
+
+        metrik = hitung_metrik(dept_id, *buka_kemasan_menit(dikemas), self.get_jadwal_shift())
+        return {'record_id': record_id, 'work_no': work_no, **metrik}
+
+    def get_jadwal_shift(self):
+        """
+        Mengembalikan semua jadwal shift sebagai list dict (jadwal default,
+        dengan dept_id None, paling awal). Jam dalam menit sejak tengah
+        malam, ditambah 'jam_masuk'/'jam_pulang' dalam teks 'HH:MM'.
+        """
+        cursor = self.pool.pembaca().cursor()
+        cursor.execute("""
+            SELECT J.dept_id, D.nama_departemen, J.jam_masuk_menit, J.jam_pulang_menit,
+                   J.istirahat_menit, J.toleransi_telat_menit
+            FROM JadwalShift J
+            LEFT JOIN Departemen D ON J.dept_id = D.dept_id
+            ORDER BY J.dept_id IS NOT NULL, D.nama_departemen
+        """)
+        return [
+            {**dict(row), 'jam_masuk': jam_dari_menit(row['jam_masuk_menit']),
+             'jam_pulang': jam_dari_menit(row['jam_pulang_menit'])}
+            for row in cursor.fetchall()
+        ]
+
+    @penulis_tunggal
+    def set_jadwal_shift(self, jam_masuk, jam_pulang, istirahat_menit=60,
+                         toleransi_telat_menit=0, nama_departemen=None):
+        """
+        Menyimpan jadwal shift ('HH:MM') untuk satu departemen, atau jadwal
+        default jika nama_departemen None. Jam pulang lebih kecil dari jam
+        masuk berarti shift malam (melewati tengah malam).
+        Mengembalikan True jika sukses, False jika gagal.
+        """
+        try:
+            masuk, pulang = menit_dari_jam(jam_masuk), menit_dari_jam(jam_pulang)
+            if masuk is None or pulang is None or not (0 <= masuk < 1440 and 0 <= pulang < 1440):
+                raise ValueError(f"jam shift tidak valid: {jam_masuk!r} - {jam_pulang!r}")
+
+            dept_id = None
+            if nama_departemen is not None:
+                row = self.conn.execute(
+                    "SELECT dept_id FROM Departemen WHERE nama_departemen = ?", (nama_departemen,)
+                ).fetchone()
+                if row is None:
+                    print(f"❌ Departemen '{nama_departemen}' tidak ditemukan.")
+                    return False
+                dept_id = row['dept_id']
+
+            self.conn.execute("""
+                INSERT INTO JadwalShift
+                (dept_id, jam_masuk_menit, jam_pulang_menit, istirahat_menit, toleransi_telat_menit)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (IFNULL(dept_id, 0)) DO UPDATE SET
+                    jam_masuk_menit = excluded.jam_masuk_menit,
+                    jam_pulang_menit = excluded.jam_pulang_menit,
+                    istirahat_menit = excluded.istirahat_menit,
+                    toleransi_telat_menit = excluded.toleransi_telat_menit
+            """, (dept_id, masuk, pulang, istirahat_menit, toleransi_telat_menit))
+            self.conn.commit()
+        except (ValueError, sqlite3.Error) as e:
+            self.conn.rollback()
+            print(f"❌ Gagal menyimpan jadwal shift: {e}")
+            return False
+
+        # Metrik di semua rekap yang tersimpan di cache ikut berubah
+        self._data_berubah()
+        print(f"✅ Jadwal shift {nama_departemen or '(default)'}: {jam_masuk} - {jam_pulang}")
+        return True
+
+    @diukur
+    @penulis_tunggal
+    def rebuild_rekap_harian(self):
+        """
+        Membangun ulang tabel ringkasan RekapHarian dari CatatanAbsensi.
+        """
+        jumlah = rebuild_rekap_harian(self.conn)
+        self._data_berubah()
+        print(f"✅ RekapHarian dibangun ulang: {jumlah} baris.")
+        return jumlah
+
+    @diukur
+    def cek_konsistensi_rekap(self):
+        """
+        Mengembalikan list (work_no, tanggal_absensi) yang ringkasannya
+        tidak cocok dengan CatatanAbsensi (kosong = konsisten).
+        """
+        return cek_konsistensi_rekap(self.pool.pembaca())
+
+    @diukur
+    @penulis_tunggal
+    def deteksi_pelanggaran(self, start_date, end_date, ambang_telat_menit=None):
+        """
+        FUNGSI UNTUK LAPORAN:
+        Menjalankan semua ATURAN_PELANGGARAN untuk catatan di rentang
+        tanggal dan menyimpan hasilnya ke tabel Pelanggaran (satu
+        transaksi). Aman dijalankan berulang: pelanggaran yang sudah ada
+        tidak diduplikasi, dan pelanggaran otomatis yang sudah tidak
+        berlaku (misalnya setelah jadwal shift diubah) dihapus.
+        Pelanggaran yang dicatat manual (kode_aturan NULL) tidak disentuh.
+
+        ambang_telat_menit: batas menit telat; None = toleransi_telat_menit
+        di JadwalShift departemen (atau default).
+
+        Returns:
+            dict: {'terdeteksi', 'baru', 'diperbarui', 'dihapus', 'per_aturan'}
+                  jika sukses, atau False jika gagal.
+        """
+        try:
+            daftar_tanggal = [row[0] for row in self.conn.execute(
+                "SELECT DISTINCT tanggal_absensi FROM CatatanAbsensi WHERE tanggal_absensi BETWEEN ? AND ?",
+                (start_date, end_date)
+            )]
+            hasil = self._deteksi_pelanggaran_tanggal(daftar_tanggal, ambang_telat_menit)
+            self.conn.commit()
+        except sqlite3.Error as e:
+            self.conn.rollback()
+            print(f"❌ Deteksi pelanggaran GAGAL: {e}")
+            return False
+
+        self._data_berubah(daftar_tanggal)
+        print(f"✅ Deteksi pelanggaran {start_date} s/d {end_date}: {hasil['terdeteksi']} pelanggaran "
+              f"({hasil['baru']} baru, {hasil['dihapus']} dihapus).")
+        return hasil
+
+    def _deteksi_pelanggaran_tanggal(self, daftar_tanggal, ambang_telat_menit=None):
+        """
+        Inti deteksi pelanggaran untuk catatan di tanggal-tanggal
+        daftar_tanggal, lewat koneksi penulis TANPA commit (dipanggil dari
+        deteksi_pelanggaran atau di dalam transaksi impor).
+
+        Semua aturan dijalankan set-based ke tabel sementara
+        DeteksiPelanggaran, lalu Pelanggaran disamakan dengannya: yang
+        belum ada di-INSERT, yang berubah di-UPDATE (ON CONFLICT pada
+        (record_id, kode_aturan)), yang tidak terdeteksi lagi di-DELETE.
+        """
+        hasil = {'terdeteksi': 0, 'baru': 0, 'diperbarui': 0, 'dihapus': 0, 'per_aturan': {}}
+        if not daftar_tanggal:
+            return hasil
+
+        cursor = self.conn.cursor()
+        param = {f't{i}': tanggal for i, tanggal in enumerate(daftar_tanggal)}
+        filter_tanggal = f"C.tanggal_absensi IN ({', '.join(':' + k for k in param)})"
+        param['ambang_telat_menit'] = ambang_telat_menit
+
+        cursor.execute("""
+            CREATE TEMP TABLE IF NOT EXISTS DeteksiPelanggaran (
+                record_id INTEGER NOT NULL,
+                kode_aturan VARCHAR(32) NOT NULL,
+                waktu_mulai TIME,
+                waktu_selesai TIME,
+                catatan_pelanggaran TEXT,
+                PRIMARY KEY (record_id, kode_aturan)
+            )
+        """)
+        cursor.execute("DELETE FROM temp.DeteksiPelanggaran")
+        for kode_aturan, sql_aturan in ATURAN_PELANGGARAN:
+            cursor.execute(
+                "INSERT INTO temp.DeteksiPelanggaran " + sql_aturan.format(filter_tanggal=filter_tanggal),
+                param
+            )
+            hasil['per_aturan'][kode_aturan] = cursor.rowcount
+        hasil['terdeteksi'] = sum(hasil['per_aturan'].values())
+
+        # Hapus pelanggaran otomatis di tanggal ini yang tidak terdeteksi lagi
+        cursor.execute(f"""
+            DELETE FROM Pelanggaran
+            WHERE kode_aturan IS NOT NULL
+              AND record_id IN (SELECT C.record_id FROM CatatanAbsensi C WHERE {filter_tanggal})
+              AND NOT EXISTS (
+                  SELECT 1 FROM temp.DeteksiPelanggaran T
+                  WHERE T.record_id = Pelanggaran.record_id AND T.kode_aturan = Pelanggaran.kode_aturan
+              )
+        """, param)
+        hasil['dihapus'] = cursor.rowcount
+
+        cursor.execute("""
+            SELECT COUNT(*) FROM temp.DeteksiPelanggaran T
+            WHERE NOT EXISTS (
+                SELECT 1 FROM Pelanggaran P
+                WHERE P.record_id = T.record_id AND P.kode_aturan = T.kode_aturan
+            )
+        """)
+        hasil['baru'] = cursor.fetchone()[0]
+
+        # Baris yang isinya tidak berubah tidak ditulis ulang
+        cursor.execute("""
+            INSERT INTO Pelanggaran
+            (record_id, kode_aturan, waktu_mulai, waktu_selesai, catatan_pelanggaran)
+            SELECT record_id, kode_aturan, waktu_mulai, waktu_selesai, catatan_pelanggaran
+            FROM temp.DeteksiPelanggaran WHERE true
+            ON CONFLICT (record_id, kode_aturan) DO UPDATE SET
+                waktu_mulai = excluded.waktu_mulai,
+                waktu_selesai = excluded.waktu_selesai,
+                catatan_pelanggaran = excluded.catatan_pelanggaran
+            WHERE Pelanggaran.waktu_mulai IS NOT excluded.waktu_mulai
+               OR Pelanggaran.waktu_selesai IS NOT excluded.waktu_selesai
+               OR Pelanggaran.catatan_pelanggaran IS NOT excluded.catatan_pelanggaran
+        """)
+        hasil['diperbarui'] = cursor.rowcount - hasil['baru']
+        cursor.execute("DELETE FROM temp.DeteksiPelanggaran")
+        return hasil
+
+    @diukur
+    @cache_query
     def get_laporan_pelanggaran(self, start_date, end_date):
         """
         FUNGSI UNTUK LAPORAN:
         Mengambil semua catatan pelanggaran dalam rentang tanggal
         untuk dilaporkan.
         """
-        cursor = self.conn.cursor()
-        cursor.execute("""
-            SELECT 
-                P.pelanggaran_id,
-                C.tanggal_absensi,
-                K.nama_karyawan,
-                D.nama_departemen,
-                P.waktu_mulai,
-                P.waktu_selesai,
-                P.catatan_pelanggaran
-            FROM Pelanggaran P
-            JOIN CatatanAbsensi C ON P.record_id = C.record_id
-            JOIN Karyawan K ON C.work_no = K.work_no
-            LEFT JOIN Departemen D ON K.dept_id = D.dept_id
-            WHERE C.tanggal_absensi BETWEEN ? AND ?
-            ORDER BY C.tanggal_absensi, K.nama_karyawan
-        """, (start_date, end_date))
+        cursor = self.buka_kursor_pelanggaran(start_date, end_date)
         
         data = [dict(row) for row in cursor.fetchall()]
         return data
 
+    def buka_kursor_pelanggaran(self, start_date, end_date):
+        """
+        Sama seperti get_laporan_pelanggaran(), tetapi mengembalikan cursor
+        yang belum dibaca (lihat buka_kursor_absensi()).
+        """
+        cursor = self.pool.pembaca().cursor()
+        cursor.execute(SQL_LAPORAN_PELANGGARAN, (start_date, end_date))
+        return cursor
+
+    def hitung_baris_laporan(self, jenis, start_date, end_date):
+        """
+        Jumlah baris laporan jenis 'absensi', 'rekap', atau 'pelanggaran'
+        di rentang tanggal (dipakai untuk progres ekspor).
+        """
+        return self.pool.pembaca().execute(SQL_JUMLAH_LAPORAN[jenis], (start_date, end_date)).fetchone()[0]
+
 
 # --- Contoh Penggunaan ---
 if __name__ == '__main__':
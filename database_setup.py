@@ -1,3 +1,6 @@
+import functools
+import math
+import re
 import sqlite3
 from sqlite3 import Error
 
@@ -19,70 +22,619 @@ def buat_koneksi(db_file):
     
     return conn
 
-def buat_tabel(conn, sql_perintah_buat_tabel):
-    """ 
-    Membuat tabel dari string SQL
+# -----------------------------------------------------------------
+# --- SKEMA DASAR ---
+# -----------------------------------------------------------------
+
+# SQL untuk membuat tabel Departemen
+SQL_TABEL_DEPARTEMEN = """
+CREATE TABLE IF NOT EXISTS Departemen (
+    dept_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    nama_departemen VARCHAR(100) NOT NULL UNIQUE
+);
+"""
+
+# SQL untuk membuat tabel Karyawan
+SQL_TABEL_KARYAWAN = """
+CREATE TABLE IF NOT EXISTS Karyawan (
+    work_no INTEGER PRIMARY KEY,
+    nama_karyawan VARCHAR(255) NOT NULL,
+    dept_id INTEGER,
+    status_aktif BOOLEAN DEFAULT 1,
+    FOREIGN KEY (dept_id) REFERENCES Departemen (dept_id)
+        ON DELETE SET NULL ON UPDATE CASCADE
+);
+"""
+
+# SQL untuk membuat tabel CatatanAbsensi
+SQL_TABEL_CATATAN_ABSENSI = """
+CREATE TABLE IF NOT EXISTS CatatanAbsensi (
+    record_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    work_no INTEGER NOT NULL,
+    tanggal_absensi DATE NOT NULL,
+    jam_masuk TIME,
+    jam_pulang TIME,
+    lembur_masuk TIME,
+    lembur_pulang TIME,
+    waktu_anomali VARCHAR(255),
+    status_validasi VARCHAR(50) DEFAULT 'PENDING',
+    catatan_editor TEXT,
+    FOREIGN KEY (work_no) REFERENCES Karyawan (work_no)
+        ON DELETE CASCADE ON UPDATE CASCADE
+);
+"""
+
+# SQL untuk membuat tabel Pelanggaran
+SQL_TABEL_PELANGGARAN = """
+CREATE TABLE IF NOT EXISTS Pelanggaran (
+    pelanggaran_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    record_id INTEGER NOT NULL,
+    waktu_mulai TIME,
+    waktu_selesai TIME,
+    catatan_pelanggaran TEXT,
+    FOREIGN KEY (record_id) REFERENCES CatatanAbsensi (record_id)
+        ON DELETE CASCADE ON UPDATE CASCADE
+);
+"""
+
+# -----------------------------------------------------------------
+# --- MIGRASI SKEMA (versi disimpan di PRAGMA user_version) ---
+# -----------------------------------------------------------------
+
+def _migrasi_v1(conn):
+    """
+    Versi 1: tabel-tabel dasar aplikasi.
+    """
+    print("Mencoba membuat tabel Departemen...")
+    conn.execute(SQL_TABEL_DEPARTEMEN)
+
+    print("Mencoba membuat tabel Karyawan...")
+    conn.execute(SQL_TABEL_KARYAWAN)
+
+    print("Mencoba membuat tabel CatatanAbsensi...")
+    conn.execute(SQL_TABEL_CATATAN_ABSENSI)
+
+    print("Mencoba membuat tabel Pelanggaran...")
+    conn.execute(SQL_TABEL_PELANGGARAN)
+
+# Kolom jam CatatanAbsensi yang digabung saat duplikat dibersihkan (migrasi v2)
+KOLOM_JAM_CATATAN = ('jam_masuk', 'jam_pulang', 'lembur_masuk', 'lembur_pulang')
+
+def _jam_kosong(jam):
+    return jam is None or jam == '' or jam == 'N/A'
+
+def _gabung_duplikat_catatan(baris_baris):
+    """
+    Menggabungkan beberapa baris CatatanAbsensi (record_id, jam_masuk,
+    jam_pulang, lembur_masuk, lembur_pulang, waktu_anomali, catatan_editor)
+    untuk satu (work_no, tanggal_absensi), urut record_id. Baris pertama
+    dipertahankan; jam kosongnya diisi dari duplikat, dan jam duplikat yang
+    berbeda ditambahkan ke waktu_anomali agar tidak ada scan yang hilang.
+    Mengembalikan nilai baru (jam..., waktu_anomali, catatan_editor).
+    """
+    disimpan = list(baris_baris[0][1:])
+    jumlah_jam = len(KOLOM_JAM_CATATAN)
+    anomali = [] if _jam_kosong(disimpan[jumlah_jam]) else [j.strip() for j in str(disimpan[jumlah_jam]).split(',')]
+    for baris in baris_baris[1:]:
+        for i, jam in enumerate(baris[1:1 + jumlah_jam]):
+            if _jam_kosong(jam):
+                continue
+            if _jam_kosong(disimpan[i]):
+                disimpan[i] = jam
+            elif menit_dari_jam(jam) != menit_dari_jam(disimpan[i]):
+                anomali.append(jam_dari_menit(menit_dari_jam(jam)) or str(jam))
+        if not _jam_kosong(baris[1 + jumlah_jam]):
+            anomali += [j.strip() for j in str(baris[1 + jumlah_jam]).split(',')]
+        if not disimpan[jumlah_jam + 1] and baris[2 + jumlah_jam]:
+            disimpan[jumlah_jam + 1] = baris[2 + jumlah_jam]
+    disimpan[jumlah_jam] = ', '.join(dict.fromkeys(j for j in anomali if j)) or None
+    return disimpan
+
+def _migrasi_v2(conn):
+    """
+    Versi 2: indeks untuk query rentang tanggal, JOIN, dan kunci UPSERT.
+    Duplikat (work_no, tanggal_absensi) lama digabung dulu ke catatan dengan
+    record_id terkecil (yang selama ini di-UPDATE): scan-nya disatukan
+    (_gabung_duplikat_catatan) dan Pelanggaran-nya dipindahkan, baru
+    duplikatnya dihapus. Indeks unik ini sekaligus menjadi indeks
+    (work_no, tanggal_absensi).
+    """
+    kolom = ', '.join(('record_id',) + KOLOM_JAM_CATATAN + ('waktu_anomali', 'catatan_editor'))
+    grup = {}
+    for work_no, tanggal, *baris in conn.execute(f"""
+        SELECT work_no, tanggal_absensi, {kolom} FROM CatatanAbsensi
+        WHERE (work_no, tanggal_absensi) IN (
+            SELECT work_no, tanggal_absensi FROM CatatanAbsensi
+            GROUP BY work_no, tanggal_absensi HAVING COUNT(*) > 1
+        )
+        ORDER BY work_no, tanggal_absensi, record_id
+    """):
+        grup.setdefault((work_no, tanggal), []).append(baris)
+
+    jumlah_dihapus = jumlah_pelanggaran = 0
+    for baris_baris in grup.values():
+        record_id = baris_baris[0][0]
+        duplikat = [baris[0] for baris in baris_baris[1:]]
+        tanda_tanya = ', '.join('?' * len(duplikat))
+        conn.execute(f"""
+            UPDATE CatatanAbsensi
+            SET {', '.join(f'{k} = ?' for k in kolom.split(', ')[1:])}
+            WHERE record_id = ?
+        """, (*_gabung_duplikat_catatan(baris_baris), record_id))
+        jumlah_pelanggaran += conn.execute(
+            f"UPDATE Pelanggaran SET record_id = ? WHERE record_id IN ({tanda_tanya})",
+            (record_id, *duplikat)
+        ).rowcount
+        jumlah_dihapus += conn.execute(
+            f"DELETE FROM CatatanAbsensi WHERE record_id IN ({tanda_tanya})", duplikat
+        ).rowcount
+
+    if jumlah_dihapus:
+        print(f"🟡 Migrasi v2: {jumlah_dihapus} catatan absensi duplikat digabung ke {len(grup)} catatan "
+              f"lalu dihapus ({jumlah_pelanggaran} pelanggaran dipindahkan).")
+    else:
+        print("✅ Migrasi v2: tidak ada catatan absensi duplikat.")
+    conn.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS ux_catatan_work_no_tanggal
+            ON CatatanAbsensi (work_no, tanggal_absensi)
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS ix_catatan_tanggal ON CatatanAbsensi (tanggal_absensi)")
+    conn.execute("CREATE INDEX IF NOT EXISTS ix_karyawan_dept ON Karyawan (dept_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS ix_pelanggaran_record ON Pelanggaran (record_id)")
+
+def _migrasi_v3(conn):
+    """
+    Versi 3: tabel ImportLog, mencatat file (berdasarkan hash isinya)
+    yang sudah diimpor untuk setiap tanggal absensi.
+    """
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS ImportLog (
+            import_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            file_hash CHAR(64) NOT NULL,
+            tanggal_absensi DATE NOT NULL,
+            nama_file VARCHAR(255),
+            jumlah_baris INTEGER,
+            waktu_impor TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE (file_hash, tanggal_absensi)
+        )
+    """)
+
+# Agregat harian per karyawan, dipakai untuk mengisi/membangun ulang RekapHarian
+SQL_AGREGAT_REKAP_HARIAN = """
+SELECT
+    work_no,
+    tanggal_absensi,
+    COUNT(*) AS hadir,
+    SUM(CASE WHEN status_validasi = 'PENDING' THEN 1 ELSE 0 END) AS pending,
+    SUM(CASE WHEN waktu_anomali IS NOT NULL THEN 1 ELSE 0 END) AS anomali
+FROM CatatanAbsensi
+GROUP BY work_no, tanggal_absensi
+"""
+
+def _migrasi_v4(conn):
+    """
+    Versi 4: tabel ringkasan RekapHarian (hadir/pending/anomali per karyawan
+    per hari) yang dijaga tetap sinkron oleh trigger di CatatanAbsensi,
+    sehingga laporan rekap tidak perlu meng-agregasi CatatanAbsensi lagi.
+    """
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS RekapHarian (
+            tanggal_absensi DATE NOT NULL,
+            work_no INTEGER NOT NULL,
+            hadir INTEGER NOT NULL DEFAULT 0,
+            pending INTEGER NOT NULL DEFAULT 0,
+            anomali INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (tanggal_absensi, work_no)
+        ) WITHOUT ROWID
+    """)
+
+    # Menambahkan kontribusi satu baris CatatanAbsensi (NEW) ke ringkasan
+    sql_tambah_new = """
+        INSERT INTO RekapHarian (tanggal_absensi, work_no, hadir, pending, anomali)
+        VALUES (
+            NEW.tanggal_absensi, NEW.work_no, 1,
+            CASE WHEN NEW.status_validasi = 'PENDING' THEN 1 ELSE 0 END,
+            CASE WHEN NEW.waktu_anomali IS NOT NULL THEN 1 ELSE 0 END
+        )
+        ON CONFLICT (tanggal_absensi, work_no) DO UPDATE SET
+            hadir = hadir + excluded.hadir,
+            pending = pending + excluded.pending,
+            anomali = anomali + excluded.anomali;
+    """
+    # Mengurangi kontribusi baris lama (OLD) dan membuang ringkasan kosong
+    sql_kurangi_old = """
+        UPDATE RekapHarian SET
+            hadir = hadir - 1,
+            pending = pending - CASE WHEN OLD.status_validasi = 'PENDING' THEN 1 ELSE 0 END,
+            anomali = anomali - CASE WHEN OLD.waktu_anomali IS NOT NULL THEN 1 ELSE 0 END
+        WHERE tanggal_absensi = OLD.tanggal_absensi AND work_no = OLD.work_no;
+        DELETE FROM RekapHarian
+        WHERE tanggal_absensi = OLD.tanggal_absensi AND work_no = OLD.work_no AND hadir <= 0;
+    """
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_rekap_catatan_insert
+        AFTER INSERT ON CatatanAbsensi
+        BEGIN {sql_tambah_new} END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_rekap_catatan_delete
+        AFTER DELETE ON CatatanAbsensi
+        BEGIN {sql_kurangi_old} END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_rekap_catatan_update
+        AFTER UPDATE OF work_no, tanggal_absensi, status_validasi, waktu_anomali ON CatatanAbsensi
+        BEGIN {sql_kurangi_old} {sql_tambah_new} END
+    """)
+
+    # Isi awal dari data yang sudah ada
+    conn.execute("DELETE FROM RekapHarian")
+    conn.execute(f"""
+        INSERT INTO RekapHarian (work_no, tanggal_absensi, hadir, pending, anomali)
+        {SQL_AGREGAT_REKAP_HARIAN}
+    """)
+
+# Jam teks yang diterima: 'HH:MM' atau 'HH.MM' (jam boleh satu digit)
+_POLA_JAM = re.compile(r'\s*(\d{1,2})[:.](\d{2})\s*')
+
+def menit_dari_jam(jam):
+    """
+    Mengubah jam menjadi menit sejak tengah malam: teks hasil parser
+    ('08:05' atau '08.05') -> 485. Angka (jam bertitik lama yang tersimpan
+    sebagai REAL karena afinitas NUMERIC kolom TIME, misalnya 8.05 atau 8)
+    juga diterima. Mengembalikan None untuk jam kosong/'N/A' dan untuk jam
+    di luar 00:00-23:59 ('25:70', '99.99', 8.75), agar nilai menit selalu
+    0..1439 (lihat SQL_MENIT_DIKEMAS).
+    """
+    if jam is None or jam == '' or jam == 'N/A':
+        return None
+    if isinstance(jam, (int, float)):
+        if not math.isfinite(jam) or jam < 0:
+            return None
+        jam_bulat = int(jam)
+        menit = round((jam - jam_bulat) * 100)
+    else:
+        cocok = _POLA_JAM.fullmatch(str(jam))
+        if not cocok:
+            return None
+        jam_bulat, menit = int(cocok.group(1)), int(cocok.group(2))
+    if jam_bulat > 23 or menit > 59:
+        return None
+    return jam_bulat * 60 + menit
+
+def jam_dari_menit(menit):
+    """
+    Kebalikan menit_dari_jam(): 485 -> '08:05' (format baku yang disimpan).
+    """
+    if menit is None:
+        return None
+    return f"{menit // 60:02d}:{menit % 60:02d}"
+
+def durasi_menit(mulai, selesai):
+    """
+    Durasi dalam menit antara dua jam (dalam menit). Jam selesai yang lebih
+    kecil dianggap melewati tengah malam. None jika salah satunya kosong.
+    """
+    if mulai is None or selesai is None:
+        return None
+    return (selesai - mulai) % 1440
+
+@functools.lru_cache(maxsize=4096)
+def _jam_baku(jam):
+    """
+    (menit, teks 'HH:MM') untuk satu nilai jam. Di-cache: satu hari hanya
+    punya 1440 jam berbeda, sedangkan impor menormalisasi puluhan ribu sel.
+    """
+    menit = menit_dari_jam(jam)
+    return menit, jam_dari_menit(menit)
+
+def menit_scan_anomali(waktu_anomali):
+    """
+    Memecah teks waktu_anomali ('12:01, 12.30') menjadi list menit. Jam
+    yang tidak valid dilewati.
     """
+    if not waktu_anomali or waktu_anomali == 'N/A':
+        return []
+    daftar = (menit_dari_jam(jam.strip()) for jam in str(waktu_anomali).split(','))
+    return [menit for menit in daftar if menit is not None]
+
+def kolom_menit_catatan(jam_masuk, jam_pulang, lembur_masuk, lembur_pulang, waktu_anomali):
+    """
+    Normalisasi satu catatan absensi. Mengembalikan (teks jam baku
+    [jam_masuk, jam_pulang, lembur_masuk, lembur_pulang, waktu_anomali],
+    nilai kolom menit [jam_masuk_menit, jam_pulang_menit, lembur_masuk_menit,
+    lembur_pulang_menit, menit_kerja, menit_lembur], list menit scan anomali).
+    """
+    masuk, teks_masuk = _jam_baku(jam_masuk)
+    pulang, teks_pulang = _jam_baku(jam_pulang)
+    l_masuk, teks_l_masuk = _jam_baku(lembur_masuk)
+    l_pulang, teks_l_pulang = _jam_baku(lembur_pulang)
+    anomali = menit_scan_anomali(waktu_anomali)
+    teks_anomali = ', '.join(jam_dari_menit(m) for m in anomali) if anomali else None
+    teks = (teks_masuk, teks_pulang, teks_l_masuk, teks_l_pulang, teks_anomali)
+    menit = (masuk, pulang, l_masuk, l_pulang,
+             durasi_menit(masuk, pulang), durasi_menit(l_masuk, l_pulang))
+    return teks, menit, anomali
+
+def _migrasi_v5(conn):
+    """
+    Versi 5: jam disimpan juga sebagai menit sejak tengah malam (INTEGER),
+    ditambah durasi kerja/lembur yang sudah dihitung, sehingga filter dan
+    agregat durasi cukup memakai operasi integer. Scan anomali dipindah ke
+    tabel anak ScanAnomali (satu baris per scan). Kolom teks lama tetap ada
+    untuk tampilan, dinormalisasi ke 'HH:MM' (jam bertitik seperti '07.55'
+    sebelumnya tersimpan sebagai angka 7.55 karena afinitas kolom TIME).
+    """
+    for kolom_menit in ('jam_masuk_menit', 'jam_pulang_menit', 'lembur_masuk_menit',
+                        'lembur_pulang_menit', 'menit_kerja', 'menit_lembur'):
+        conn.execute(f"ALTER TABLE CatatanAbsensi ADD COLUMN {kolom_menit} INTEGER")
+
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS ScanAnomali (
+            record_id INTEGER NOT NULL,
+            urutan INTEGER NOT NULL,
+            menit INTEGER NOT NULL,
+            PRIMARY KEY (record_id, urutan),
+            FOREIGN KEY (record_id) REFERENCES CatatanAbsensi (record_id)
+                ON DELETE CASCADE ON UPDATE CASCADE
+        ) WITHOUT ROWID
+    """)
+    # Jika teks anomali berubah, scan lama dibuang; impor menulis scan baru
+    # dengan ON CONFLICT DO NOTHING (teks yang sama = scan yang sama)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_anomali_catatan_update
+        AFTER UPDATE OF waktu_anomali ON CatatanAbsensi
+        WHEN OLD.waktu_anomali IS NOT NEW.waktu_anomali
+        BEGIN
+            DELETE FROM ScanAnomali WHERE record_id = OLD.record_id;
+        END
+    """)
+
+    # Indeks (tanggal, jam masuk) menggantikan indeks tanggal saja: filter
+    # rentang tanggal tetap memakainya, filter jam masuk per hari juga
+    conn.execute("DROP INDEX IF EXISTS ix_catatan_tanggal")
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS ix_catatan_tanggal_masuk
+            ON CatatanAbsensi (tanggal_absensi, jam_masuk_menit)
+    """)
+
+    # Isi kolom baru dari data yang sudah ada (dengan aturan yang sama
+    # seperti saat impor)
+    cursor = conn.execute("""
+        SELECT record_id, jam_masuk, jam_pulang, lembur_masuk, lembur_pulang, waktu_anomali
+        FROM CatatanAbsensi
+    """)
+    param_catatan, param_anomali = [], []
+    for record_id, *jam in cursor.fetchall():
+        teks, menit, anomali = kolom_menit_catatan(*jam)
+        param_catatan.append(teks + menit + (record_id,))
+        param_anomali.extend((record_id, urutan, m) for urutan, m in enumerate(anomali))
+    conn.executemany("""
+        UPDATE CatatanAbsensi SET
+            jam_masuk = ?, jam_pulang = ?, lembur_masuk = ?, lembur_pulang = ?, waktu_anomali = ?,
+            jam_masuk_menit = ?, jam_pulang_menit = ?, lembur_masuk_menit = ?,
+            lembur_pulang_menit = ?, menit_kerja = ?, menit_lembur = ?
+        WHERE record_id = ?
+    """, param_catatan)
+    conn.executemany("INSERT INTO ScanAnomali (record_id, urutan, menit) VALUES (?, ?, ?)", param_anomali)
+
+# Jadwal shift default (08:00-17:00, istirahat 60 menit) yang diisi migrasi v6
+JADWAL_SHIFT_DEFAULT = (480, 1020, 60, 0)
+
+# Kemasan jam untuk mesin metrik: keempat kolom *_menit digabung menjadi
+# satu INTEGER (BIT_MENIT bit per jam, MENIT_KOSONG = jam tidak ada), agar
+# memuat ratusan ribu catatan ke NumPy tidak membuat jutaan objek Python.
+# Nilai di luar 0..1439 dikemas sebagai MENIT_KOSONG agar tidak meluap ke
+# bit jam di sebelahnya.
+BIT_MENIT = 11
+MENIT_KOSONG = (1 << BIT_MENIT) - 1
+SQL_MENIT_DIKEMAS = " | ".join(
+    f"((CASE WHEN {kolom} BETWEEN 0 AND 1439 THEN {kolom} ELSE {MENIT_KOSONG} END) << {i * BIT_MENIT})"
+    for i, kolom in enumerate(('jam_masuk_menit', 'jam_pulang_menit', 'lembur_masuk_menit', 'lembur_pulang_menit'))
+)
+
+def _migrasi_v6(conn):
+    """
+    Versi 6: tabel JadwalShift (jam masuk/pulang, istirahat, toleransi
+    telat dalam menit) per departemen. Baris dengan dept_id NULL adalah
+    jadwal default untuk departemen yang tidak punya jadwal sendiri;
+    indeks unik pada IFNULL(dept_id, 0) menjamin satu jadwal per
+    departemen dan hanya satu jadwal default.
+
+    Indeks (tanggal, jam masuk) diperluas menjadi indeks yang mencakup
+    semua kolom yang dimuat mesin metrik, sehingga memuat satu bulan
+    cukup membaca indeks secara berurutan (tanpa lookup ke tabel).
+    """
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS JadwalShift (
+            jadwal_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            dept_id INTEGER,
+            jam_masuk_menit INTEGER NOT NULL,
+            jam_pulang_menit INTEGER NOT NULL,
+            istirahat_menit INTEGER NOT NULL DEFAULT 60,
+            toleransi_telat_menit INTEGER NOT NULL DEFAULT 0,
+            FOREIGN KEY (dept_id) REFERENCES Departemen (dept_id)
+                ON DELETE CASCADE ON UPDATE CASCADE
+        )
+    """)
+    conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS ux_jadwal_dept ON JadwalShift (IFNULL(dept_id, 0))")
+    conn.execute("""
+        INSERT INTO JadwalShift (dept_id, jam_masuk_menit, jam_pulang_menit, istirahat_menit, toleransi_telat_menit)
+        VALUES (NULL, ?, ?, ?, ?)
+        ON CONFLICT (IFNULL(dept_id, 0)) DO NOTHING
+    """, JADWAL_SHIFT_DEFAULT)
+
+    conn.execute("DROP INDEX IF EXISTS ix_catatan_tanggal_masuk")
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS ix_catatan_tanggal_jam
+            ON CatatanAbsensi (tanggal_absensi, jam_masuk_menit, jam_pulang_menit,
+                               lembur_masuk_menit, lembur_pulang_menit, work_no)
+    """)
+
+def _migrasi_v7(conn):
+    """
+    Versi 7: kolom kode_aturan di Pelanggaran untuk pelanggaran yang
+    dibuat detektor otomatis (NULL = dicatat manual). Indeks unik
+    (record_id, kode_aturan) membuat deteksi ulang idempoten: satu
+    pelanggaran per aturan per catatan. Indeks ini diawali record_id,
+    jadi menggantikan ix_pelanggaran_record.
+    """
+    conn.execute("ALTER TABLE Pelanggaran ADD COLUMN kode_aturan VARCHAR(32)")
+    conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS ux_pelanggaran_aturan ON Pelanggaran (record_id, kode_aturan)")
+    conn.execute("DROP INDEX IF EXISTS ix_pelanggaran_record")
+
+def _migrasi_v8(conn):
+    """
+    Versi 8: indeks teks penuh FTS5 CariKaryawan (nama karyawan + nama
+    departemen, rowid = work_no) untuk kotak pencarian di UI, dijaga
+    trigger di Karyawan dan Departemen. Opsi prefix menyimpan indeks
+    awalan 2 dan 3 huruf, sehingga pencarian awalan kata ('bud'*) tidak
+    perlu memindai seluruh kosakata.
+    """
+    conn.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS CariKaryawan USING fts5(
+            nama_karyawan, nama_departemen,
+            tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3'
+        )
+    """)
+    sql_tambah = """
+        INSERT INTO CariKaryawan (rowid, nama_karyawan, nama_departemen)
+        VALUES (new.work_no, new.nama_karyawan,
+                (SELECT nama_departemen FROM Departemen WHERE dept_id = new.dept_id));
+    """
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_cari_karyawan_insert AFTER INSERT ON Karyawan
+        BEGIN {sql_tambah} END
+    """)
+    # UPSERT impor meng-UPDATE semua karyawan; indeks hanya disentuh jika berubah
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_cari_karyawan_update
+        AFTER UPDATE OF work_no, nama_karyawan, dept_id ON Karyawan
+        WHEN old.work_no IS NOT new.work_no OR old.nama_karyawan IS NOT new.nama_karyawan
+          OR old.dept_id IS NOT new.dept_id
+        BEGIN
+            DELETE FROM CariKaryawan WHERE rowid = old.work_no;
+            {sql_tambah}
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_cari_karyawan_delete AFTER DELETE ON Karyawan
+        BEGIN DELETE FROM CariKaryawan WHERE rowid = old.work_no; END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_cari_departemen_update
+        AFTER UPDATE OF nama_departemen ON Departemen
+        WHEN old.nama_departemen IS NOT new.nama_departemen
+        BEGIN
+            UPDATE CariKaryawan SET nama_departemen = new.nama_departemen
+            WHERE rowid IN (SELECT work_no FROM Karyawan WHERE dept_id = new.dept_id);
+        END
+    """)
+
+    conn.execute("DELETE FROM CariKaryawan")
+    conn.execute("""
+        INSERT INTO CariKaryawan (rowid, nama_karyawan, nama_departemen)
+        SELECT K.work_no, K.nama_karyawan, D.nama_departemen
+        FROM Karyawan K
+        LEFT JOIN Departemen D ON K.dept_id = D.dept_id
+    """)
+
+# Daftar migrasi berurutan: (versi, deskripsi, fungsi)
+MIGRASI = [
+    (1, "Tabel dasar", _migrasi_v1),
+    (2, "Indeks performa & kunci unik UPSERT", _migrasi_v2),
+    (3, "Tabel ImportLog (hash file yang sudah diimpor)", _migrasi_v3),
+    (4, "Tabel ringkasan RekapHarian + trigger", _migrasi_v4),
+    (5, "Kolom menit (INTEGER) + durasi + tabel ScanAnomali", _migrasi_v5),
+    (6, "Tabel JadwalShift (per departemen + default) + indeks metrik", _migrasi_v6),
+    (7, "Kolom kode_aturan di Pelanggaran (deteksi otomatis)", _migrasi_v7),
+    (8, "Indeks pencarian FTS5 CariKaryawan + trigger", _migrasi_v8),
+]
+
+# Versi skema terbaru yang dikenal aplikasi ini
+VERSI_SKEMA = MIGRASI[-1][0]
+
+def jalankan_migrasi(conn):
+    """
+    Menaikkan skema database ke VERSI_SKEMA secara bertahap.
+    Setiap migrasi berjalan dalam transaksinya sendiri bersama update
+    PRAGMA user_version, lalu ANALYZE dijalankan jika ada yang di-upgrade.
+    Aman dipanggil berulang kali (tidak melakukan apa-apa jika sudah terbaru).
+
+    Returns:
+        bool: True jika skema sudah terbaru, False jika migrasi gagal.
+    """
+    versi = conn.execute("PRAGMA user_version").fetchone()[0]
+    if versi >= VERSI_SKEMA:
+        return True
+
+    for versi_migrasi, deskripsi, fungsi in MIGRASI:
+        if versi_migrasi <= versi:
+            continue
+        print(f"Migrasi skema v{versi_migrasi}: {deskripsi}...")
+        try:
+            conn.execute("BEGIN")
+            fungsi(conn)
+            conn.execute(f"PRAGMA user_version = {versi_migrasi}")
+            conn.commit()
+        except Error as e:
+            conn.rollback()
+            print(f"❌ ERROR saat migrasi skema v{versi_migrasi}: {e}")
+            return False
+
+    # Perbarui statistik agar query planner memakai indeks yang baru
+    conn.execute("ANALYZE")
+    conn.commit()
+    return True
+
+def rebuild_rekap_harian(conn):
+    """
+    Membangun ulang seluruh isi RekapHarian dari CatatanAbsensi
+    (misalnya setelah data diubah langsung tanpa trigger).
+    Mengembalikan jumlah baris ringkasan yang dibuat.
+    """
+    if not conn.in_transaction:
+        conn.execute("BEGIN")
     try:
-        c = conn.cursor()
-        c.execute(sql_perintah_buat_tabel)
-    except Error as e:
-        print(f"Error saat membuat tabel: {e}")
+        conn.execute("DELETE FROM RekapHarian")
+        cursor = conn.execute(f"""
+            INSERT INTO RekapHarian (work_no, tanggal_absensi, hadir, pending, anomali)
+            {SQL_AGREGAT_REKAP_HARIAN}
+        """)
+        conn.commit()
+    except Error:
+        conn.rollback()
+        raise
+    return cursor.rowcount
+
+def cek_konsistensi_rekap(conn):
+    """
+    Membandingkan RekapHarian dengan agregat langsung dari CatatanAbsensi.
+    Mengembalikan list (work_no, tanggal_absensi) yang tidak cocok
+    (list kosong berarti ringkasan konsisten).
+    """
+    cursor = conn.execute(f"""
+        SELECT work_no, tanggal_absensi FROM (
+            SELECT * FROM ({SQL_AGREGAT_REKAP_HARIAN})
+            EXCEPT
+            SELECT work_no, tanggal_absensi, hadir, pending, anomali FROM RekapHarian
+            UNION ALL
+            SELECT * FROM (
+                SELECT work_no, tanggal_absensi, hadir, pending, anomali FROM RekapHarian
+                EXCEPT
+                SELECT * FROM ({SQL_AGREGAT_REKAP_HARIAN})
+            )
+        )
+        GROUP BY work_no, tanggal_absensi
+        ORDER BY tanggal_absensi, work_no
+    """)
+    return [tuple(row) for row in cursor.fetchall()]
 
 def inisialisasi_database(nama_db):
     """
     Fungsi utama untuk membuat database dan semua tabel di dalamnya.
-    """
-    
-    # SQL untuk membuat tabel Departemen
-    sql_tabel_departemen = """
-    CREATE TABLE IF NOT EXISTS Departemen (
-        dept_id INTEGER PRIMARY KEY AUTOINCREMENT,
-        nama_departemen VARCHAR(100) NOT NULL UNIQUE
-    );
-    """
-
-    # SQL untuk membuat tabel Karyawan
-    sql_tabel_karyawan = """
-    CREATE TABLE IF NOT EXISTS Karyawan (
-        work_no INTEGER PRIMARY KEY,
-        nama_karyawan VARCHAR(255) NOT NULL,
-        dept_id INTEGER,
-        status_aktif BOOLEAN DEFAULT 1,
-        FOREIGN KEY (dept_id) REFERENCES Departemen (dept_id)
-            ON DELETE SET NULL ON UPDATE CASCADE
-    );
-    """
-
-    # SQL untuk membuat tabel CatatanAbsensi
-    sql_tabel_catatan_absensi = """
-    CREATE TABLE IF NOT EXISTS CatatanAbsensi (
-        record_id INTEGER PRIMARY KEY AUTOINCREMENT,
-        work_no INTEGER NOT NULL,
-        tanggal_absensi DATE NOT NULL,
-        jam_masuk TIME,
-        jam_pulang TIME,
-        lembur_masuk TIME,
-        lembur_pulang TIME,
-        waktu_anomali VARCHAR(255),
-        status_validasi VARCHAR(50) DEFAULT 'PENDING',
-        catatan_editor TEXT,
-        FOREIGN KEY (work_no) REFERENCES Karyawan (work_no)
-            ON DELETE CASCADE ON UPDATE CASCADE
-    );
-    """
-
-    # SQL untuk membuat tabel Pelanggaran
-    sql_tabel_pelanggaran = """
-    CREATE TABLE IF NOT EXISTS Pelanggaran (
-        pelanggaran_id INTEGER PRIMARY KEY AUTOINCREMENT,
-        record_id INTEGER NOT NULL,
-        waktu_mulai TIME,
-        waktu_selesai TIME,
-        catatan_pelanggaran TEXT,
-        FOREIGN KEY (record_id) REFERENCES CatatanAbsensi (record_id)
-            ON DELETE CASCADE ON UPDATE CASCADE
-    );
+    Untuk database yang sudah ada, fungsi ini meng-upgrade skemanya.
+    Mengembalikan True jika skema sudah terbaru, False jika gagal.
     """
     
     # -- Mulai proses --
@@ -93,30 +645,44 @@ def inisialisasi_database(nama_db):
         # (Sangat penting untuk integritas data)
         conn.execute("PRAGMA foreign_keys = ON;")
 
-        # Membuat tabel-tabel
-        print("Mencoba membuat tabel Departemen...")
-        buat_tabel(conn, sql_tabel_departemen)
-        
-        print("Mencoba membuat tabel Karyawan...")
-        buat_tabel(conn, sql_tabel_karyawan)
-        
-        print("Mencoba membuat tabel CatatanAbsensi...")
-        buat_tabel(conn, sql_tabel_catatan_absensi)
-        
-        print("Mencoba membuat tabel Pelanggaran...")
-        buat_tabel(conn, sql_tabel_pelanggaran)
-        
-        print("\n✅ Inisialisasi database selesai.")
+        # Membuat tabel-tabel dan indeks (lewat migrasi)
+        berhasil = jalankan_migrasi(conn)
+        if berhasil:
+            print("\n✅ Inisialisasi database selesai.")
         
         conn.close()
+        return berhasil
     else:
         print("❌ ERROR: Tidak dapat membuat koneksi ke database.")
+        return False
 
 # --- Bagian ini akan berjalan jika Anda menjalankan file ini ---
 if __name__ == '__main__':
     """
     Jalankan file ini secara langsung (python database_setup.py)
     HANYA SEKALI untuk membuat file absensi.db Anda.
+    Perintah perawatan: 'rebuild-rekap' dan 'cek-rekap'.
     """
-    print(f"--- Memulai Setup Database '{NAMA_DATABASE}' ---")
-    inisialisasi_database(NAMA_DATABASE)
+    import sys
+
+    perintah = sys.argv[1] if len(sys.argv) > 1 else 'init'
+    if perintah == 'rebuild-rekap':
+        # python database_setup.py rebuild-rekap
+        conn = buat_koneksi(NAMA_DATABASE)
+        jalankan_migrasi(conn)
+        print(f"✅ RekapHarian dibangun ulang: {rebuild_rekap_harian(conn)} baris.")
+        conn.close()
+    elif perintah == 'cek-rekap':
+        # python database_setup.py cek-rekap
+        conn = buat_koneksi(NAMA_DATABASE)
+        jalankan_migrasi(conn)
+        selisih = cek_konsistensi_rekap(conn)
+        if selisih:
+            print(f"❌ {len(selisih)} ringkasan tidak konsisten, contoh: {selisih[:10]}")
+            print("Jalankan: python database_setup.py rebuild-rekap")
+        else:
+            print("✅ RekapHarian konsisten dengan CatatanAbsensi.")
+        conn.close()
+    else:
+        print(f"--- Memulai Setup Database '{NAMA_DATABASE}' ---")
+        inisialisasi_database(NAMA_DATABASE)
@@ -0,0 +1,274 @@
+"""
+Ekspor laporan (data absensi, rekap, pelanggaran) ke file CSV, XLSX, atau
+JSON.
+
+Baris dibaca dari cursor SQLite sedikit demi sedikit (fetchmany) dan
+langsung ditulis ke file, tanpa membangun list of dict seluruh laporan
+terlebih dahulu, sehingga pemakaian memori tetap datar walaupun rentang
+tanggalnya bertahun-tahun. XLSX ditulis dengan workbook openpyxl mode
+write_only (baris yang sudah ditulis tidak disimpan di memori).
+
+File ditulis ke '<nama>.tmp' lalu di-rename, jadi ekspor yang gagal atau
+dibatalkan tidak meninggalkan file setengah jadi. tulis_laporan() menulis
+CSV/JSON ke stream yang sudah terbuka (misalnya stdout, untuk CLI main.py).
+"""
+import csv
+import json
+import os
+import sqlite3
+
+# Jumlah baris yang diambil dari cursor per fetchmany; progres dilaporkan
+# dan permintaan batal diperiksa setiap batch
+UKURAN_BATCH_EKSPOR = 5000
+
+# Batas baris per sheet Excel (termasuk header); baris berikutnya
+# dilanjutkan di sheet baru
+MAKS_BARIS_SHEET = 1048576
+
+# Jenis laporan yang bisa diekspor -> judul (nama sheet XLSX)
+JENIS_LAPORAN = {
+    'absensi': 'Data Absensi',
+    'rekap': 'Rekap Absensi',
+    'pelanggaran': 'Pelanggaran',
+}
+
+FORMAT_EKSPOR = ('.csv', '.xlsx', '.json')
+
+# Format yang bisa ditulis ke stream teks (tulis_laporan)
+FORMAT_STREAM = ('.csv', '.json')
+
+
+class EksporDibatalkan(Exception):
+    """
+    Dilempar di dalam ekspor saat pengguna meminta pembatalan.
+    File sementara akan dihapus.
+    """
+    pass
+
+
+def _baca_laporan(manager, jenis, start_date, end_date):
+    """
+    Membuka cursor laporan lewat DataManager dan mengembalikan
+    (daftar nama kolom, generator batch baris berupa tuple).
+    Rekap ditambah kolom metrik shift per karyawan (KOLOM_METRIK_REKAP).
+    """
+    from data_manager import KOLOM_METRIK_REKAP
+
+    if jenis == 'absensi':
+        cursor = manager.buka_kursor_absensi(start_date, end_date)
+    elif jenis == 'rekap':
+        cursor = manager.buka_kursor_rekap(start_date, end_date)
+    else:
+        cursor = manager.buka_kursor_pelanggaran(start_date, end_date)
+    cursor.row_factory = None # Tuple biasa, langsung bisa ditulis
+    kolom = [d[0] for d in cursor.description]
+
+    metrik = None
+    if jenis == 'rekap':
+        # Satu dict kecil per karyawan, bukan per catatan
+        metrik = manager.agregat_metrik_absensi(start_date, end_date)
+        kosong = (0,) * len(KOLOM_METRIK_REKAP)
+        idx_work_no = kolom.index('work_no')
+        kolom = kolom + list(KOLOM_METRIK_REKAP)
+
+    def daftar_batch():
+        try:
+            while True:
+                baris = cursor.fetchmany(UKURAN_BATCH_EKSPOR)
+                if not baris:
+                    break
+                if metrik is not None:
+                    baris = [
+                        row + (tuple(metrik[row[idx_work_no]][k] for k in KOLOM_METRIK_REKAP)
+                               if row[idx_work_no] in metrik else kosong)
+                        for row in baris
+                    ]
+                yield baris
+        finally:
+            # Melepas read lock SQLite walaupun ekspor berhenti di tengah
+            cursor.close()
+
+    return kolom, daftar_batch()
+
+
+def _tulis_csv(file_path, judul, kolom, daftar_batch, lapor):
+    """
+    Menulis header + semua batch ke CSV (UTF-8 dengan BOM agar terbaca
+    benar di Excel). Mengembalikan jumlah baris data.
+    """
+    with open(file_path, 'w', newline='', encoding='utf-8-sig') as f:
+        return _tulis_csv_ke(f, kolom, daftar_batch, lapor)
+
+
+def _tulis_csv_ke(f, kolom, daftar_batch, lapor):
+    """
+    Menulis header + semua batch CSV ke stream teks f.
+    """
+    jumlah = 0
+    writer = csv.writer(f)
+    writer.writerow(kolom)
+    for baris in daftar_batch:
+        writer.writerows(baris)
+        jumlah += len(baris)
+        lapor(jumlah)
+    return jumlah
+
+
+def _tulis_json(file_path, judul, kolom, daftar_batch, lapor):
+    """
+    Menulis semua batch ke file JSON (UTF-8). Mengembalikan jumlah baris data.
+    """
+    with open(file_path, 'w', encoding='utf-8') as f:
+        return _tulis_json_ke(f, kolom, daftar_batch, lapor)
+
+
+def _tulis_json_ke(f, kolom, daftar_batch, lapor):
+    """
+    Menulis array JSON berisi satu object {kolom: nilai} per baris ke
+    stream teks f. Ditulis per baris, tanpa membangun list seluruh laporan.
+    """
+    jumlah = 0
+    f.write('[')
+    for baris in daftar_batch:
+        for row in baris:
+            f.write(',\n' if jumlah else '\n')
+            f.write(json.dumps(dict(zip(kolom, row)), ensure_ascii=False))
+            jumlah += 1
+        lapor(jumlah)
+    f.write('\n]\n')
+    return jumlah
+
+
+def _tulis_xlsx(file_path, judul, kolom, daftar_batch, lapor):
+    """
+    Menulis header + semua batch ke workbook openpyxl write_only. Jika
+    baris melebihi MAKS_BARIS_SHEET, dilanjutkan di sheet '<judul> (2)',
+    dst. dengan header yang sama. Mengembalikan jumlah baris data.
+    """
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    nomor_sheet = 0
+    sisa_baris_sheet = 0
+    sheet = None
+    jumlah = 0
+    try:
+        for baris in daftar_batch:
+            for row in baris:
+                if sisa_baris_sheet == 0:
+                    nomor_sheet += 1
+                    sheet = workbook.create_sheet(judul if nomor_sheet == 1 else f"{judul} ({nomor_sheet})")
+                    sheet.append(kolom)
+                    sisa_baris_sheet = MAKS_BARIS_SHEET - 1
+                sheet.append(row)
+                sisa_baris_sheet -= 1
+            jumlah += len(baris)
+            lapor(jumlah)
+    finally:
+        if sheet is None:
+            # Laporan kosong: tetap satu sheet berisi header
+            workbook.create_sheet(judul).append(kolom)
+        # Juga saat dibatalkan: save() menutup sheet dan membersihkan file
+        # sementara openpyxl (file hasilnya dihapus oleh ekspor_laporan)
+        workbook.save(file_path)
+    return jumlah
+
+
+def ekspor_laporan(manager, jenis, start_date, end_date, file_path,
+                   progress_callback=None, cek_batal=None, format_file=None):
+    """
+    FUNGSI UTAMA UNTUK UI:
+    Mengekspor laporan jenis 'absensi', 'rekap', atau 'pelanggaran' di
+    rentang tanggal ke file_path. Format ditentukan dari ekstensi file
+    (.csv, .xlsx, atau .json), kecuali diberikan lewat format_file.
+
+    progress_callback(jumlah, total) dipanggil setelah setiap batch
+    ditulis. cek_batal() dipanggil di antara batch; jika mengembalikan
+    True, ekspor dihentikan dan file sementara dihapus. File sementara juga
+    dihapus jika terjadi exception lain (exception tersebut diteruskan).
+
+    Mengembalikan dict {'file', 'jenis', 'baris'} jika sukses, atau
+    False jika gagal/dibatalkan.
+    """
+    if jenis not in JENIS_LAPORAN:
+        print(f"❌ Ekspor GAGAL: jenis laporan tidak dikenal: {jenis!r}")
+        return False
+    format_file = (format_file or os.path.splitext(file_path)[1]).lower()
+    if format_file not in FORMAT_EKSPOR:
+        print(f"❌ Ekspor GAGAL: format file harus {', '.join(FORMAT_EKSPOR)}, bukan {format_file!r}")
+        return False
+
+    print(f"Memulai ekspor {JENIS_LAPORAN[jenis]} {start_date} s/d {end_date} ke {file_path}...")
+    file_sementara = file_path + '.tmp'
+    try:
+        total = manager.hitung_baris_laporan(jenis, start_date, end_date)
+
+        def lapor(jumlah):
+            if cek_batal and cek_batal():
+                raise EksporDibatalkan()
+            if progress_callback:
+                progress_callback(jumlah, total)
+
+        kolom, daftar_batch = _baca_laporan(manager, jenis, start_date, end_date)
+        tulis = {'.csv': _tulis_csv, '.xlsx': _tulis_xlsx, '.json': _tulis_json}[format_file]
+        try:
+            jumlah = tulis(file_sementara, JENIS_LAPORAN[jenis], kolom, daftar_batch, lapor)
+        finally:
+            daftar_batch.close()
+        os.replace(file_sementara, file_path)
+
+    except EksporDibatalkan:
+        _hapus_file(file_sementara)
+        print("🟡 Ekspor dibatalkan.")
+        return False
+    except (OSError, sqlite3.Error) as e:
+        _hapus_file(file_sementara)
+        print(f"❌ Ekspor GAGAL: {e}")
+        return False
+    except BaseException:
+        # Error lain (bug, KeyboardInterrupt, ...) diteruskan ke pemanggil,
+        # tetapi file sementara tidak boleh tertinggal
+        _hapus_file(file_sementara)
+        raise
+
+    print(f"✅ Ekspor berhasil: {jumlah} baris ditulis ke {file_path}.")
+    return {'file': file_path, 'jenis': jenis, 'baris': jumlah}
+
+
+def tulis_laporan(manager, jenis, start_date, end_date, stream, format_file='.csv'):
+    """
+    Seperti ekspor_laporan, tetapi laporan (format '.csv' atau '.json')
+    ditulis ke stream teks yang sudah terbuka, misalnya sys.stdout.
+    Baris tetap dialirkan dari cursor per batch.
+
+    Mengembalikan dict {'jenis', 'baris'} jika sukses, atau False jika gagal.
+    """
+    if jenis not in JENIS_LAPORAN:
+        print(f"❌ Ekspor GAGAL: jenis laporan tidak dikenal: {jenis!r}")
+        return False
+    if format_file not in FORMAT_STREAM:
+        print(f"❌ Ekspor GAGAL: format stream harus {' atau '.join(FORMAT_STREAM)}, bukan {format_file!r}")
+        return False
+
+    try:
+        kolom, daftar_batch = _baca_laporan(manager, jenis, start_date, end_date)
+        tulis = _tulis_csv_ke if format_file == '.csv' else _tulis_json_ke
+        try:
+            jumlah = tulis(stream, kolom, daftar_batch, lambda jumlah: None)
+        finally:
+            daftar_batch.close()
+        stream.flush()
+    except (OSError, sqlite3.Error) as e:
+        print(f"❌ Ekspor GAGAL: {e}")
+        return False
+    return {'jenis': jenis, 'baris': jumlah}
+
+
+def _hapus_file(file_path):
+    """
+    Menghapus file sementara ekspor jika ada.
+    """
+    try:
+        os.remove(file_path)
+    except FileNotFoundError:
+        pass
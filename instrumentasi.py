@@ -0,0 +1,306 @@
+"""
+Instrumentasi opsional untuk DataManager: waktu per method publik, waktu
+dan jumlah baris per statement SQL, waktu parse vs waktu database, serta
+log query lambat lengkap dengan EXPLAIN QUERY PLAN.
+
+Cara pakai:
+    inst = Instrumentasi(ambang_lambat=0.2)
+    manager = DataManager(instrumentasi=inst)
+    ...
+    inst.cetak_ringkasan()
+    statistik = manager.statistik_instrumentasi()
+
+Atau tanpa mengubah kode, set environment variable sebelum aplikasi jalan:
+    ABSENSI_INSTRUMENTASI=0.2   (ambang query lambat dalam detik)
+"""
+import functools
+import sqlite3
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# Environment variable untuk menyalakan instrumentasi (nilainya = ambang lambat, detik)
+ENV_INSTRUMENTASI = 'ABSENSI_INSTRUMENTASI'
+
+# Ambang default statement dianggap lambat (detik)
+AMBANG_LAMBAT_DEFAULT = 0.5
+
+# Progress handler SQLite dipanggil setiap N instruksi VM
+LANGKAH_PROGRESS = 1000
+
+
+def _rapikan_sql(sql):
+    """
+    Menyatukan spasi/baris baru agar statement yang sama punya satu kunci.
+    """
+    return ' '.join(sql.split())
+
+
+def _jumlah_baris(hasil):
+    """
+    Jumlah baris dari nilai kembalian method DataManager (jika bisa ditebak).
+    """
+    if isinstance(hasil, list):
+        return len(hasil)
+    if isinstance(hasil, dict):
+        if 'data' in hasil:
+            return len(hasil['data'])
+        return hasil.get('diproses')
+    if isinstance(hasil, int) and not isinstance(hasil, bool):
+        return hasil
+    return None
+
+
+class Instrumentasi:
+    """
+    Pengumpul statistik. Satu objek boleh dipakai beberapa DataManager
+    (misalnya UI dan worker impor), karena semua pencatatan memakai lock.
+    """
+
+    def __init__(self, ambang_lambat=AMBANG_LAMBAT_DEFAULT, maks_log_lambat=100):
+        self.ambang_lambat = ambang_lambat
+        self._lock = threading.Lock()
+        self._method = {}
+        self._sql = {}
+        self._tahap = {}
+        self._log_lambat = deque(maxlen=maks_log_lambat)
+
+    # --- Pencatatan ---
+
+    @staticmethod
+    def _tambah(tabel, kunci, detik, baris=None, langkah_vm=0, program=0, jumlah=1):
+        entri = tabel.setdefault(kunci, {'jumlah': 0, 'total_detik': 0.0, 'maks_detik': 0.0,
+                                         'baris': 0, 'langkah_vm': 0, 'program': 0})
+        entri['jumlah'] += jumlah
+        entri['total_detik'] += detik
+        entri['maks_detik'] = max(entri['maks_detik'], detik)
+        entri['baris'] += baris or 0
+        entri['langkah_vm'] += langkah_vm
+        entri['program'] += program
+
+    def catat_method(self, nama, detik, baris=None):
+        with self._lock:
+            self._tambah(self._method, nama, detik, baris)
+
+    def catat_tahap(self, nama, detik):
+        with self._lock:
+            self._tambah(self._tahap, nama, detik)
+
+    def catat_sql(self, sql, detik, baris=0, langkah_vm=0, program=0, jumlah=1):
+        with self._lock:
+            self._tambah(self._sql, sql, detik, baris, langkah_vm, program, jumlah)
+
+    def catat_lambat(self, sql, detik, baris, rencana):
+        entri = {
+            'sql': sql,
+            'detik': round(detik, 6),
+            'baris': baris,
+            'rencana': rencana,
+            'waktu': time.strftime('%Y-%m-%d %H:%M:%S'),
+        }
+        with self._lock:
+            self._log_lambat.append(entri)
+        print(f"🟡 Query lambat ({detik:.3f} s): {sql[:120]}")
+        for langkah in rencana:
+            print(f"     {langkah}")
+
+    @contextmanager
+    def ukur_tahap(self, nama):
+        """
+        Context manager untuk mengukur satu tahap (misalnya 'parse' atau 'db').
+        """
+        mulai = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.catat_tahap(nama, time.perf_counter() - mulai)
+
+    # --- API statistik ---
+
+    def statistik(self):
+        """
+        Mengembalikan salinan semua statistik:
+        {'method', 'sql', 'tahap': {nama: {jumlah, total_detik, maks_detik,
+        rata_detik, baris, langkah_vm, program}}, 'query_lambat': [...]}.
+
+        langkah_vm: perkiraan jumlah instruksi VM SQLite (dari progress
+        handler). program: jumlah program SQLite yang dijalankan (dari trace
+        callback), termasuk setiap baris executemany dan setiap trigger.
+        """
+        def salin(tabel):
+            hasil = {}
+            for kunci, entri in tabel.items():
+                hasil[kunci] = dict(entri, rata_detik=entri['total_detik'] / entri['jumlah'] if entri['jumlah'] else 0.0)
+            return hasil
+
+        with self._lock:
+            return {
+                'method': salin(self._method),
+                'sql': salin(self._sql),
+                'tahap': salin(self._tahap),
+                'query_lambat': list(self._log_lambat),
+            }
+
+    def reset(self):
+        with self._lock:
+            self._method.clear()
+            self._sql.clear()
+            self._tahap.clear()
+            self._log_lambat.clear()
+
+    def cetak_ringkasan(self, n=10):
+        """
+        Mencetak method, tahap, dan statement SQL dengan total waktu terbesar.
+        """
+        statistik = self.statistik()
+        for judul, kunci in [('Method', 'method'), ('Tahap', 'tahap'), ('SQL', 'sql')]:
+            print(f"\n--- {judul} (total waktu terbesar) ---")
+            urut = sorted(statistik[kunci].items(), key=lambda item: item[1]['total_detik'], reverse=True)
+            for nama, entri in urut[:n]:
+                print(f"  {entri['total_detik']:8.3f} s  {entri['jumlah']:6d}x  "
+                      f"{entri['baris']:8d} baris  {nama[:100]}")
+        if statistik['query_lambat']:
+            print(f"\n--- {len(statistik['query_lambat'])} query lambat (>= {self.ambang_lambat} s) ---")
+
+
+# -----------------------------------------------------------------
+# --- KONEKSI & CURSOR TERINSTRUMENTASI ---
+# -----------------------------------------------------------------
+
+class KursorTerinstrumentasi(sqlite3.Cursor):
+    """
+    Cursor yang mengukur waktu execute/executemany dan fetch*, jumlah baris,
+    langkah VM dan jumlah program SQLite per statement.
+    """
+
+    def _mulai(self, sql, params):
+        self._sql_inst = _rapikan_sql(sql)
+        self._params_inst = params
+        self._detik_inst = 0.0
+        self._baris_inst = 0
+        self._sudah_lambat = False
+
+    def _selesai(self, detik, baris, penghitung_awal, jumlah=1):
+        koneksi = self.connection
+        inst = koneksi.instrumentasi
+        langkah_awal, program_awal = penghitung_awal
+        self._detik_inst += detik
+        self._baris_inst += baris
+        inst.catat_sql(self._sql_inst, detik, baris, koneksi.langkah_vm - langkah_awal,
+                       koneksi.jumlah_program - program_awal, jumlah)
+        if not self._sudah_lambat and self._detik_inst >= inst.ambang_lambat:
+            self._sudah_lambat = True
+            inst.catat_lambat(self._sql_inst, self._detik_inst, self._baris_inst,
+                              koneksi.rencana_query(self._sql_inst, self._params_inst))
+
+    def execute(self, sql, parameters=()):
+        self._mulai(sql, parameters)
+        penghitung_awal = self.connection.penghitung()
+        mulai = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            baris = max(self.rowcount, 0)
+            self._selesai(time.perf_counter() - mulai, baris, penghitung_awal)
+
+    def executemany(self, sql, seq_of_parameters):
+        seq_of_parameters = list(seq_of_parameters)
+        self._mulai(sql, seq_of_parameters[0] if seq_of_parameters else ())
+        penghitung_awal = self.connection.penghitung()
+        mulai = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            # Dicatat sebagai satu eksekusi (baris = jumlah baris yang terpengaruh)
+            self._selesai(time.perf_counter() - mulai, max(self.rowcount, 0), penghitung_awal)
+
+    def _fetch(self, ambil, *args):
+        penghitung_awal = self.connection.penghitung()
+        mulai = time.perf_counter()
+        hasil = ambil(*args)
+        baris = len(hasil) if isinstance(hasil, list) else int(hasil is not None)
+        if getattr(self, '_sql_inst', None):
+            # Waktu fetch ditambahkan ke statement yang sama (bukan eksekusi baru)
+            self._selesai(time.perf_counter() - mulai, baris, penghitung_awal, jumlah=0)
+        return hasil
+
+    def fetchone(self):
+        return self._fetch(super().fetchone)
+
+    def fetchmany(self, size=None):
+        return self._fetch(super().fetchmany, self.arraysize if size is None else size)
+
+    def fetchall(self):
+        return self._fetch(super().fetchall)
+
+
+class KoneksiTerinstrumentasi(sqlite3.Connection):
+    """
+    Koneksi (dipakai lewat sqlite3.connect(..., factory=...)) yang cursornya
+    selalu KursorTerinstrumentasi. Trace callback menghitung program SQLite
+    yang dijalankan (termasuk trigger), progress handler menghitung langkah VM.
+    """
+    instrumentasi = None
+    langkah_vm = 0
+    jumlah_program = 0
+
+    def pasang(self, instrumentasi):
+        self.instrumentasi = instrumentasi
+        self.langkah_vm = 0
+        self.jumlah_program = 0
+        self.set_trace_callback(self._trace)
+        self.set_progress_handler(self._progress, LANGKAH_PROGRESS)
+
+    def penghitung(self):
+        return self.langkah_vm, self.jumlah_program
+
+    def _trace(self, teks):
+        self.jumlah_program += 1
+
+    def _progress(self):
+        self.langkah_vm += LANGKAH_PROGRESS
+        return 0 # 0 = lanjutkan query
+
+    def rencana_query(self, sql, params):
+        """
+        EXPLAIN QUERY PLAN untuk statement (dijalankan dengan cursor biasa
+        agar tidak ikut tercatat). Mengembalikan list baris rencana.
+        """
+        kata_awal = sql.split(None, 1)[0].upper() if sql.strip() else ''
+        if kata_awal not in ('SELECT', 'WITH', 'INSERT', 'UPDATE', 'DELETE', 'REPLACE'):
+            return []
+        try:
+            kursor = sqlite3.Cursor(self)
+            kursor.row_factory = None
+            baris = kursor.execute("EXPLAIN QUERY PLAN " + sql, params).fetchall()
+            kursor.close()
+            return [baris_rencana[-1] for baris_rencana in baris]
+        except sqlite3.Error as e:
+            return [f"(EXPLAIN QUERY PLAN gagal: {e})"]
+
+    def cursor(self, factory=KursorTerinstrumentasi):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+def diukur(fungsi):
+    """
+    Dekorator method publik DataManager: mencatat waktu dan jumlah baris
+    hasil ke self.instrumentasi (jika instrumentasi aktif).
+    """
+    @functools.wraps(fungsi)
+    def pembungkus(self, *args, **kwargs):
+        inst = self.instrumentasi
+        if inst is None:
+            return fungsi(self, *args, **kwargs)
+        mulai = time.perf_counter()
+        hasil = fungsi(self, *args, **kwargs)
+        inst.catat_method(fungsi.__name__, time.perf_counter() - mulai, _jumlah_baris(hasil))
+        return hasil
+    return pembungkus
@@ -0,0 +1,141 @@
+"""
+Pembuat koneksi SQLite dengan pragma yang sudah di-tuning, dan pool
+koneksi untuk satu file database: satu koneksi penulis (dipakai bersama,
+dijaga kunci) dan satu koneksi pembaca per thread.
+
+Dengan journal_mode=WAL, pembaca tidak menghalangi penulis dan sebaliknya,
+jadi laporan bisa dibaca sementara impor berjalan di thread lain tanpa
+error "database is locked".
+"""
+import sqlite3
+import threading
+import weakref
+
+from instrumentasi import KoneksiTerinstrumentasi
+
+# Nilai default pragma (bisa diganti lewat argumen PoolKoneksi / buka_koneksi)
+UKURAN_CACHE_KB = 64 * 1024          # PRAGMA cache_size, per koneksi (KiB)
+UKURAN_MMAP = 256 * 1024 * 1024      # PRAGMA mmap_size (byte), 0 = mati
+BUSY_TIMEOUT_MS = 5000               # Lama menunggu lock sebelum error
+
+
+def adalah_memori(db_file):
+    """
+    True jika db_file adalah database in-memory. Setiap koneksi ke
+    ':memory:' adalah database terpisah, jadi tidak bisa punya pembaca sendiri.
+    """
+    db_file = str(db_file)
+    return db_file == ':memory:' or db_file.startswith('file::memory:') or 'mode=memory' in db_file
+
+
+def buka_koneksi(db_file, pembaca=False, ukuran_cache_kb=UKURAN_CACHE_KB, ukuran_mmap=UKURAN_MMAP,
+                 busy_timeout_ms=BUSY_TIMEOUT_MS, instrumentasi=None, check_same_thread=True):
+    """
+    Membuka satu koneksi dengan pragma standar aplikasi:
+    WAL (untuk penulis), synchronous=NORMAL, cache_size, mmap_size,
+    busy_timeout, dan foreign_keys. Koneksi pembaca diberi query_only=ON.
+    Hasil SELECT memakai sqlite3.Row.
+    """
+    argumen = {
+        'timeout': busy_timeout_ms / 1000,
+        'check_same_thread': check_same_thread,
+        'uri': str(db_file).startswith('file:'),
+    }
+    if instrumentasi:
+        conn = sqlite3.connect(db_file, factory=KoneksiTerinstrumentasi, **argumen)
+        conn.pasang(instrumentasi)
+    else:
+        conn = sqlite3.connect(db_file, **argumen)
+    conn.row_factory = sqlite3.Row
+
+    conn.execute(f"PRAGMA busy_timeout = {int(busy_timeout_ms)};")
+    if not pembaca and not adalah_memori(db_file):
+        # journal_mode tersimpan di file, cukup diset oleh penulis
+        try:
+            conn.execute("PRAGMA journal_mode = WAL;")
+        except sqlite3.OperationalError as e:
+            print(f"WARNING: Gagal mengaktifkan WAL ({e}), memakai journal default.")
+    # Aman dengan WAL: commit tidak fsync, data tetap utuh jika aplikasi crash
+    conn.execute("PRAGMA synchronous = NORMAL;")
+    conn.execute(f"PRAGMA cache_size = -{int(ukuran_cache_kb)};")
+    conn.execute(f"PRAGMA mmap_size = {int(ukuran_mmap)};")
+    conn.execute("PRAGMA foreign_keys = ON;")
+    if pembaca:
+        conn.execute("PRAGMA query_only = ON;")
+    return conn
+
+
+class _PenandaThread:
+    """
+    Objek penanda di threading.local: ikut dibuang saat thread pemiliknya
+    selesai, sehingga weakref.finalize-nya bisa menutup koneksi pembaca
+    thread tersebut (juga untuk QThread, yang bukan threading.Thread).
+    """
+    pass
+
+
+def _tutup_pembaca(semua_pembaca, kunci, conn):
+    """
+    Menutup satu koneksi pembaca dan mengeluarkannya dari pool (jika belum
+    ditutup oleh PoolKoneksi.tutup()).
+    """
+    with kunci:
+        if conn not in semua_pembaca:
+            return
+        semua_pembaca.discard(conn)
+    conn.close()
+
+
+class PoolKoneksi:
+    """
+    Pool koneksi untuk satu file database.
+
+    - penulis: satu koneksi untuk semua penulisan. Boleh dipakai dari
+      thread mana pun, tetapi penulisan harus di dalam `with kunci_penulis`.
+    - pembaca(): koneksi baca milik thread pemanggil (dibuat saat pertama
+      kali diminta, ditutup saat thread tersebut selesai). Untuk database
+      in-memory, pembaca = penulis.
+    """
+
+    def __init__(self, db_file, instrumentasi=None, **opsi):
+        self.db_file = db_file
+        self.instrumentasi = instrumentasi
+        self.opsi = opsi
+        self.kunci_penulis = threading.RLock()
+        self._lokal = threading.local()
+        self._semua_pembaca = set()
+        # RLock: finalizer pembaca bisa berjalan di thread yang sedang memegangnya
+        self._kunci_pembaca = threading.RLock()
+        self.penulis = buka_koneksi(db_file, instrumentasi=instrumentasi,
+                                    check_same_thread=False, **opsi)
+
+    def pembaca(self):
+        """
+        Mengembalikan koneksi pembaca untuk thread saat ini.
+        """
+        if adalah_memori(self.db_file):
+            return self.penulis
+        conn = getattr(self._lokal, 'conn', None)
+        if conn is None:
+            conn = buka_koneksi(self.db_file, pembaca=True, instrumentasi=self.instrumentasi,
+                                check_same_thread=False, **self.opsi)
+            self._lokal.conn = conn
+            self._lokal.penanda = _PenandaThread()
+            with self._kunci_pembaca:
+                self._semua_pembaca.add(conn)
+            # Thread selesai -> penanda dibuang -> koneksinya ditutup, agar
+            # thread berumur pendek tidak menumpuk koneksi terbuka
+            weakref.finalize(self._lokal.penanda, _tutup_pembaca,
+                             self._semua_pembaca, self._kunci_pembaca, conn)
+        return conn
+
+    def tutup(self):
+        """
+        Menutup semua koneksi pembaca lalu koneksi penulis.
+        """
+        with self._kunci_pembaca:
+            for conn in self._semua_pembaca:
+                conn.close()
+            self._semua_pembaca.clear()
+        self._lokal = threading.local()
+        self.penulis.close()
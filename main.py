@@ -0,0 +1,259 @@
+"""
+Antarmuka baris perintah (tanpa GUI) untuk aplikasi absensi, misalnya untuk
+cron job di server tanpa display. Modul ini tidak mengimpor PySide6 maupun
+library berat (dijaga oleh: python -m benchmark.cek_startup).
+
+Perintah:
+    init-db                              Membuat / meng-upgrade skema database
+    import FILE... --date YYYY-MM-DD     Impor log; semua record diberi tanggal ini
+    import FILE... --auto-date           Impor log; tanggal diambil dari isi file
+    rekap --from A --to B                Rekap absensi per karyawan
+    pelanggaran --from A --to B          Laporan pelanggaran
+    serve [--host H] [--port P]          HTTP API lokal (lihat server_api.py)
+    bench [argumen bench_suite]          Benchmark (lihat benchmark/bench_suite.py)
+
+Laporan (--format csv|json) ditulis ke stdout, atau ke --output FILE.
+Pesan proses ditulis ke stderr dan diakhiri satu baris JSON statistik:
+    {"perintah": "import", "status": "sukses", "detik": 1.234, ...}
+Dengan --stats FILE, baris JSON tersebut juga ditambahkan ke file. Dengan
+--profil, statistik berisi waktu per tahap dan per method (Instrumentasi).
+Exit code 0 jika sukses, 1 jika gagal/dibatalkan.
+
+Contoh (cron malam):
+    python main.py import log/*.xls --auto-date --deteksi-pelanggaran --stats impor.jsonl
+    python main.py rekap --from 2025-10-01 --to 2025-10-31 --output rekap.csv
+"""
+import argparse
+import contextlib
+import datetime
+import json
+import signal
+import sys
+import time
+
+from data_manager import DataManager
+from database_setup import NAMA_DATABASE, inisialisasi_database
+from ekspor import ekspor_laporan, tulis_laporan
+from instrumentasi import Instrumentasi
+
+
+def _tanggal(teks):
+    """
+    Tipe argparse untuk tanggal berformat YYYY-MM-DD.
+    """
+    try:
+        datetime.date.fromisoformat(teks)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"tanggal harus berformat YYYY-MM-DD, bukan {teks!r}")
+    return teks
+
+
+def _buka_manager(args):
+    """
+    DataManager untuk satu perintah CLI (tanpa cache query: satu proses
+    hanya menjalankan satu perintah), atau None jika koneksi gagal.
+    """
+    manager = DataManager(args.db, ukuran_cache=0, instrumentasi=args.instrumentasi)
+    if not manager.conn:
+        return None
+    return manager
+
+
+# --- Perintah ---
+
+def perintah_init_db(args, keluaran):
+    berhasil = inisialisasi_database(args.db)
+    return {'status': 'sukses' if berhasil else 'gagal'}
+
+
+def perintah_import(args, keluaran):
+    manager = _buka_manager(args)
+    if manager is None:
+        return {'status': 'gagal'}
+
+    # SIGTERM (kill/cron timeout) dan Ctrl+C: file yang sedang ditulis
+    # di-rollback, file yang sudah selesai tetap tersimpan
+    batal = []
+
+    def minta_batal(signum, frame):
+        print(f"🟡 Sinyal {signal.Signals(signum).name} diterima, impor dihentikan...")
+        batal.append(signum)
+
+    for sinyal in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sinyal, minta_batal)
+
+    try:
+        hasil = manager.import_batch(
+            args.file, args.date,
+            max_workers=args.workers,
+            cek_batal=lambda: bool(batal),
+            paksa=args.paksa,
+            tanggal_dari_file=args.date is None,
+            deteksi_pelanggaran=args.deteksi_pelanggaran
+        )
+    finally:
+        manager.close()
+
+    daftar_file = [{'file': h['file'], 'status': h['status'], **(h['ringkasan'] or {})} for h in hasil]
+    if batal:
+        status = 'dibatalkan'
+    elif all(h['status'] in ('sukses', 'dilewati') for h in hasil):
+        status = 'sukses'
+    else:
+        status = 'gagal'
+    return {
+        'status': status,
+        'baris': sum(f.get('diproses', 0) for f in daftar_file),
+        'file': daftar_file,
+    }
+
+
+def perintah_laporan(args, keluaran):
+    manager = _buka_manager(args)
+    if manager is None:
+        return {'status': 'gagal'}
+
+    try:
+        if args.deteksi and not manager.deteksi_pelanggaran(args.dari, args.sampai):
+            return {'status': 'gagal'}
+        format_file = '.' + args.format
+        if args.output:
+            hasil = ekspor_laporan(manager, args.perintah, args.dari, args.sampai, args.output,
+                                   format_file=format_file)
+        else:
+            hasil = tulis_laporan(manager, args.perintah, args.dari, args.sampai, keluaran, format_file)
+    finally:
+        manager.close()
+
+    if not hasil:
+        return {'status': 'gagal'}
+    return {'status': 'sukses', 'baris': hasil['baris']}
+
+
+def perintah_serve(args, keluaran):
+    import asyncio
+    from server_api import jalankan_server
+
+    opsi = {nama: nilai for nama, nilai in [('host', args.host), ('port', args.port),
+                                           ('jumlah_worker', args.workers)] if nilai is not None}
+
+    async def jalankan():
+        # SIGTERM / Ctrl+C menghentikan server dengan rapi (koneksi DB ditutup)
+        berhenti = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sinyal in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sinyal, berhenti.set)
+        return await jalankan_server(args.db, berhenti=berhenti, instrumentasi=args.instrumentasi, **opsi)
+
+    metrik = asyncio.run(jalankan())
+    if metrik is False:
+        return {'status': 'gagal'}
+    return {'status': 'sukses', 'endpoint': metrik}
+
+
+def perintah_bench(args, keluaran):
+    from benchmark import bench_suite
+
+    # bench_suite mencetak hasil JSON-nya sendiri ke stdout
+    try:
+        with contextlib.redirect_stdout(keluaran):
+            bench_suite.main(args.argumen)
+    except SystemExit as e:
+        if e.code:
+            return {'status': 'gagal'}
+    return {'status': 'sukses'}
+
+
+# --- Argumen ---
+
+def buat_parser():
+    # Opsi yang berlaku untuk semua perintah (boleh ditulis setelah nama perintah)
+    opsi_stats = argparse.ArgumentParser(add_help=False)
+    opsi_stats.add_argument('--stats', metavar='FILE',
+                            help="Tambahkan baris JSON statistik ke file ini (JSON Lines).")
+    opsi_db = argparse.ArgumentParser(add_help=False)
+    opsi_db.add_argument('--db', default=NAMA_DATABASE, help=f"File database (default: {NAMA_DATABASE}).")
+    opsi_db.add_argument('--profil', action='store_true',
+                         help="Sertakan waktu per tahap dan per method di statistik.")
+
+    parser = argparse.ArgumentParser(description="Aplikasi absensi tanpa GUI (impor & laporan).")
+    sub = parser.add_subparsers(dest='perintah', required=True, metavar='PERINTAH')
+
+    p = sub.add_parser('init-db', parents=[opsi_db, opsi_stats],
+                       help="Membuat / meng-upgrade skema database.")
+    p.set_defaults(fungsi=perintah_init_db)
+
+    p = sub.add_parser('import', parents=[opsi_db, opsi_stats], help="Impor file log absensi.")
+    p.add_argument('file', nargs='+', help="File log (.xls/.xlsx/.csv).")
+    tanggal = p.add_mutually_exclusive_group(required=True)
+    tanggal.add_argument('--date', type=_tanggal, help="Tanggal absensi untuk semua record (YYYY-MM-DD).")
+    tanggal.add_argument('--auto-date', action='store_true', help="Ambil tanggal dari isi file log.")
+    p.add_argument('--paksa', action='store_true', help="Impor ulang file yang sudah pernah diimpor.")
+    p.add_argument('--deteksi-pelanggaran', action='store_true',
+                   help="Deteksi pelanggaran di tanggal yang diimpor.")
+    p.add_argument('--workers', type=int, help="Jumlah proses parsing paralel (default: jumlah CPU).")
+    p.set_defaults(fungsi=perintah_import)
+
+    for jenis, keterangan in [('rekap', "Rekap absensi per karyawan."),
+                              ('pelanggaran', "Laporan pelanggaran.")]:
+        p = sub.add_parser(jenis, parents=[opsi_db, opsi_stats], help=keterangan)
+        p.add_argument('--from', dest='dari', type=_tanggal, required=True, help="Tanggal awal (YYYY-MM-DD).")
+        p.add_argument('--to', dest='sampai', type=_tanggal, required=True, help="Tanggal akhir (YYYY-MM-DD).")
+        p.add_argument('--format', choices=('csv', 'json'), default='csv', help="Format laporan (default: csv).")
+        p.add_argument('--output', metavar='FILE', help="Tulis ke file ini (default: stdout).")
+        p.set_defaults(fungsi=perintah_laporan, deteksi=False)
+        if jenis == 'pelanggaran':
+            p.add_argument('--deteksi', action='store_true',
+                           help="Deteksi ulang pelanggaran di rentang tanggal sebelum laporan dibuat.")
+
+    p = sub.add_parser('serve', parents=[opsi_db, opsi_stats], help="Menjalankan HTTP API lokal (asyncio).")
+    p.add_argument('--host', help="Alamat yang didengarkan (default: 127.0.0.1).")
+    p.add_argument('--port', type=int, help="Port (default: 8765, 0 = port bebas).")
+    p.add_argument('--workers', type=int, help="Jumlah thread baca SQLite (default: 4).")
+    p.set_defaults(fungsi=perintah_serve)
+
+    p = sub.add_parser('bench', parents=[opsi_stats],
+                       help="Benchmark; argumen lain diteruskan ke benchmark.bench_suite.")
+    p.set_defaults(fungsi=perintah_bench)
+    return parser
+
+
+def main(argv=None):
+    parser = buat_parser()
+    # Argumen yang tidak dikenal hanya boleh untuk 'bench' (diteruskan ke bench_suite)
+    args, sisa = parser.parse_known_args(argv)
+    if args.perintah == 'bench':
+        args.argumen = sisa
+    elif sisa:
+        parser.error(f"argumen tidak dikenal: {' '.join(sisa)}")
+    args.instrumentasi = Instrumentasi() if getattr(args, 'profil', False) else None
+
+    mulai = time.perf_counter()
+    statistik = {
+        'perintah': args.perintah,
+        'mulai': datetime.datetime.now().isoformat(timespec='seconds'),
+    }
+    # Pesan print dari DataManager dialihkan ke stderr agar stdout berisi laporan saja
+    keluaran = sys.stdout
+    with contextlib.redirect_stdout(sys.stderr):
+        statistik.update(args.fungsi(args, keluaran))
+    statistik['detik'] = round(time.perf_counter() - mulai, 3)
+
+    if args.instrumentasi:
+        data = args.instrumentasi.statistik()
+        statistik['tahap'] = {nama: round(e['total_detik'], 3) for nama, e in data['tahap'].items()}
+        statistik['method'] = {
+            nama: {'jumlah': e['jumlah'], 'detik': round(e['total_detik'], 3)}
+            for nama, e in data['method'].items()
+        }
+
+    teks = json.dumps(statistik, ensure_ascii=False)
+    print(teks, file=sys.stderr)
+    if args.stats:
+        with open(args.stats, 'a', encoding='utf-8') as f:
+            f.write(teks + '\n')
+    return 0 if statistik['status'] == 'sukses' else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
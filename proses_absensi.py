@@ -1,42 +1,81 @@
+import datetime
+import importlib.util
+import numpy as np
 import pandas as pd
 import re
 import os # Digunakan untuk memeriksa ekstensi file
 import sys
 
 # --- Pemeriksaan Library Penting ---
-# Cek apakah library untuk membaca file Excel sudah terinstal
-try:
-    import openpyxl
-except ImportError:
-    print("WARNING: Library 'openpyxl' tidak ditemukan. Diperlukan untuk membaca file .xlsx.")
-    print("Silakan install dengan: pip install openpyxl")
+# Library pembaca Excel per ekstensi. Diperiksa saat file Excel pertama kali
+# dibaca (bukan saat modul diimpor), supaya UI bisa tampil tanpa menunggu
+# openpyxl/xlrd dimuat.
+ENGINE_EXCEL = {
+    '.xlsx': 'openpyxl',
+    '.xls': 'xlrd',
+}
+_engine_sudah_dicek = set()
 
-try:
-    import xlrd
-except ImportError:
-    print("WARNING: Library 'xlrd' tidak ditemukan. Diperlukan untuk membaca file .xls.")
-    print("Silakan install dengan: pip install xlrd")
+def cek_engine_excel(ekstensi):
+    """
+    Cek apakah library untuk membaca file Excel dengan ekstensi ini sudah
+    terinstal (sekali per ekstensi). Mencetak WARNING jika belum.
+    """
+    engine = ENGINE_EXCEL.get(ekstensi)
+    if engine is None or ekstensi in _engine_sudah_dicek:
+        return
+    _engine_sudah_dicek.add(ekstensi)
+    if importlib.util.find_spec(engine) is None:
+        print(f"WARNING: Library '{engine}' tidak ditemukan. Diperlukan untuk membaca file {ekstensi}.")
+        print(f"Silakan install dengan: pip install {engine}")
 
 # -----------------------------------
 
-def proses_absensi_dari_file(file_path):
+# Menentukan kolom-kolom yang akan digunakan
+# 'Tanggal' berisi tanggal blok (YYYY-MM-DD) yang terdeteksi dari baris
+# periode/tanggal di atas record tersebut, atau None jika tidak ada.
+KOLOM_OUTPUT = [
+    'No', 'Nama', 'Departemen', 'Jam Masuk', 'Jam Pulang', 
+    'Masuk Lembur', 'Pulang Lembur', 'Waktu Anomali', 'Tanggal'
+]
+
+# Versi logika parsing; naikkan jika hasil parse berubah
+# (dipakai sebagai bagian kunci cache parse di DataManager)
+VERSI_PARSER = 2
+
+# Mencari semua format jam (HH:MM atau HH.MM)
+# Regex '[:.]' berarti 'cocokkan dengan : ATAU .'
+POLA_JAM = r'\d{2}[:.]\d{2}'
+
+# Tanggal di baris periode: YYYY-MM-DD atau DD-MM-YYYY (pemisah - / atau .)
+POLA_TANGGAL = re.compile(
+    r'(?<!\d)(?:(\d{4})[-/.](\d{1,2})[-/.](\d{1,2})|(\d{1,2})[-/.](\d{1,2})[-/.](\d{4}))(?!\d)'
+)
+
+# Teks yang boleh ada di antara dua tanggal sebuah periode ('A ~ B', 'A s/d B')
+POLA_PEMISAH_PERIODE = re.compile(r'^(\s|nan)*(~|-|s/d|to|sampai)(\s|nan)*$', re.IGNORECASE)
+
+# Backend pembaca file yang didukung proses_absensi_dari_file()
+BACKEND_PARSER = ('pandas', 'native')
+
+def proses_absensi_dari_file(file_path, metode='vektor', backend='pandas'):
     """
     Membaca file absensi (bisa .xls, .xlsx, atau .csv) dan mengekstrak data
     nama, departemen, jam masuk/pulang, jam lembur, dan waktu anomali.
 
     Args:
         file_path (str): Path lengkap menuju file absensi Anda.
+        metode (str): 'vektor' (default, cepat untuk file besar) atau
+                      'loop' (parser lama baris per baris).
+        backend (str): 'pandas' (default, lewat pd.read_excel/pd.read_csv)
+                       atau 'native' (untuk .xls/.xlsx: sel dibaca langsung
+                       dari openpyxl/xlrd tanpa DataFrame perantara; hasilnya
+                       sama dengan 'pandas'). File .csv selalu memakai pandas.
 
     Returns:
         pandas.DataFrame: Sebuah DataFrame berisi data yang sudah bersih 
                           jika sukses, atau DataFrame kosong jika gagal.
     """
-    
-    # Menentukan kolom-kolom yang akan digunakan
-    KOLOM_OUTPUT = [
-        'No', 'Nama', 'Departemen', 'Jam Masuk', 'Jam Pulang', 
-        'Masuk Lembur', 'Pulang Lembur', 'Waktu Anomali'
-    ]
 
     # Memeriksa apakah file ada
     if not os.path.exists(file_path):
@@ -44,6 +83,10 @@ def proses_absensi_dari_file(file_path):
         # Mengembalikan DataFrame kosong dengan struktur yang diharapkan
         return pd.DataFrame(columns=KOLOM_OUTPUT)
 
+    if backend not in BACKEND_PARSER:
+        print(f"❌ ERROR: Backend parser '{backend}' tidak dikenal. Pilih salah satu dari {BACKEND_PARSER}.")
+        return pd.DataFrame(columns=KOLOM_OUTPUT)
+
     df = None
     try:
         # Memisahkan nama file dan ekstensinya
@@ -51,9 +94,14 @@ def proses_absensi_dari_file(file_path):
         ekstensi = ekstensi.lower()
 
         # --- Logika Cerdas untuk Membaca Berbagai Format ---
+        if backend == 'native' and ekstensi in ['.xls', '.xlsx']:
+            cek_engine_excel(ekstensi)
+            return _parse_excel_native(file_path, ekstensi)
+
         if ekstensi in ['.xls', '.xlsx']:
             # Menggunakan pd.read_excel() yang otomatis memilih engine
             # (xlrd untuk .xls, openpyxl untuk .xlsx)
+            cek_engine_excel(ekstensi)
             df = pd.read_excel(file_path, header=None)
         
         elif ekstensi == '.csv':
@@ -73,16 +121,35 @@ def proses_absensi_dari_file(file_path):
         print(f"❌ ERROR saat membaca file: {e}")
         return pd.DataFrame(columns=KOLOM_OUTPUT)
 
-    # --- Logika Parsing Data (Sama seperti sebelumnya) ---
+    # --- Logika Parsing Data ---
+    if metode == 'loop':
+        return _parse_dataframe_loop(df)
+    return _parse_dataframe_vektor(df)
+
+
+def _parse_dataframe_loop(df):
+    """
+    Parser asli: memeriksa sheet baris per baris dengan df.iloc[i].
+    Dipertahankan sebagai acuan (referensi paritas) untuk parser vektor.
+    """
     records = []
+    tanggal_blok = None # Tanggal dari baris periode terakhir di atas baris ini
+    baris_jam = -1      # Indeks baris jam milik header terakhir
     if df is not None:
         for i in range(len(df)):
             # Ubah seluruh baris menjadi sebuah string tunggal untuk pencarian
             # str(cell or '') menangani jika ada sel kosong (None)
             row_str = ' '.join(str(cell or '') for cell in df.iloc[i].values)
 
+            # Baris periode/tanggal (bukan baris jam) mengganti tanggal blok
+            if i != baris_jam and not _adalah_baris_header(row_str):
+                adalah_baris_tanggal, tanggal = _tanggal_dari_baris(row_str)
+                if adalah_baris_tanggal:
+                    tanggal_blok = tanggal
+
             # Kondisi untuk menemukan baris data utama karyawan
-            if 'Work No' in row_str and 'Name' in row_str and 'Dept.' in row_str:
+            if _adalah_baris_header(row_str):
+                baris_jam = i + 1
                 # Pastikan ada baris berikutnya untuk data waktu
                 if i + 1 < len(df):
                     try:
@@ -95,9 +162,7 @@ def proses_absensi_dari_file(file_path):
                         time_cell = str(df.iloc[i+1, 1])
                         
                         # --- PERUBAHAN LOGIKA WAKTU ---
-                        # Mencari semua format jam (HH:MM atau HH.MM)
-                        # Regex '[:.]' berarti 'cocokkan dengan : ATAU .'
-                        times = re.findall(r'\d{2}[:.]\d{2}', time_cell)
+                        times = re.findall(POLA_JAM, time_cell)
                         
                         # Alokasikan jam kerja dan jam lembur (4 waktu pertama)
                         clock_in = times[0] if len(times) > 0 else 'N/A'
@@ -112,7 +177,8 @@ def proses_absensi_dari_file(file_path):
                         records.append([
                             work_no, name, department, clock_in, 
                             clock_out, overtime_in, overtime_out,
-                            anomaly_times # Menambahkan data anomali
+                            anomaly_times, # Menambahkan data anomali
+                            tanggal_blok
                         ])
                     
                     except (ValueError, IndexError, TypeError):
@@ -124,6 +190,520 @@ def proses_absensi_dari_file(file_path):
     
     return clean_df
 
+
+def _parse_dataframe_vektor(df):
+    """
+    Parser vektor: hasilnya identik dengan _parse_dataframe_loop(), tetapi
+    baris header dicari dengan mask per kolom, sel-sel data diambil dengan
+    array indexing, dan jam diekstrak dengan Series.str.findall.
+    """
+    idx_header = _indeks_baris_header(df)
+    tanggal_header, _ = _tanggal_per_header(df, idx_header)
+    # Baris header terakhir tanpa baris waktu di bawahnya dilewati
+    ada_baris_jam = idx_header + 1 < len(df)
+    return _ekstrak_records(df, idx_header[ada_baris_jam], tanggal_header[ada_baris_jam])
+
+
+def _indeks_baris_header(df):
+    """
+    Mengembalikan indeks (posisi) semua baris 'Work No'/'Name'/'Dept.' di df,
+    termasuk baris terakhir (dipakai parser streaming untuk membawa header
+    yang terpotong di batas chunk).
+    """
+    kosong = np.array([], dtype=np.intp)
+    if df is None or len(df) == 0 or df.shape[1] <= 12:
+        # Tanpa kolom Dept. (indeks 12) tidak ada record yang valid
+        return kosong
+
+    # 1. Mask kandidat: 'Work No' hanya bisa berasal dari sel teks, jadi cukup
+    #    cari huruf 'W' di kolom-kolom bertipe teks (kolom numerik dilewati)
+    kandidat = np.zeros(len(df), dtype=bool)
+    for j in range(df.shape[1]):
+        kolom = df.iloc[:, j]
+        if pd.api.types.is_numeric_dtype(kolom) or pd.api.types.is_datetime64_any_dtype(kolom):
+            continue
+        kandidat |= kolom.astype(str).str.contains('W', regex=False).to_numpy()
+
+    idx_kandidat = np.flatnonzero(kandidat)
+    if len(idx_kandidat) == 0:
+        return kosong
+
+    # 2. Verifikasi kandidat dengan aturan yang sama persis seperti parser loop
+    nilai_kandidat = df.iloc[idx_kandidat].to_numpy(dtype=object)
+    lolos = [
+        _adalah_baris_header(' '.join(str(cell or '') for cell in baris))
+        for baris in nilai_kandidat
+    ]
+    return idx_kandidat[np.array(lolos, dtype=bool)]
+
+
+def _tanggal_per_header(df, idx_header, tanggal_awal=None):
+    """
+    Mencari baris periode/tanggal di df (selain baris header dan baris jam)
+    dan mengembalikan (array tanggal untuk setiap indeks di idx_header,
+    tanggal blok yang berlaku di akhir df). tanggal_awal adalah tanggal blok
+    yang berlaku sebelum baris pertama df (dipakai parser streaming).
+    """
+    tanggal_header = np.full(len(idx_header), tanggal_awal, dtype=object)
+    if df is None or len(df) == 0:
+        return tanggal_header, tanggal_awal
+
+    # 1. Kandidat: sel teks berisi 4 digit berurutan (tahun), atau sel tanggal
+    kandidat = np.zeros(len(df), dtype=bool)
+    for j in range(df.shape[1]):
+        kolom = df.iloc[:, j]
+        if pd.api.types.is_datetime64_any_dtype(kolom):
+            kandidat |= kolom.notna().to_numpy()
+        elif not pd.api.types.is_numeric_dtype(kolom):
+            kandidat |= kolom.astype(str).str.contains(r'\d{4}', regex=True, na=False).to_numpy(dtype=bool)
+    kandidat[idx_header] = False
+    kandidat[idx_header[idx_header + 1 < len(df)] + 1] = False
+
+    # 2. Verifikasi dengan aturan yang sama seperti parser loop
+    idx_tanggal, nilai_tanggal = [], []
+    idx_kandidat = np.flatnonzero(kandidat)
+    for i, baris in zip(idx_kandidat, df.iloc[idx_kandidat].to_numpy(dtype=object)):
+        adalah_baris_tanggal, tanggal = _tanggal_dari_baris(' '.join(str(cell or '') for cell in baris))
+        if adalah_baris_tanggal:
+            idx_tanggal.append(i)
+            nilai_tanggal.append(tanggal)
+    if not idx_tanggal:
+        return tanggal_header, tanggal_awal
+
+    # 3. Setiap header memakai baris tanggal terakhir di atasnya
+    posisi = np.searchsorted(np.array(idx_tanggal), idx_header) - 1
+    nilai_tanggal = np.array(nilai_tanggal, dtype=object)
+    ada = posisi >= 0
+    tanggal_header[ada] = nilai_tanggal[posisi[ada]]
+    return tanggal_header, nilai_tanggal[-1]
+
+
+def _tanggal_dari_baris(row_str):
+    """
+    Memeriksa apakah sebuah baris (bukan header karyawan) adalah baris
+    periode/tanggal. Mengembalikan (True, 'YYYY-MM-DD') untuk satu tanggal
+    atau periode satu hari ('2025-10-10 ~ 2025-10-10'), (True, None) untuk
+    periode beberapa hari (tanggal per record tidak bisa ditentukan), dan
+    (False, None) jika baris tidak berisi tanggal.
+    """
+    ditemukan = []
+    for m in POLA_TANGGAL.finditer(row_str):
+        if m.group(1):
+            tahun, bulan, hari = m.group(1), m.group(2), m.group(3)
+        else:
+            hari, bulan, tahun = m.group(4), m.group(5), m.group(6)
+        try:
+            tanggal = datetime.date(int(tahun), int(bulan), int(hari)).isoformat()
+        except ValueError:
+            continue
+        ditemukan.append((m.start(), m.end(), tanggal))
+    if not ditemukan:
+        return False, None
+
+    # Periode 'A ~ B' diutamakan (tanggal lain di baris yang sama, misalnya
+    # 'Tabling date', diabaikan)
+    for (_, akhir_a, a), (awal_b, _, b) in zip(ditemukan, ditemukan[1:]):
+        if POLA_PEMISAH_PERIODE.match(row_str[akhir_a:awal_b]):
+            return True, a if a == b else None
+    if len({tanggal for _, _, tanggal in ditemukan}) == 1:
+        return True, ditemukan[0][2]
+    return True, None
+
+
+def _ekstrak_records(df, idx_header, tanggal_header):
+    """
+    Membangun DataFrame hasil dari baris-baris header yang sudah ditemukan.
+    Setiap indeks di idx_header wajib punya baris waktu (i+1) di df;
+    tanggal_header berisi tanggal blok untuk setiap header.
+    """
+    if len(idx_header) == 0:
+        return pd.DataFrame([], columns=KOLOM_OUTPUT)
+
+    # 3. Ambil sel (i, 2), (i, 6), (i, 12) dan (i+1, 1) dengan array indexing
+    sel_work_no = df.iloc[:, 2].to_numpy(dtype=object)[idx_header]
+    sel_nama = df.iloc[:, 6].to_numpy(dtype=object)[idx_header]
+    sel_dept = df.iloc[:, 12].to_numpy(dtype=object)[idx_header]
+    sel_waktu = df.iloc[:, 1].to_numpy(dtype=object)[idx_header + 1]
+
+    # Baris dengan 'Work No' yang rusak (bukan angka) dilewati, sama seperti loop
+    work_no, valid = [], []
+    for v in sel_work_no:
+        try:
+            work_no.append(int(v))
+            valid.append(True)
+        except (ValueError, TypeError):
+            valid.append(False)
+    valid = np.array(valid, dtype=bool)
+
+    # 4. Ekstrak semua jam sekaligus dengan Series.str.findall
+    times = pd.Series([str(v) for v in sel_waktu[valid]], dtype=object).str.findall(POLA_JAM)
+    anomali = times.str[4:].str.join(', ')
+
+    kolom_hasil = {
+        'No': work_no,
+        'Nama': [str(v) for v in sel_nama[valid]],
+        'Departemen': [str(v) for v in sel_dept[valid]],
+        'Jam Masuk': times.str.get(0).fillna('N/A').tolist(),
+        'Jam Pulang': times.str.get(1).fillna('N/A').tolist(),
+        'Masuk Lembur': times.str.get(2).fillna('N/A').tolist(),
+        'Pulang Lembur': times.str.get(3).fillna('N/A').tolist(),
+        'Waktu Anomali': anomali.where(anomali != '', 'N/A').tolist(),
+        'Tanggal': list(tanggal_header[valid]),
+    }
+    return pd.DataFrame(list(zip(*kolom_hasil.values())), columns=KOLOM_OUTPUT)
+
+
+# ---------------------------------------------------------------------------
+# --- PARSER STREAMING (MEMORI TETAP UNTUK FILE SANGAT BESAR) ---
+# ---------------------------------------------------------------------------
+
+def iter_absensi_records(file_path, chunk_rows=5000):
+    """
+    Versi generator dari proses_absensi_dari_file(): file dibaca per potongan
+    (chunk) sehingga pemakaian memori tetap datar berapa pun ukuran file.
+
+    CSV dibaca dengan pd.read_csv(chunksize=...), XLSX dibaca baris demi baris
+    dengan openpyxl mode read_only. Baris 'Work No' yang jatuh tepat di akhir
+    sebuah chunk dibawa ke chunk berikutnya agar baris waktunya tetap terbaca.
+
+    Args:
+        file_path (str): Path lengkap menuju file absensi.
+        chunk_rows (int): Jumlah baris sheet yang diproses per potongan.
+
+    Yields:
+        dict: Satu record per karyawan dengan kunci sama seperti KOLOM_OUTPUT.
+    """
+    if not os.path.exists(file_path):
+        print(f"❌ ERROR: File tidak ditemukan di path: {file_path}")
+        return
+
+    ekstensi = os.path.splitext(file_path)[1].lower()
+    if ekstensi not in ['.xls', '.xlsx', '.csv']:
+        print(f"❌ ERROR: Format file '{ekstensi}' tidak didukung. Harap gunakan .xls, .xlsx, atau .csv.")
+        return
+
+    if ekstensi == '.xls':
+        # xlrd selalu memuat seluruh workbook .xls ke memori (format BIFF tidak
+        # bisa dibaca per baris), jadi cukup pakai parser biasa lalu di-yield.
+        for record in proses_absensi_dari_file(file_path).to_dict('records'):
+            yield record
+        return
+
+    try:
+        if ekstensi == '.csv':
+            # dtype=str: tipe kolom tidak ditebak ulang per chunk, sehingga sel
+            # jam seperti '07.55' tidak berubah menjadi angka 7.55 di chunk
+            # yang kebetulan tidak berisi teks lain di kolom tersebut.
+            potongan = pd.read_csv(
+                file_path, header=None, encoding='latin1',
+                dtype=str, chunksize=chunk_rows
+            )
+        else:
+            cek_engine_excel(ekstensi)
+            potongan = _iter_chunk_xlsx(file_path, chunk_rows)
+
+        bawaan = None # Baris header dari chunk sebelumnya (jika terpotong)
+        tanggal_blok = None # Tanggal blok yang berlaku di akhir chunk sebelumnya
+        for chunk in potongan:
+            if bawaan is not None:
+                chunk = pd.concat([bawaan, chunk], ignore_index=True)
+                bawaan = None
+            else:
+                chunk = chunk.reset_index(drop=True)
+
+            idx_header = _indeks_baris_header(chunk)
+            tanggal_header, tanggal_akhir = _tanggal_per_header(chunk, idx_header, tanggal_blok)
+            if len(idx_header) and idx_header[-1] == len(chunk) - 1:
+                # Baris waktu untuk header ini ada di chunk berikutnya
+                bawaan = chunk.iloc[[-1]]
+                idx_header = idx_header[:-1]
+                tanggal_header = tanggal_header[:-1]
+            tanggal_blok = tanggal_akhir
+
+            for record in _ekstrak_records(chunk, idx_header, tanggal_header).to_dict('records'):
+                yield record
+
+    except ImportError as e:
+        print(f"❌ ERROR: Library yang dibutuhkan hilang. {e}")
+        print("Pastikan Anda sudah menginstal 'openpyxl' (untuk .xlsx) dan 'xlrd' (untuk .xls).")
+    except Exception as e:
+        print(f"❌ ERROR saat membaca file: {e}")
+
+
+def _iter_chunk_xlsx(file_path, chunk_rows):
+    """
+    Membaca sheet pertama file .xlsx dengan openpyxl read_only dan
+    menghasilkan DataFrame kecil berisi maksimal chunk_rows baris.
+    Baris kosong di akhir sheet dibuang, seperti pd.read_excel dan backend
+    native (baris kosong di tengah tetap ada).
+    """
+    import openpyxl
+    wb = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        ws = wb.worksheets[0] # Sama seperti pd.read_excel: sheet pertama
+        buffer = []
+        kosong = [] # Baris kosong yang ditahan sampai ada baris berisi
+        for baris in ws.iter_rows(values_only=True):
+            if all(v is None for v in baris):
+                kosong.append(baris)
+                continue
+            for isi in kosong + [baris]:
+                buffer.append(isi)
+                if len(buffer) >= chunk_rows:
+                    # Sel kosong (None) diseragamkan menjadi NaN seperti pd.read_excel
+                    yield pd.DataFrame(buffer).fillna(np.nan)
+                    buffer = []
+            kosong = []
+        if buffer:
+            yield pd.DataFrame(buffer).fillna(np.nan)
+    finally:
+        wb.close()
+
+
+# ---------------------------------------------------------------------------
+# --- BACKEND NATIVE: SEL EXCEL DIBACA LANGSUNG (TANPA DATAFRAME PERANTARA) ---
+# ---------------------------------------------------------------------------
+
+# Kolom yang dibutuhkan parser: jam (baris berikutnya), Work No, Nama, Dept.
+KOLOM_JAM, KOLOM_WORK_NO, KOLOM_NAMA, KOLOM_DEPT = 1, 2, 6, 12
+
+# Teks sel yang dianggap kosong (NaN) oleh pd.read_excel (na_values default)
+TEKS_NA_PANDAS = {
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan',
+    '1.#IND', '1.#QNAN', '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a',
+    'nan', 'null',
+}
+
+# Nilai sel error Excel (openpyxl values_only mengembalikannya sebagai teks)
+TEKS_ERROR_EXCEL = {'#NULL!', '#DIV/0!', '#VALUE!', '#REF!', '#NAME?', '#NUM!', '#N/A'}
+
+# Penyaring cepat kandidat baris tanggal (tahun 4 digit)
+POLA_4_DIGIT = re.compile(r'\d{4}')
+
+# Teks yang akan dikonversi pandas menjadi angka jika satu kolom berisi angka semua
+POLA_ANGKA = re.compile(r'[+-]?(\d+(\.\d*)?|\.\d+)([eE][+-]?\d+)?')
+
+
+def _parse_excel_native(file_path, ekstensi):
+    """
+    Backend 'native': membaca sheet pertama baris demi baris (openpyxl
+    read_only/values_only untuk .xlsx, xlrd on_demand untuk .xls) dan
+    menjalankan mesin status (baris header -> baris jam) tanpa membangun
+    DataFrame dari seluruh sheet. Hanya kolom 1, 2, 6 dan 12 yang disimpan.
+    """
+    if ekstensi == '.xlsx':
+        baris_baris, lebar_dari_sel_kosong = _iter_baris_xlsx(file_path), False
+    else:
+        baris_baris, lebar_dari_sel_kosong = _iter_baris_xls(file_path), True
+    return _ekstrak_records_native(baris_baris, lebar_dari_sel_kosong)
+
+
+def _iter_baris_xlsx(file_path):
+    """
+    Menghasilkan setiap baris sheet pertama .xlsx sebagai list nilai yang
+    sudah diseragamkan seperti pd.read_excel (kosong/NA/error -> None,
+    float bulat -> int).
+    """
+    import openpyxl
+    wb = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        ws = wb.worksheets[0] # Sama seperti pd.read_excel: sheet pertama
+        # Dimensi sheet dari file export sering salah; hitung dari isi sel
+        ws.reset_dimensions()
+        for baris in ws.iter_rows(values_only=True):
+            yield [_seragamkan_nilai(v) for v in baris]
+    finally:
+        wb.close()
+
+
+def _iter_baris_xls(file_path):
+    """
+    Sama seperti _iter_baris_xlsx() untuk file .xls (xlrd, on_demand=True
+    sehingga hanya sheet pertama yang dimuat).
+    """
+    import xlrd
+    book = xlrd.open_workbook(file_path, on_demand=True)
+    try:
+        sheet = book.sheet_by_index(0)
+        for r in range(sheet.nrows):
+            baris = []
+            for tipe, v in zip(sheet.row_types(r), sheet.row_values(r)):
+                if tipe in (xlrd.XL_CELL_EMPTY, xlrd.XL_CELL_BLANK, xlrd.XL_CELL_ERROR):
+                    v = None
+                elif tipe == xlrd.XL_CELL_DATE:
+                    # Konversi tanggal/jam sama seperti pembaca xlrd milik pandas
+                    try:
+                        v = xlrd.xldate.xldate_as_datetime(v, book.datemode)
+                        if v.timetuple()[0:3] in [(1899, 12, 31), (1904, 1, 1)]:
+                            v = datetime.time(v.hour, v.minute, v.second, v.microsecond)
+                    except OverflowError:
+                        pass
+                elif tipe == xlrd.XL_CELL_BOOLEAN:
+                    v = bool(v)
+                else:
+                    v = _seragamkan_nilai(v)
+                baris.append(v)
+            yield baris
+    finally:
+        book.release_resources()
+
+
+def _seragamkan_nilai(v):
+    """
+    Menyeragamkan satu nilai sel seperti yang dilakukan pd.read_excel.
+    """
+    if v is None:
+        return None
+    if isinstance(v, str):
+        if v in TEKS_NA_PANDAS or v in TEKS_ERROR_EXCEL:
+            return None
+        return v
+    if isinstance(v, float) and v.is_integer():
+        return int(v)
+    return v
+
+
+class _InfoKolom:
+    """
+    Ringkasan isi satu kolom sheet, untuk meniru tipe kolom (dtype) yang
+    akan dipilih pandas: kolom yang isinya angka semua menjadi int64/float64.
+    """
+    __slots__ = ('angka_semua', 'ada_na', 'ada_pecahan')
+
+    def __init__(self):
+        self.angka_semua = True
+        self.ada_na = False
+        self.ada_pecahan = False
+
+    def catat(self, v):
+        if v is None:
+            self.ada_na = True
+        elif isinstance(v, bool) or not isinstance(v, (int, float, str)):
+            self.angka_semua = False
+        elif isinstance(v, str):
+            if not POLA_ANGKA.fullmatch(v):
+                self.angka_semua = False
+            elif not float(v).is_integer():
+                self.ada_pecahan = True
+        elif isinstance(v, float):
+            self.ada_pecahan = True
+
+    def nilai_pandas(self, v):
+        """
+        Nilai sel seperti yang akan terlihat di DataFrame pandas.
+        """
+        if v is None:
+            return np.nan
+        if self.angka_semua:
+            angka = float(v)
+            return angka if (self.ada_na or self.ada_pecahan) else int(angka)
+        return v
+
+
+def _ekstrak_records_native(baris_baris, lebar_dari_sel_kosong):
+    """
+    Mesin status untuk backend native. Aturan sama dengan parser loop:
+    baris i yang berisi 'Work No'/'Name'/'Dept.' mengambil Work No, Nama,
+    Dept. dari kolom 2/6/12 dan jam dari kolom 1 baris i+1.
+
+    Supaya hasilnya identik dengan backend pandas, fungsi ini juga meniru:
+    - baris kosong di akhir sheet dibuang pandas (header yang hanya diikuti
+      baris kosong sampai akhir sheet tidak menghasilkan record),
+    - sheet dengan lebar <= 12 kolom tidak menghasilkan record,
+    - kolom yang isinya angka semua menjadi angka (float jika ada sel kosong).
+    """
+    kolom_dipakai = (KOLOM_JAM, KOLOM_WORK_NO, KOLOM_NAMA, KOLOM_DEPT)
+    info = {j: _InfoKolom() for j in kolom_dipakai}
+
+    records = []       # [work_no, nama, dept, tanggal, jam] mentah, sudah pasti ada di DataFrame pandas
+    menunggu = []      # Record yang baris jamnya kosong: sah jika masih ada baris berisi sesudahnya
+    header = None      # Sel header dari baris sebelumnya (menunggu baris jam)
+    tanggal_blok = None
+    lebar = 0
+    baris_kosong_tertunda = 0
+
+    for baris in baris_baris:
+        kosong = all(v is None for v in baris)
+
+        # Lebar sheet: pembaca openpyxl pandas memangkas sel kosong di ujung baris
+        if lebar_dari_sel_kosong:
+            lebar = max(lebar, len(baris))
+        elif not kosong:
+            lebar = max(lebar, max(j for j, v in enumerate(baris) if v is not None) + 1)
+
+        if kosong:
+            baris_kosong_tertunda += 1
+        else:
+            if baris_kosong_tertunda:
+                # Baris kosong di tengah sheet = NaN di semua kolom
+                for j in kolom_dipakai:
+                    info[j].ada_na = True
+                baris_kosong_tertunda = 0
+            records.extend(menunggu)
+            menunggu = []
+            for j in kolom_dipakai:
+                info[j].catat(baris[j] if j < len(baris) else None)
+
+        # Baris ini adalah baris jam untuk header di baris sebelumnya
+        baris_jam = header is not None
+        if baris_jam:
+            record = header + [baris[KOLOM_JAM] if KOLOM_JAM < len(baris) else None]
+            (menunggu if kosong else records).append(record)
+            header = None
+        if kosong:
+            continue
+
+        row_str = None
+        # Kandidat header: 'Work No' hanya bisa ada di sel teks yang memuat 'W'
+        if any(isinstance(v, str) and 'W' in v for v in baris):
+            row_str = ' '.join('nan' if v is None else str(v or '') for v in baris)
+            if _adalah_baris_header(row_str):
+                header = [baris[j] if j < len(baris) else None
+                          for j in (KOLOM_WORK_NO, KOLOM_NAMA, KOLOM_DEPT)] + [tanggal_blok]
+                continue
+
+        # Kandidat baris periode/tanggal: ada 4 digit (tahun) atau sel tanggal
+        if not baris_jam and any(
+                isinstance(v, datetime.datetime) or (isinstance(v, str) and POLA_4_DIGIT.search(v))
+                for v in baris):
+            if row_str is None:
+                row_str = ' '.join('nan' if v is None else str(v or '') for v in baris)
+            adalah_baris_tanggal, tanggal = _tanggal_dari_baris(row_str)
+            if adalah_baris_tanggal:
+                tanggal_blok = tanggal
+
+    # Baris kosong di akhir sheet tidak ada di DataFrame pandas
+    if lebar <= KOLOM_DEPT or not records:
+        return pd.DataFrame([], columns=KOLOM_OUTPUT)
+
+    hasil = []
+    for work_no, nama, dept, tanggal, jam in records:
+        try:
+            work_no = int(info[KOLOM_WORK_NO].nilai_pandas(work_no))
+        except (ValueError, TypeError, OverflowError):
+            # Baris dengan 'Work No' yang rusak (bukan angka) dilewati, sama seperti loop
+            continue
+        times = re.findall(POLA_JAM, str(info[KOLOM_JAM].nilai_pandas(jam)))
+        hasil.append([
+            work_no,
+            str(info[KOLOM_NAMA].nilai_pandas(nama)),
+            str(info[KOLOM_DEPT].nilai_pandas(dept)),
+            times[0] if len(times) > 0 else 'N/A',
+            times[1] if len(times) > 1 else 'N/A',
+            times[2] if len(times) > 2 else 'N/A',
+            times[3] if len(times) > 3 else 'N/A',
+            ", ".join(times[4:]) if len(times) > 4 else 'N/A',
+            tanggal,
+        ])
+    return pd.DataFrame(hasil, columns=KOLOM_OUTPUT)
+
+
+def _adalah_baris_header(row_str):
+    """
+    Kondisi untuk menemukan baris data utama karyawan.
+    """
+    return 'Work No' in row_str and 'Name' in row_str and 'Dept.' in row_str
+
 # ---------------------------------------------------------------------------
 # --- CONTOH CARA MENGGUNAKAN FUNGSI INI ---
 # ---------------------------------------------------------------------------
@@ -160,6 +740,12 @@ if __name__ == "__main__":
         print("\n--- Tampilan Data (Array) ---")
         print(data_absensi_array)
 
+        # 5. Uji paritas: parser vektor harus identik dengan parser loop lama
+        #    (uji lengkap di log sintetis: python -m benchmark.cek_parser)
+        data_loop_df = proses_absensi_dari_file(file_saya, metode='loop')
+        pd.testing.assert_frame_equal(data_absensi_df, data_loop_df)
+        print("\n✅ Paritas OK: parser vektor == parser loop.")
+
     # --- Contoh cara menggunakan di file lain ---
     # Di file Python Anda yang lain (misal app.py), Anda bisa lakukan:
     #
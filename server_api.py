@@ -0,0 +1,441 @@
+"""
+HTTP API lokal (asyncio) di atas DataManager, agar beberapa supervisor bisa
+melihat data absensi bersamaan tanpa membuka aplikasi desktop.
+
+Endpoint (semua respons JSON; Connection: close):
+    GET  /absensi?from=YYYY-MM-DD&to=YYYY-MM-DD[&cari=teks]   JSON Lines
+    GET  /rekap?from=...&to=...                               JSON Lines
+    GET  /pelanggaran?from=...&to=...                         JSON Lines
+    POST /import   body: {"file": [path, ...], "tanggal": null,
+                          "paksa": false, "deteksi_pelanggaran": false}
+    GET  /metrics  latensi per endpoint (p50/p95/maks) + statistik cache
+
+Event loop hanya mengurus socket. Semua kerja SQLite dijalankan di thread
+pool baca yang terbatas (JUMLAH_WORKER_BACA); setiap thread memakai koneksi
+pembaca miliknya sendiri (PRAGMA query_only=ON, lihat PoolKoneksi), jadi
+dengan WAL laporan tetap bisa dibaca selama impor berjalan. Impor berjalan
+di satu thread penulis sehingga penulisan tetap berurutan.
+
+Laporan dikirim sebagai JSON Lines (satu object per baris, application/x-ndjson)
+per batch UKURAN_BATCH_API baris dari cursor. Satu laporan dibaca utuh oleh
+satu tugas di pool baca (koneksi pembaca tidak berpindah thread) dan
+diserahkan ke event loop lewat antrean terbatas, dengan backpressure socket
+(drain), sehingga memori server tetap datar walaupun hasilnya besar.
+
+Server tidak memiliki autentikasi dan path file impor adalah path di mesin
+server: secara default hanya mendengarkan 127.0.0.1.
+
+Jalankan dengan: python main.py serve [--port 8765] [--workers 4]
+"""
+import asyncio
+import datetime
+import json
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from urllib.parse import parse_qs, urlsplit
+
+from data_manager import DataManager
+from database_setup import NAMA_DATABASE
+
+HOST_DEFAULT = '127.0.0.1'
+PORT_DEFAULT = 8765
+
+# Jumlah thread (dan koneksi pembaca) untuk query laporan
+JUMLAH_WORKER_BACA = 4
+
+# Jumlah baris per batch yang diambil dari cursor dan ditulis ke socket
+UKURAN_BATCH_API = 2000
+
+# Jumlah batch yang boleh menunggu di antrean antara thread baca dan socket
+ANTREAN_POTONGAN = 4
+
+# Batas ukuran request dan waktu tunggu membaca request (detik)
+MAKS_HEADER = 64 * 1024
+MAKS_BODY = 1024 * 1024
+BATAS_WAKTU_REQUEST = 30
+
+# Jumlah durasi terakhir per endpoint yang disimpan untuk menghitung persentil
+JUMLAH_SAMPEL_METRIK = 1000
+
+TIPE_JSON = 'application/json; charset=utf-8'
+TIPE_NDJSON = 'application/x-ndjson; charset=utf-8'
+
+STATUS_HTTP = {
+    200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+    408: 'Request Timeout', 413: 'Payload Too Large', 422: 'Unprocessable Entity',
+    500: 'Internal Server Error',
+}
+
+
+class PermintaanSalah(Exception):
+    """
+    Request tidak valid; dikirim ke klien sebagai error JSON dengan status
+    HTTP yang diberikan (default 400).
+    """
+    def __init__(self, pesan, status=400):
+        super().__init__(pesan)
+        self.status = status
+
+
+class MetrikEndpoint:
+    """
+    Latensi per endpoint ('GET /absensi', dst.): jumlah request, jumlah
+    error (status >= 400 atau koneksi terputus), baris yang dikirim, dan
+    persentil dari JUMLAH_SAMPEL_METRIK durasi terakhir. Hanya dipakai
+    dari thread event loop, jadi tanpa lock.
+    """
+    def __init__(self):
+        self._data = {}
+
+    def catat(self, endpoint, detik, status, baris=0):
+        entri = self._data.setdefault(endpoint, {
+            'jumlah': 0, 'error': 0, 'baris': 0, 'total_detik': 0.0, 'maks_detik': 0.0,
+            'sampel': deque(maxlen=JUMLAH_SAMPEL_METRIK),
+        })
+        entri['jumlah'] += 1
+        entri['error'] += status >= 400
+        entri['baris'] += baris
+        entri['total_detik'] += detik
+        entri['maks_detik'] = max(entri['maks_detik'], detik)
+        entri['sampel'].append(detik)
+
+    def statistik(self):
+        """
+        dict endpoint -> {'jumlah', 'error', 'baris', 'rata_ms', 'p50_ms',
+        'p95_ms', 'maks_ms'}.
+        """
+        hasil = {}
+        for endpoint, entri in self._data.items():
+            sampel = sorted(entri['sampel'])
+            hasil[endpoint] = {
+                'jumlah': entri['jumlah'],
+                'error': entri['error'],
+                'baris': entri['baris'],
+                'rata_ms': round(entri['total_detik'] / entri['jumlah'] * 1000, 2),
+                'p50_ms': round(sampel[len(sampel) // 2] * 1000, 2),
+                'p95_ms': round(sampel[min(len(sampel) - 1, int(len(sampel) * 0.95))] * 1000, 2),
+                'maks_ms': round(entri['maks_detik'] * 1000, 2),
+            }
+        return hasil
+
+
+def _tanggal_query(query, nama):
+    """
+    Mengambil parameter tanggal YYYY-MM-DD dari query string.
+    """
+    nilai = query.get(nama, [None])[0]
+    if not nilai:
+        raise PermintaanSalah(f"parameter '{nama}' (YYYY-MM-DD) wajib diisi")
+    try:
+        datetime.date.fromisoformat(nilai)
+    except ValueError:
+        raise PermintaanSalah(f"parameter '{nama}' harus berformat YYYY-MM-DD, bukan {nilai!r}")
+    return nilai
+
+
+def _kodekan_baris(daftar_baris):
+    """
+    Baris (sqlite3.Row atau dict) -> bytes JSON Lines.
+    """
+    return ''.join(json.dumps(dict(baris), ensure_ascii=False) + '\n' for baris in daftar_baris).encode('utf-8')
+
+
+class ServerAbsensi:
+    """
+    Server HTTP asyncio di atas satu DataManager. Query laporan memakai
+    koneksi pembaca per thread di pool_baca; impor memakai koneksi penulis
+    di pool_tulis (satu thread).
+    """
+
+    def __init__(self, db_file=NAMA_DATABASE, jumlah_worker=JUMLAH_WORKER_BACA, **opsi_manager):
+        self.manager = DataManager(db_file, **opsi_manager)
+        self.pool_baca = ThreadPoolExecutor(max_workers=jumlah_worker, thread_name_prefix='api-baca')
+        self.pool_tulis = ThreadPoolExecutor(max_workers=1, thread_name_prefix='api-tulis')
+        self.jumlah_worker = jumlah_worker
+        self.metrik = MetrikEndpoint()
+        self.rute = {
+            ('GET', '/absensi'): self.absensi,
+            ('GET', '/rekap'): self.rekap,
+            ('GET', '/pelanggaran'): self.pelanggaran,
+            ('POST', '/import'): self.impor,
+            ('GET', '/metrics'): self.metrics,
+        }
+
+    async def mulai(self, host=HOST_DEFAULT, port=PORT_DEFAULT):
+        """
+        Membuka socket server dan mengembalikan asyncio.Server. port=0
+        memilih port bebas (lihat server.sockets[0].getsockname()).
+        """
+        return await asyncio.start_server(self._tangani, host, port, limit=MAKS_HEADER)
+
+    def tutup(self):
+        """
+        Menunggu kerja di thread pool selesai lalu menutup koneksi database.
+        """
+        self.pool_tulis.shutdown(wait=True)
+        self.pool_baca.shutdown(wait=True)
+        self.manager.close()
+
+    async def _di_pool(self, pool, fungsi, *args):
+        return await asyncio.get_running_loop().run_in_executor(pool, fungsi, *args)
+
+    # --- HTTP ---
+
+    async def _tangani(self, reader, writer):
+        """
+        Menangani satu koneksi: satu request, satu respons, lalu ditutup.
+        """
+        mulai = time.perf_counter()
+        endpoint = None
+        status, baris = 500, 0
+        try:
+            try:
+                metode, path, query, body = await asyncio.wait_for(
+                    self._baca_request(reader), BATAS_WAKTU_REQUEST)
+                endpoint = f"{metode} {path}"
+                handler = self.rute.get((metode, path))
+                if handler is None:
+                    if any(p == path for _, p in self.rute):
+                        raise PermintaanSalah(f"metode {metode} tidak didukung untuk {path}", 405)
+                    raise PermintaanSalah(f"endpoint {path} tidak ditemukan", 404)
+                status, baris = await handler(writer, query, body)
+            except PermintaanSalah as e:
+                status = e.status
+                await self._kirim_json(writer, status, {'error': str(e)})
+            except asyncio.TimeoutError:
+                status = 408
+                await self._kirim_json(writer, status, {'error': "request terlalu lama"})
+            except (ConnectionError, asyncio.IncompleteReadError):
+                raise
+            except Exception as e:
+                print(f"❌ API {endpoint}: {e!r}")
+                status = 500
+                await self._kirim_json(writer, status, {'error': str(e)})
+        except (ConnectionError, asyncio.IncompleteReadError):
+            # Klien memutus koneksi (misalnya di tengah streaming)
+            status = 499
+        finally:
+            writer.close()
+            if endpoint in {f"{m} {p}" for m, p in self.rute}:
+                self.metrik.catat(endpoint, time.perf_counter() - mulai, status, baris)
+
+    async def _baca_request(self, reader):
+        """
+        Membaca request line, header, dan body (Content-Length).
+        Mengembalikan (metode, path, query dict, body bytes).
+        """
+        try:
+            kepala = await reader.readuntil(b'\r\n\r\n')
+        except asyncio.LimitOverrunError:
+            raise PermintaanSalah("header request terlalu besar", 413)
+        baris = kepala.decode('latin-1').split('\r\n')
+        try:
+            metode, target, _ = baris[0].split(' ', 2)
+        except ValueError:
+            raise PermintaanSalah("request line tidak valid")
+        header = {}
+        for b in baris[1:]:
+            if ':' in b:
+                nama, nilai = b.split(':', 1)
+                header[nama.strip().lower()] = nilai.strip()
+
+        try:
+            panjang = int(header.get('content-length', 0))
+        except ValueError:
+            raise PermintaanSalah("Content-Length tidak valid")
+        if panjang > MAKS_BODY:
+            raise PermintaanSalah(f"body maksimal {MAKS_BODY} byte", 413)
+        body = await reader.readexactly(panjang) if panjang else b''
+
+        url = urlsplit(target)
+        return metode.upper(), url.path.rstrip('/') or '/', parse_qs(url.query), body
+
+    def _kirim_header(self, writer, status, tipe, panjang=None):
+        baris = [f"HTTP/1.1 {status} {STATUS_HTTP.get(status, '')}", f"Content-Type: {tipe}", "Connection: close"]
+        if panjang is not None:
+            baris.append(f"Content-Length: {panjang}")
+        writer.write(('\r\n'.join(baris) + '\r\n\r\n').encode('latin-1'))
+
+    async def _kirim_json(self, writer, status, data):
+        isi = json.dumps(data, ensure_ascii=False).encode('utf-8')
+        self._kirim_header(writer, status, TIPE_JSON, len(isi))
+        writer.write(isi)
+        await writer.drain()
+
+    async def _alirkan(self, writer, hasilkan):
+        """
+        Mengirim respons JSON Lines. hasilkan(kirim) dijalankan utuh di SATU
+        tugas pool baca (buka cursor, fetchmany, tutup), sehingga koneksi
+        pembaca milik thread itu tidak pernah dipakai thread lain. Setiap
+        potongan diserahkan lewat kirim(bytes, jumlah_baris) ke asyncio.Queue
+        berukuran ANTREAN_POTONGAN: kirim() menunggu selama antrean penuh
+        (klien lambat) dan mengembalikan False jika streaming harus berhenti
+        (klien memutus koneksi atau server berhenti).
+
+        Header 200 baru dikirim saat potongan pertama (atau hasil kosong)
+        siap, jadi error saat membuka query tetap menjadi respons 500 biasa.
+        """
+        loop = asyncio.get_running_loop()
+        antrean = asyncio.Queue(maxsize=ANTREAN_POTONGAN)
+        berhenti = threading.Event()
+
+        def masukkan(item):
+            try:
+                future = asyncio.run_coroutine_threadsafe(antrean.put(item), loop)
+            except RuntimeError:
+                return False # Event loop sudah ditutup
+            while not berhenti.is_set():
+                try:
+                    future.result(timeout=0.5)
+                    return True
+                except FutureTimeoutError:
+                    continue
+            future.cancel()
+            return False
+
+        def produsen():
+            try:
+                hasilkan(lambda potongan, n: masukkan((potongan, n)))
+            finally:
+                masukkan(None) # Penanda selesai (juga saat error)
+
+        tugas = loop.run_in_executor(self.pool_baca, produsen)
+        header_terkirim = False
+        jumlah = 0
+        try:
+            while (item := await antrean.get()) is not None:
+                if not header_terkirim:
+                    self._kirim_header(writer, 200, TIPE_NDJSON)
+                    header_terkirim = True
+                potongan, n = item
+                writer.write(potongan)
+                await writer.drain()
+                jumlah += n
+            try:
+                await tugas
+            except Exception as e:
+                if not header_terkirim:
+                    raise
+                # Status 200 sudah terkirim: error dilaporkan sebagai baris terakhir
+                print(f"❌ API streaming GAGAL: {e!r}")
+                writer.write(json.dumps({'error': str(e)}, ensure_ascii=False).encode('utf-8') + b'\n')
+                await writer.drain()
+                return 500, jumlah
+        finally:
+            berhenti.set()
+        if not header_terkirim:
+            self._kirim_header(writer, 200, TIPE_NDJSON)
+        return 200, jumlah
+
+    async def _alirkan_kursor(self, writer, buka_kursor, *args):
+        """
+        Mengalirkan cursor laporan per batch UKURAN_BATCH_API baris. Cursor
+        dibuka, dibaca, dan ditutup di thread yang sama (lihat _alirkan);
+        cursor selalu ditutup (melepas read lock), juga saat klien memutus
+        koneksi.
+        """
+        def hasilkan(kirim):
+            cursor = buka_kursor(*args)
+            try:
+                while True:
+                    baris = cursor.fetchmany(UKURAN_BATCH_API)
+                    if not baris or not kirim(_kodekan_baris(baris), len(baris)):
+                        break
+            finally:
+                cursor.close()
+
+        return await self._alirkan(writer, hasilkan)
+
+    # --- Endpoint ---
+
+    async def absensi(self, writer, query, body):
+        cari = query.get('cari', [None])[0]
+        return await self._alirkan_kursor(
+            writer, self.manager.buka_kursor_absensi,
+            _tanggal_query(query, 'from'), _tanggal_query(query, 'to'), cari
+        )
+
+    async def rekap(self, writer, query, body):
+        # Rekap per karyawan (bukan per catatan) dan di-cache DataManager:
+        # diambil utuh lewat get_rekap_absensi, dikirim per batch
+        rentang = (_tanggal_query(query, 'from'), _tanggal_query(query, 'to'))
+
+        def hasilkan(kirim):
+            data = self.manager.get_rekap_absensi(*rentang)
+            for posisi in range(0, len(data), UKURAN_BATCH_API):
+                baris = data[posisi:posisi + UKURAN_BATCH_API]
+                if not kirim(_kodekan_baris(baris), len(baris)):
+                    break
+
+        return await self._alirkan(writer, hasilkan)
+
+    async def pelanggaran(self, writer, query, body):
+        return await self._alirkan_kursor(
+            writer, self.manager.buka_kursor_pelanggaran,
+            _tanggal_query(query, 'from'), _tanggal_query(query, 'to')
+        )
+
+    async def impor(self, writer, query, body):
+        try:
+            data = json.loads(body or b'{}')
+        except ValueError as e:
+            raise PermintaanSalah(f"body harus JSON: {e}")
+        daftar_file = data.get('file') if isinstance(data, dict) else None
+        if not daftar_file or not isinstance(daftar_file, list) or not all(isinstance(f, str) for f in daftar_file):
+            raise PermintaanSalah("'file' harus berupa list path file log di server")
+        tanggal = data.get('tanggal')
+        if tanggal is not None:
+            _tanggal_query({'tanggal': [tanggal]}, 'tanggal')
+
+        hasil = await self._di_pool(
+            self.pool_tulis, lambda: self.manager.import_batch(
+                daftar_file, tanggal,
+                paksa=bool(data.get('paksa', False)),
+                tanggal_dari_file=bool(data.get('tanggal_dari_file', tanggal is None)),
+                deteksi_pelanggaran=bool(data.get('deteksi_pelanggaran', False))
+            )
+        )
+        daftar_hasil = [{'file': h['file'], 'status': h['status'], **(h['ringkasan'] or {})} for h in hasil]
+        sukses = all(h['status'] in ('sukses', 'dilewati') for h in hasil)
+        baris = sum(h.get('diproses', 0) for h in daftar_hasil)
+        await self._kirim_json(writer, 200 if sukses else 422, {
+            'status': 'sukses' if sukses else 'gagal',
+            'baris': baris,
+            'file': daftar_hasil,
+        })
+        return (200 if sukses else 422), baris
+
+    async def metrics(self, writer, query, body):
+        await self._kirim_json(writer, 200, {
+            'endpoint': self.metrik.statistik(),
+            'cache': self.manager.statistik_cache(),
+            'worker_baca': self.jumlah_worker,
+        })
+        return 200, 0
+
+
+async def jalankan_server(db_file=NAMA_DATABASE, host=HOST_DEFAULT, port=PORT_DEFAULT,
+                          jumlah_worker=JUMLAH_WORKER_BACA, berhenti=None, **opsi_manager):
+    """
+    Menjalankan server sampai event berhenti di-set (atau task dibatalkan).
+    opsi_manager diteruskan ke DataManager (misalnya instrumentasi).
+    Mengembalikan statistik metrik terakhir, atau False jika database gagal dibuka.
+    """
+    api = ServerAbsensi(db_file, jumlah_worker, **opsi_manager)
+    if not api.manager.conn:
+        print("❌ Server API GAGAL: tidak dapat terhubung ke database.")
+        return False
+    server = await api.mulai(host, port)
+    alamat = server.sockets[0].getsockname()
+    print(f"✅ Server API mendengarkan di http://{alamat[0]}:{alamat[1]} ({jumlah_worker} worker baca)")
+    try:
+        async with server:
+            await (berhenti or asyncio.Event()).wait()
+    finally:
+        server.close()
+        await server.wait_closed()
+        await asyncio.get_running_loop().run_in_executor(None, api.tutup)
+        print("Server API berhenti.")
+    return api.metrik.statistik()
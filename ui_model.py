@@ -0,0 +1,94 @@
+from PySide6.QtCore import QAbstractTableModel, QModelIndex, Qt
+from PySide6.QtGui import QColor
+
+# Warna latar kolom status_validasi (dihitung di data(), tidak disimpan)
+WARNA_STATUS = {
+    'PENDING': QColor(Qt.GlobalColor.yellow),
+    'VALID': QColor(Qt.GlobalColor.green),
+}
+
+
+class AbsensiTableModel(QAbstractTableModel):
+    """
+    Model tabel absensi yang dibaca per halaman dari
+    DataManager.get_absensi_page(). Halaman berikutnya diambil lewat
+    canFetchMore()/fetchMore() saat pengguna menggulir, jadi rentang
+    tanggal yang lebar tidak membuat semua baris dimuat (dan dibuatkan
+    objek sel) di awal. Di antara halaman tidak ada cursor SQLite yang
+    terbuka, jadi impor dari thread lain tidak terhalang read lock.
+    """
+
+    def __init__(self, manager, kolom_tabel_map, ukuran_halaman=500, parent=None):
+        super().__init__(parent)
+        self.manager = manager
+        self.kolom_db = list(kolom_tabel_map.keys())      # Urutan kolom dari DB
+        self.kolom_tabel = list(kolom_tabel_map.values()) # Judul yang tampil di UI
+        self.kolom_status = self.kolom_db.index('status_validasi')
+        self.ukuran_halaman = ukuran_halaman
+
+        self._rentang = None  # (start_date, end_date) yang sedang dimuat
+        self._cari = None     # Teks pencarian nama/departemen (None = semua)
+        self._baris = []      # dict baris yang sudah diambil
+        self._cursor = None   # Cursor halaman berikutnya (None jika habis)
+        self.total = 0        # Jumlah seluruh baris di rentang tanggal
+
+    def muat(self, start_date, end_date, cari=None):
+        """
+        Mengganti isi model dengan data rentang tanggal baru, difilter
+        teks pencarian nama karyawan / departemen (cari) jika ada.
+        Halaman pertama langsung diambil (sekaligus total baris).
+        """
+        self.beginResetModel()
+        self._rentang = (start_date, end_date)
+        self._cari = cari
+        halaman = self.manager.get_absensi_page(start_date, end_date, self.ukuran_halaman, None, cari)
+        self._baris = halaman['data']
+        self._cursor = halaman['cursor']
+        self.total = halaman['total']
+        self.endResetModel()
+
+    # --- Lazy fetching ---
+
+    def canFetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return False
+        return self._cursor is not None
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self._cursor is None:
+            return
+        halaman = self.manager.get_absensi_page(*self._rentang, self.ukuran_halaman, self._cursor, self._cari)
+        self._cursor = halaman['cursor']
+        if not halaman['data']:
+            return
+
+        awal = len(self._baris)
+        self.beginInsertRows(QModelIndex(), awal, awal + len(halaman['data']) - 1)
+        self._baris.extend(halaman['data'])
+        self.endInsertRows()
+
+    # --- Implementasi QAbstractTableModel ---
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._baris)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.kolom_db)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        nilai = self._baris[index.row()][self.kolom_db[index.column()]]
+
+        if role == Qt.ItemDataRole.DisplayRole:
+            # Ganti None dengan string kosong
+            return '' if nilai is None else str(nilai)
+        if role == Qt.ItemDataRole.BackgroundRole and index.column() == self.kolom_status:
+            # Beri warna pada status
+            return WARNA_STATUS.get(nilai)
+        return None
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.kolom_tabel[section]
+        return None
@@ -0,0 +1,122 @@
+from PySide6.QtCore import QObject, Signal, Slot
+
+from data_manager import DataManager
+
+
+class ImportWorker(QObject):
+    """
+    Menjalankan DataManager.import_batch di QThread terpisah
+    agar jendela utama tetap responsif selama impor berlangsung.
+    Worker membuka koneksi SQLite-nya sendiri (koneksi sqlite3 tidak
+    boleh dipakai bersama lintas thread).
+    """
+    # Sinyal progres: (tahap 'parse'/'tulis'/'file', jumlah, total)
+    progress = Signal(str, int, int)
+    selesai = Signal(object)   # list hasil per file dari import_batch
+    gagal = Signal(str)
+    dibatalkan = Signal()
+
+    def __init__(self, db_file, file_paths, tanggal_absensi, paksa=False, cache_dir=None,
+                 tanggal_dari_file=True, deteksi_pelanggaran=False):
+        super().__init__()
+        self.db_file = db_file
+        self.file_paths = file_paths
+        self.tanggal_absensi = tanggal_absensi
+        self.paksa = paksa
+        self.tanggal_dari_file = tanggal_dari_file
+        self.deteksi_pelanggaran = deteksi_pelanggaran
+        self.cache_dir = cache_dir
+        self._batal = False
+
+    def batalkan(self):
+        """
+        Meminta impor berhenti. Dipanggil dari thread UI; impor akan
+        di-rollback pada batas batch berikutnya.
+        """
+        self._batal = True
+
+    @Slot()
+    def run(self):
+        manager = DataManager(self.db_file, cache_dir=self.cache_dir)
+        if not manager.conn:
+            self.gagal.emit("Gagal terhubung ke database.")
+            return
+
+        try:
+            hasil = manager.import_batch(
+                self.file_paths, self.tanggal_absensi,
+                progress_callback=self.progress.emit,
+                cek_batal=lambda: self._batal,
+                paksa=self.paksa,
+                tanggal_dari_file=self.tanggal_dari_file,
+                deteksi_pelanggaran=self.deteksi_pelanggaran
+            )
+        except Exception as e:
+            self.gagal.emit(str(e))
+            return
+        finally:
+            manager.close()
+
+        if any(h['status'] in ('sukses', 'dilewati') for h in hasil):
+            # Sebagian file bisa saja gagal/dibatalkan; UI menampilkan per file
+            self.selesai.emit(hasil)
+        elif self._batal:
+            self.dibatalkan.emit()
+        else:
+            self.gagal.emit("Impor data gagal. Periksa konsol untuk detail error.")
+
+
+class ExportWorker(QObject):
+    """
+    Menjalankan ekspor.ekspor_laporan di QThread terpisah. Seperti
+    ImportWorker, worker membuka koneksi DataManager-nya sendiri; baris
+    dialirkan dari cursor ke file sehingga memori tetap datar.
+    """
+    # Sinyal progres: (baris ditulis, total baris)
+    progress = Signal(int, int)
+    selesai = Signal(object)   # dict hasil ekspor_laporan
+    gagal = Signal(str)
+    dibatalkan = Signal()
+
+    def __init__(self, db_file, jenis, start_date, end_date, file_path):
+        super().__init__()
+        self.db_file = db_file
+        self.jenis = jenis
+        self.start_date = start_date
+        self.end_date = end_date
+        self.file_path = file_path
+        self._batal = False
+
+    def batalkan(self):
+        """
+        Meminta ekspor berhenti pada batch berikutnya (file sementara dihapus).
+        """
+        self._batal = True
+
+    @Slot()
+    def run(self):
+        from ekspor import ekspor_laporan
+
+        manager = DataManager(self.db_file, ukuran_cache=0)
+        if not manager.conn:
+            self.gagal.emit("Gagal terhubung ke database.")
+            return
+
+        try:
+            hasil = ekspor_laporan(
+                manager, self.jenis, self.start_date, self.end_date, self.file_path,
+                progress_callback=self.progress.emit,
+                cek_batal=lambda: self._batal
+            )
+        except Exception as e:
+            self.gagal.emit(str(e))
+            return
+        finally:
+            manager.close()
+
+        if hasil:
+            self.selesai.emit(hasil)
+        elif self._batal:
+            self.dibatalkan.emit()
+        else:
+            self.gagal.emit("Ekspor laporan gagal. Periksa konsol untuk detail error.")